@@ -0,0 +1,5 @@
+"""AutoPartSearch link extraction, parts scraping and analysis tools.
+
+Submodules are imported on demand; importing the package does not create
+directories, configure logging or pull in Selenium.
+"""
@@ -0,0 +1,105 @@
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from . import serialization
+
+# ============================================================
+# SYNTHETIC SHARD
+# ============================================================
+
+def make_shard(n_parts):
+    sellers = [f"Yard {i} Auto Parts" for i in range(50)]
+    parts = []
+
+    for i in range(n_parts):
+        seller = random.choice(sellers)
+        parts.append({
+            "run_timestamp": "20250101000000",
+            "application_text": "2.5L, 4 cyl",
+            "application_id": "12345",
+            "application_url": "https://www.autopartsearch.com/catalog-6/vehicle/TOYOTA/2010/CAMRY/engine-assembly?application=12345",
+            "part_name": "Engine Assembly",
+            "detail_url": f"https://www.autopartsearch.com/itemdetail?id={i}",
+            "price": f"{random.randint(200, 4000):,}.00",
+            "seller": seller,
+            "seller_city": "Springfield",
+            "seller_state": "IL",
+            "seller_phone": "(555) 123-4567",
+            "address": [seller, "123 Main St", "Springfield, IL", "(555) 123-4567"],
+            "mileage": f"{random.randint(10, 250) * 1000:,}",
+            "grade": random.choice("ABC"),
+            "condition_description": "Good",
+            "vin": f"1HGCM82633A{i:06d}",
+            "stock_no": f"S{i}",
+            "position": None,
+            "color": "SILVER",
+            "show_info": "Tested, 90 day warranty, low miles",
+            "thumbnail": f"https://img.example.com/ab12/images/{i}.jpg",
+            "yard_id": "AB12",
+            "distance_miles": str(random.randint(1, 500)),
+            "interchange": "2.5L, 4 cyl",
+            "images": [f"https://img.example.com/ab12/images/{i}_{j}.jpg" for j in range(4)],
+            "image_count": 4,
+            "source_year": "2010",
+            "source_make": "TOYOTA",
+            "source_model": "CAMRY",
+            "source_part_name": "Engine Assembly",
+            "source_part_slug": "engine-assembly",
+            "source_url": "https://www.autopartsearch.com/catalog-6/vehicle/TOYOTA/2010/CAMRY/engine-assembly",
+        })
+
+    return {"parts": parts, "pages_scraped": n_parts // 25, "total_bytes": n_parts * 4000}
+
+# ============================================================
+# BENCHMARK
+# ============================================================
+
+def bench(shard, suffix, repeat):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, f"shard{suffix}")
+
+        start_ts = time.perf_counter()
+        for _ in range(repeat):
+            serialization.dump(shard, path)
+        write_sec = (time.perf_counter() - start_ts) / repeat
+
+        size = os.path.getsize(path)
+
+        start_ts = time.perf_counter()
+        for _ in range(repeat):
+            serialization.load(path)
+        read_sec = (time.perf_counter() - start_ts) / repeat
+
+    return size, write_sec, read_sec
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Temp shard read/write throughput")
+    parser.add_argument("--parts", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    random.seed(0)
+    shard = make_shard(args.parts)
+
+    suffixes = [".json", ".json.gz"]
+    if serialization.zstandard is not None:
+        suffixes.append(".json.zst")
+
+    encoder = "orjson" if serialization.orjson is not None else "json"
+    print(f"encoder={encoder} parts={args.parts} repeat={args.repeat}")
+    print(f"{'format':<12}{'bytes':>14}{'write MB/s':>14}{'read MB/s':>14}")
+
+    raw_size = len(serialization.dumps(shard))
+    for suffix in suffixes:
+        size, write_sec, read_sec = bench(shard, suffix, args.repeat)
+        print(
+            f"{suffix:<12}{size:>14,}"
+            f"{raw_size / write_sec / 1e6:>14.1f}"
+            f"{raw_size / read_sec / 1e6:>14.1f}"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+import os
+from datetime import datetime
+
+# ============================================================
+# DEFAULTS
+# ============================================================
+
+DEFAULT_CSV_PATH = "output/ic_parts_data_combined_with_links_from_autopartsearch.csv"
+
+DEFAULT_PROXY_HOST = "geo.iproyal.com:12321"
+DEFAULT_PROXY_AUTH = "DewbRx43TyL9c0VL:Pm9YlpYW09eOGRsj_country-us"
+
+# ============================================================
+# RUN CONFIG
+# ============================================================
+
+class ScrapeConfig:
+    """
+    Settings for one parts scrape.
+
+    Nothing is created on disk until ensure_dirs() is called, so building a
+    config (or importing the package) has no side effects.
+    """
+
+    def __init__(
+            self,
+            csv_path=DEFAULT_CSV_PATH,
+            output_root="output",
+            log_dir="logs",
+            use_proxy=True,
+            proxy_host=None,
+            proxy_auth=None,
+            concurrency=15,
+            record_workers=15,
+            request_deadline=60,
+            record_deadline=1800,
+            stall_timeout=300,
+            stream_idle_timeout=1800,
+            split_yard_output=False,
+            shard_suffix=".json",
+            final_suffix=".json",
+            partition_by=None,
+            facet_ttl=7 * 24 * 3600,
+            refresh_facets=False,
+            stream_parse=False,
+            negotiate_page_size=False,
+            run_ts=None
+        ):
+
+        self.run_ts = run_ts or datetime.now().strftime("%Y%m%d%H%M%S")
+        self.run_date = self.run_ts[:8]
+
+        self.csv_path = csv_path
+        self.output_root = output_root
+        self.log_dir = log_dir
+        self.run_root = os.path.join(output_root, f"parts_scrape_{self.run_date}")
+        self.final_dir = os.path.join(self.run_root, "final")
+        self.temp_dir = os.path.join(self.run_root, "temp")
+        self.cost_history_path = os.path.join(output_root, "record_costs.json")
+        self.dead_letter_path = os.path.join(output_root, "dead_letters.ndjson")
+        self.facet_cache_path = os.path.join(output_root, "facet_cache.sqlite")
+
+        self.use_proxy = use_proxy
+        self.proxy_host = proxy_host or os.environ.get("AUTOPARTSEARCH_PROXY_HOST", DEFAULT_PROXY_HOST)
+        self.proxy_auth = proxy_auth or os.environ.get("AUTOPARTSEARCH_PROXY_AUTH", DEFAULT_PROXY_AUTH)
+
+        # Page fetches in flight (the old SEM) and records in flight
+        self.concurrency = concurrency
+        self.record_workers = record_workers
+
+        # Seconds: one page including retries, one whole record, and the
+        # longest a record may go without finishing a page before the
+        # watchdog cancels it (0 disables the last two)
+        self.request_deadline = request_deadline
+        self.record_deadline = record_deadline
+        self.stall_timeout = stall_timeout
+
+        # Seconds a followed links CSV may go without growing (or without
+        # appearing) before --stream stops following it, 0 for never
+        self.stream_idle_timeout = stream_idle_timeout
+
+        # Opt-in: final output becomes a slim listing file plus a
+        # yards_<date> seller dimension, dropping the seller* fields that
+        # parts_data consumers read by default
+        self.split_yard_output = split_yard_output
+
+        # ".json", ".json.gz" or ".json.zst" (needs zstandard)
+        self.shard_suffix = shard_suffix
+        self.final_suffix = final_suffix
+
+        # None for one parts_data file, or levels such as ("make", "year")
+        # to write a directory of partitions with a manifest instead
+        self.partition_by = tuple(partition_by) if partition_by else None
+
+        # Seconds a cached application facet stays valid (0 disables the
+        # cache); refresh_facets rediscovers every facet and overwrites it
+        self.facet_ttl = facet_ttl
+        self.refresh_facets = refresh_facets
+
+        # Parse listing pages incrementally as they download (bounded
+        # memory per page) instead of buffering each body first
+        self.stream_parse = stream_parse
+
+        # Probe for a page-size query parameter and paginate with the
+        # largest size the catalog serves
+        self.negotiate_page_size = negotiate_page_size
+
+    def settings(self):
+        # Everything needed to rebuild this config in a worker process
+        return {
+            "csv_path": self.csv_path,
+            "output_root": self.output_root,
+            "log_dir": self.log_dir,
+            "use_proxy": self.use_proxy,
+            "proxy_host": self.proxy_host,
+            "proxy_auth": self.proxy_auth,
+            "concurrency": self.concurrency,
+            "record_workers": self.record_workers,
+            "request_deadline": self.request_deadline,
+            "record_deadline": self.record_deadline,
+            "stall_timeout": self.stall_timeout,
+            "stream_idle_timeout": self.stream_idle_timeout,
+            "split_yard_output": self.split_yard_output,
+            "shard_suffix": self.shard_suffix,
+            "final_suffix": self.final_suffix,
+            "partition_by": self.partition_by,
+            "facet_ttl": self.facet_ttl,
+            "refresh_facets": self.refresh_facets,
+            "stream_parse": self.stream_parse,
+            "negotiate_page_size": self.negotiate_page_size,
+            "run_ts": self.run_ts,
+        }
+
+    @property
+    def proxy_url(self):
+        if not self.use_proxy:
+            return None
+        return f"http://{self.proxy_auth}@{self.proxy_host}"
+
+    def ensure_dirs(self):
+        os.makedirs(self.final_dir, exist_ok=True)
+        os.makedirs(self.temp_dir, exist_ok=True)
+        os.makedirs(self.log_dir, exist_ok=True)
+
+_CONFIG = None
+
+def get_config():
+    global _CONFIG
+    if _CONFIG is None:
+        _CONFIG = ScrapeConfig()
+    return _CONFIG
+
+def configure(**settings):
+    global _CONFIG
+    _CONFIG = ScrapeConfig(**settings)
+    return _CONFIG
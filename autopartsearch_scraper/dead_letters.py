@@ -0,0 +1,104 @@
+import os
+from datetime import datetime
+
+from . import serialization
+
+# ============================================================
+# REASONS
+# ============================================================
+
+# A page fetch gave up after its retries; later pages were never requested
+FETCH_FAILED = "fetch_failed"
+
+# Pagination hit max_pages while pages were still returning parts
+TRUNCATED = "truncated"
+
+# The record was cancelled by the watchdog
+TIMED_OUT = "timed_out"
+
+# Anything else raised while scraping the record
+ERROR = "error"
+
+# ============================================================
+# STORE
+# ============================================================
+
+class DeadLetterStore:
+    """
+    Append-only NDJSON file of failed or incomplete records.
+
+    Entries with a failed_page are resumed from that page of their
+    application; entries without one are scraped again from the start.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.retrying_path = f"{path}.retrying"
+
+    def add(
+            self,
+            rec,
+            reason,
+            detail=None,
+            application=None,
+            last_good_page=None,
+            failed_page=None,
+            shard_path=None,
+            page_param=None
+        ):
+        entry = {
+            "ts": datetime.now().strftime("%Y%m%d%H%M%S"),
+            "reason": reason,
+            "detail": detail,
+            "record": rec._asdict(),
+            "application": application,
+            "application_url": application["application_url"] if application else rec.url,
+            "last_good_page": last_good_page,
+            "failed_page": failed_page,
+            # (param, size) the page numbers count in, None for the default
+            "page_param": page_param,
+            "shard_path": shard_path,
+        }
+        return self.append(entry)
+
+    def append(self, entry):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "ab") as f:
+            f.write(serialization.dumps(entry) + b"\n")
+        return entry
+
+    def read(self, path):
+        if not os.path.exists(path):
+            return []
+
+        entries = []
+        with open(path, "rb") as f:
+            for line in f:
+                if line.strip():
+                    entries.append(serialization.loads(line))
+        return entries
+
+    def take(self):
+        """
+        Moves the current entries aside for a retry run and returns them.
+
+        Failures during the retry append to a fresh file; finish() drops the
+        taken entries once the retry completes. Entries left over from an
+        interrupted retry are picked up again.
+        """
+        pending = self.read(self.retrying_path)
+
+        if os.path.exists(self.path):
+            pending.extend(self.read(self.path))
+            tmp_path = f"{self.retrying_path}.tmp"
+            with open(tmp_path, "wb") as f:
+                for entry in pending:
+                    f.write(serialization.dumps(entry) + b"\n")
+            os.replace(tmp_path, self.retrying_path)
+            os.remove(self.path)
+
+        return pending
+
+    def finish(self):
+        if os.path.exists(self.retrying_path):
+            os.remove(self.retrying_path)
@@ -0,0 +1,158 @@
+import asyncio
+import logging
+import threading
+import time
+
+logger = logging.getLogger("autopartsearch_scraper")
+
+# ============================================================
+# CONFIG
+# ============================================================
+
+WATCHDOG_INTERVAL = 5.0
+
+# ============================================================
+# ASYNC TASK WATCHDOG
+# ============================================================
+
+class _Watched:
+    __slots__ = ("label", "started", "last_beat", "deadline", "stall_timeout", "reason")
+
+    def __init__(self, label, deadline, stall_timeout):
+        now = time.monotonic()
+        self.label = label
+        self.started = now
+        self.last_beat = now
+        self.deadline = deadline
+        self.stall_timeout = stall_timeout
+        self.reason = None
+
+class TaskWatchdog:
+    """
+    Cancels watched tasks that run past their deadline or stop making progress.
+
+    A task counts as stalled when heartbeat() has not been called from it for
+    stall_timeout seconds. Cancelling unwinds its pending fetches, so the
+    semaphore slots they held are released for the rest of the run.
+    """
+
+    def __init__(self, interval=WATCHDOG_INTERVAL):
+        self.interval = interval
+        self.watched = {}
+        self.cancelled = 0
+        self._runner = None
+
+    def watch(self, task, label, deadline=None, stall_timeout=None):
+        self.watched[task] = _Watched(label, deadline, stall_timeout)
+        if self._runner is None or self._runner.done():
+            self._runner = asyncio.get_running_loop().create_task(self._run())
+
+    def unwatch(self, task):
+        entry = self.watched.pop(task, None)
+        return entry.reason if entry else None
+
+    def heartbeat(self, task=None):
+        entry = self.watched.get(task or asyncio.current_task())
+        if entry is not None:
+            entry.last_beat = time.monotonic()
+
+    def check(self, now=None):
+        now = now or time.monotonic()
+
+        for task, entry in list(self.watched.items()):
+            if entry.reason or task.done():
+                continue
+
+            if entry.deadline and now - entry.started > entry.deadline:
+                entry.reason = f"deadline {entry.deadline}s exceeded"
+            elif entry.stall_timeout and now - entry.last_beat > entry.stall_timeout:
+                entry.reason = f"no progress for {entry.stall_timeout}s"
+            else:
+                continue
+
+            logger.warning("Watchdog cancelling %s | %s", entry.label, entry.reason)
+            self.cancelled += 1
+            task.cancel()
+
+    async def _run(self):
+        while self.watched:
+            await asyncio.sleep(self.interval)
+            self.check()
+
+async def run_watched(watchdog, coro, label, deadline=None, stall_timeout=None):
+    """
+    Runs coro as its own task under the watchdog.
+
+    Returns (result, None), or (None, reason) when the watchdog cancelled it.
+    Cancellation of the caller itself still propagates.
+    """
+    task = asyncio.ensure_future(coro)
+    watchdog.watch(task, label, deadline, stall_timeout)
+
+    try:
+        return await task, None
+    except asyncio.CancelledError:
+        reason = watchdog.unwatch(task)
+        if reason is None or not task.cancelled():
+            raise
+        return None, reason
+    finally:
+        watchdog.unwatch(task)
+
+# ============================================================
+# BROWSER WATCHDOG
+# ============================================================
+
+class BrowserWatchdog:
+    """
+    Quits a Selenium driver from a background thread when it stops making progress.
+
+    Waits blocked inside the driver then fail with a WebDriverException, which
+    the extractor treats as a timed-out step and answers by starting a fresh
+    browser. Call beat() after every completed step.
+    """
+
+    def __init__(self, stall_timeout, log=None, interval=WATCHDOG_INTERVAL):
+        self.stall_timeout = stall_timeout
+        self.log = log or logger
+        self.interval = interval
+        self.driver = None
+        self.tripped = False
+        self.last_beat = time.monotonic()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="browser-watchdog", daemon=True)
+
+    def attach(self, driver):
+        with self._lock:
+            self.driver = driver
+            self.tripped = False
+            self.last_beat = time.monotonic()
+
+    def beat(self):
+        self.last_beat = time.monotonic()
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            if time.monotonic() - self.last_beat <= self.stall_timeout:
+                continue
+
+            with self._lock:
+                if self.driver is None or self.tripped:
+                    continue
+                self.tripped = True
+                driver = self.driver
+
+            self.log.warning(f"Browser stalled for over {self.stall_timeout}s, quitting it")
+            try:
+                driver.quit()
+            except Exception as e:
+                self.log.warning(f"Browser quit failed: {e}")
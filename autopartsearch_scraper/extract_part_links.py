@@ -1,5 +1,7 @@
+import argparse
 import csv
 from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
@@ -9,48 +11,78 @@ import os
 import logging
 from datetime import datetime
 
+from .deadlines import BrowserWatchdog
+
 # ============================================================
 # LOGGING SETUP
 # ============================================================
 
 LOG_DIR = "logs"
-os.makedirs(LOG_DIR, exist_ok=True)
-
-log_file = os.path.join(
-    LOG_DIR,
-    f"autopartsearch_extract_part_links_{datetime.now().strftime('%Y%m%d')}.log"
-)
-
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s | %(levelname)s | %(message)s",
-    handlers=[
-        logging.FileHandler(log_file, encoding="utf8"),
-        logging.StreamHandler()
-    ]
-)
-
 CHECKPOINT_DIR = "checkpoints"
-os.makedirs(CHECKPOINT_DIR, exist_ok=True)
 
-CHECKPOINT_FILE = os.path.join(
-    CHECKPOINT_DIR,
-    f"checkpoint_{datetime.now().strftime('%Y%m%d')}.txt"
-)
+BASE_URL = "https://autopartsearch.com/"
+
+# Seconds before a page load or script gives up, and before the watchdog
+# quits a browser that has not finished a model
+PAGE_LOAD_TIMEOUT = 60
+SCRIPT_TIMEOUT = 30
+BROWSER_STALL_SECONDS = 300
+
+def setup_logging():
+    # Called from main() so importing this module touches nothing on disk
+    os.makedirs(LOG_DIR, exist_ok=True)
+
+    log_file = os.path.join(
+        LOG_DIR,
+        f"autopartsearch_extract_part_links_{datetime.now().strftime('%Y%m%d')}.log"
+    )
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s | %(levelname)s | %(message)s",
+        handlers=[
+            logging.FileHandler(log_file, encoding="utf8"),
+            logging.StreamHandler()
+        ]
+    )
+
+def checkpoint_file():
+    return os.path.join(
+        CHECKPOINT_DIR,
+        f"checkpoint_{datetime.now().strftime('%Y%m%d')}.txt"
+    )
 
 def save_checkpoint(year, make):
-    with open(CHECKPOINT_FILE, "w", encoding="utf8") as f:
+    os.makedirs(CHECKPOINT_DIR, exist_ok=True)
+    with open(checkpoint_file(), "w", encoding="utf8") as f:
         f.write(f"{year}|{make}")
 
 def load_checkpoint():
-    if not os.path.exists(CHECKPOINT_FILE):
+    if not os.path.exists(checkpoint_file()):
         return None, None
-    with open(CHECKPOINT_FILE, "r", encoding="utf8") as f:
+    with open(checkpoint_file(), "r", encoding="utf8") as f:
         content = f.read().strip()
         if "|" not in content:
             return None, None
         return content.split("|", 1)
 
+def mark_links_complete(csv_path, failed=False):
+    # Lets scrap_parts_data stop following the file once extraction ends,
+    # whether or not it got through every year
+    with open(f"{csv_path}.done", "w", encoding="utf8") as f:
+        f.write(datetime.now().strftime("%Y%m%d%H%M%S"))
+        if failed:
+            f.write(" failed")
+
+# ============================================================
+# BROWSER
+# ============================================================
+def new_driver():
+    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()))
+    driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT)
+    driver.set_script_timeout(SCRIPT_TIMEOUT)
+    return driver
+
 # ============================================================
 # SELECT2 CLICK HELPER
 # ============================================================
@@ -123,8 +155,13 @@ def get_select_options(driver, css_selector):
 # ============================================================
 # MAIN SCRAPER 
 # ============================================================
-def main():
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Collect AutoPartSearch catalog links")
+    parser.add_argument("--max-links", type=int, help="stop after this many part links (test runs)")
+    parser.add_argument("--min-year", type=int, default=2010)
+    args = parser.parse_args(argv)
 
+    setup_logging()
     logging.info("Starting AutoPartSearch scraper")
 
     run_ts = datetime.now().strftime("%Y%m%d%H%M%S")
@@ -133,15 +170,19 @@ def main():
     last_year, last_make = load_checkpoint()
     logging.info(f"Checkpoint loaded. Last year {last_year}, last make {last_make}")
    
-    MAX_LINKS = None
+    MAX_LINKS = args.max_links
     collected_links = 0
 
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()))
-    driver.get("https://autopartsearch.com/")
+    driver = new_driver()
+    watchdog = BrowserWatchdog(BROWSER_STALL_SECONDS).start()
+    watchdog.attach(driver)
+    timed_out = 0
+
+    driver.get(BASE_URL)
     driver.maximize_window()
 
     years = get_select_options(driver, "select#afmkt-year")
-    years = [y for y in years if int(y) >= 2010]
+    years = [y for y in years if int(y) >= args.min_year]
     logging.info(f"Found {len(years)} years.")
 
     csv_name = (
@@ -151,118 +192,155 @@ def main():
     )
     out = open(csv_name, "w", newline="", encoding="utf8")
 
-    writer = csv.writer(out)
-    writer.writerow([
-        "run_timestamp",
-        "year",
-        "make",
-        "model",
-        "part_name",
-        "part_slug",
-        "url",
-        "part_count"
-    ])
-
-    for year in years:
-        if last_year and int(year) < int(last_year):
-            logging.info(f"Skipping year {year}, already processed")
-            continue
-
-        logging.info(f"\n=== YEAR: {year} ===")
-        select2_click(driver, "span#select2-afmkt-year-container", year)
+    completed = False
+    try:
+        writer = csv.writer(out)
+        writer.writerow([
+            "run_timestamp",
+            "year",
+            "make",
+            "model",
+            "part_name",
+            "part_slug",
+            "url",
+            "part_count"
+        ])
+
+        for year in years:
+            if last_year and int(year) < int(last_year):
+                logging.info(f"Skipping year {year}, already processed")
+                continue
 
-        makes = get_select_options(driver, "select#afmkt-make")
-        logging.info(f"Found {len(makes)} makes.")
+            logging.info(f"\n=== YEAR: {year} ===")
+            select2_click(driver, "span#select2-afmkt-year-container", year)
 
-        for make in makes:
-            if last_year == year and last_make and make.lower() <= last_make.lower():
-                logging.info(f"Skipping make {make}, already processed")
-                continue
-            logging.info(f"\n--- MAKE: {make} ---")
-            select2_click(driver, "span#select2-afmkt-make-container", make)
-
-            models = get_select_options(driver, "select#afmkt-model")
-            logging.info(f"Found {len(models)} models.")
-
-            for model in models:
-                logging.info(f"Model: {model}")
-                select2_click(driver, "span#select2-afmkt-model-container", model)
-
-                try:
-                    parts = get_part_types(driver)
-                except Exception as e:
-                    logging.error(f"Part dropdown failed for {year} {make} {model}. Error: {e}")
-                    writer.writerow([
-                        run_ts,
-                        year,
-                        make,
-                        model,
-                        "",
-                        "",
-                        "",
-                        0
-                    ])
-                    out.flush()
-                    continue
+            makes = get_select_options(driver, "select#afmkt-make")
+            logging.info(f"Found {len(makes)} makes.")
 
-                part_count = len(parts)
-                logging.info(f"Parts found: {part_count}")
-
-                # Zero part model → write one row
-                if part_count == 0:
-                    writer.writerow([
-                        run_ts,
-                        year,
-                        make,
-                        model,
-                        "",
-                        "",
-                        "",
-                        0
-                    ])
-                    out.flush()
+            for make in makes:
+                if last_year == year and last_make and make.lower() <= last_make.lower():
+                    logging.info(f"Skipping make {make}, already processed")
                     continue
+                logging.info(f"\n--- MAKE: {make} ---")
+                select2_click(driver, "span#select2-afmkt-make-container", make)
+
+                models = get_select_options(driver, "select#afmkt-model")
+                logging.info(f"Found {len(models)} models.")
+
+                for model in models:
+                    logging.info(f"Model: {model}")
+
+                    try:
+                        select2_click(driver, "span#select2-afmkt-model-container", model)
+
+                        try:
+                            parts = get_part_types(driver)
+                        except Exception as e:
+                            if watchdog.tripped:
+                                raise
+                            logging.error(f"Part dropdown failed for {year} {make} {model}. Error: {e}")
+                            writer.writerow([
+                                run_ts,
+                                year,
+                                make,
+                                model,
+                                "",
+                                "",
+                                "",
+                                0
+                            ])
+                            out.flush()
+                            continue
+
+                    except WebDriverException as e:
+                        # Stuck or killed browser: log the model as timed out and
+                        # carry on in a fresh one positioned at the same make
+                        reason = "watchdog" if watchdog.tripped else type(e).__name__
+                        logging.error(f"TIMED OUT {year} {make} {model} | {reason}")
+                        timed_out += 1
+
+                        try:
+                            driver.quit()
+                        except Exception:
+                            pass
+
+                        driver = new_driver()
+                        watchdog.attach(driver)
+                        driver.get(BASE_URL)
+                        select2_click(driver, "span#select2-afmkt-year-container", year)
+                        select2_click(driver, "span#select2-afmkt-make-container", make)
+                        continue
+
+                    finally:
+                        watchdog.beat()
+
+                    part_count = len(parts)
+                    logging.info(f"Parts found: {part_count}")
+
+                    # Zero part model → write one row
+                    if part_count == 0:
+                        writer.writerow([
+                            run_ts,
+                            year,
+                            make,
+                            model,
+                            "",
+                            "",
+                            "",
+                            0
+                        ])
+                        out.flush()
+                        continue
 
-                # Otherwise write one row per part
-                for part_name, part_slug in parts:
-                    url = f"https://www.autopartsearch.com/catalog-6/vehicle/{make}/{year}/{model}/{part_slug}"
+                    # Otherwise write one row per part
+                    for part_name, part_slug in parts:
+                        url = f"https://www.autopartsearch.com/catalog-6/vehicle/{make}/{year}/{model}/{part_slug}"
 
-                    writer.writerow([
-                        run_ts,
-                        year,
-                        make,
-                        model,
-                        part_name,
-                        part_slug,
-                        url,
-                        part_count
-                    ])
+                        writer.writerow([
+                            run_ts,
+                            year,
+                            make,
+                            model,
+                            part_name,
+                            part_slug,
+                            url,
+                            part_count
+                        ])
 
-                    collected_links += 1
+                        collected_links += 1
 
-                    logging.info(f"[{collected_links}] {url}")
+                        logging.info(f"[{collected_links}] {url}")
 
-                    if MAX_LINKS is not None and collected_links >= MAX_LINKS:
-                        logging.info(f"\n=== Reached {MAX_LINKS} real links. Stopping. ===")
-                        out.flush()
-                        out.close()
-                        driver.quit()
-                        return
+                        if MAX_LINKS is not None and collected_links >= MAX_LINKS:
+                            logging.info(f"\n=== Reached {MAX_LINKS} real links. Stopping. ===")
+                            completed = True
+                            return
 
-                out.flush()
+                    out.flush()
 
-            save_checkpoint(year, make)
-            logging.info(f"Checkpoint saved at year {year}, make {make}")
+                save_checkpoint(year, make)
+                logging.info(f"Checkpoint saved at year {year}, make {make}")
 
    
-    logging.info(f"Total links collected: {collected_links}")
-    logging.info("Scraper finished successfully")
-
-    out.close()
-    driver.quit()
-
-    if os.path.exists(CHECKPOINT_FILE):
-        os.remove(CHECKPOINT_FILE)
+        logging.info(f"Total links collected: {collected_links}")
+        if timed_out:
+            logging.warning(f"Models timed out: {timed_out} (search the log for TIMED OUT)")
+        logging.info("Scraper finished successfully")
+        completed = True
+
+    finally:
+        # Mark the file even on failure, so a --stream scrape following it
+        # stops instead of polling forever
+        out.close()
+        mark_links_complete(csv_name, failed=not completed)
+        watchdog.stop()
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    if os.path.exists(checkpoint_file()):
+        os.remove(checkpoint_file())
         logging.info("Checkpoint cleared after successful completion")
 
 if __name__ == "__main__":
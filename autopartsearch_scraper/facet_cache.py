@@ -0,0 +1,176 @@
+import os
+import sqlite3
+import threading
+import time
+
+# ============================================================
+# CONFIG
+# ============================================================
+
+FACET_TTL = 7 * 24 * 3600
+
+# ============================================================
+# CACHE
+# ============================================================
+
+class FacetCache:
+    """
+    Application facets per base URL, kept across runs in SQLite.
+
+    Each application is stored under its normalized text, so a record is
+    matched with one indexed lookup instead of fetching page 1 and scanning
+    the facet. Entries older than ttl seconds are ignored and rediscovered.
+
+    Calls block on SQLite locks shared with other processes, so async code
+    runs them in an executor; the connection is shared between executor
+    threads and guarded by self.lock.
+    """
+
+    def __init__(self, path, ttl=FACET_TTL):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, timeout=60, isolation_level=None, check_same_thread=False)
+
+        try:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+        except sqlite3.OperationalError:
+            pass
+
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS facets (
+                base_url TEXT PRIMARY KEY,
+                app_count INTEGER NOT NULL,
+                fetched_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS applications (
+                base_url TEXT NOT NULL,
+                match_text TEXT NOT NULL,
+                application_id TEXT NOT NULL,
+                application_text TEXT,
+                application_url TEXT NOT NULL,
+                PRIMARY KEY (base_url, match_text, application_id)
+            ) WITHOUT ROWID;
+        """)
+
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.unmatched = 0
+        self.invalidations = 0
+
+    def lookup(self, base_url, match_text):
+        """
+        Applications to scrape for match_text, or None to discover them.
+
+        An empty list means the URL has no application facet and is scraped
+        unfiltered. A cached facet without match_text returns None, since a
+        new application may have appeared since it was stored.
+        """
+        with self.lock:
+            return self._lookup(base_url, match_text)
+
+    def _lookup(self, base_url, match_text):
+        row = self.conn.execute(
+            "SELECT app_count, fetched_at FROM facets WHERE base_url = ?",
+            (base_url,)
+        ).fetchone()
+
+        if row is None:
+            self.misses += 1
+            return None
+
+        app_count, fetched_at = row
+        if time.time() - fetched_at > self.ttl:
+            self.expired += 1
+            return None
+
+        if app_count == 0:
+            self.hits += 1
+            return []
+
+        apps = [
+            {
+                "application_text": text,
+                "application_id": app_id,
+                "application_url": url,
+            }
+            for app_id, text, url in self.conn.execute(
+                "SELECT application_id, application_text, application_url FROM applications "
+                "WHERE base_url = ? AND match_text = ?",
+                (base_url, match_text)
+            )
+        ]
+
+        if not apps:
+            self.unmatched += 1
+            return None
+
+        self.hits += 1
+        return apps
+
+    def store(self, base_url, applications, normalize):
+        with self.lock:
+            self._store(base_url, applications, normalize)
+
+    def _store(self, base_url, applications, normalize):
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            self.conn.execute("DELETE FROM applications WHERE base_url = ?", (base_url,))
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO applications "
+                "(base_url, match_text, application_id, application_text, application_url) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [
+                    (
+                        base_url,
+                        normalize(app["application_text"]),
+                        app["application_id"],
+                        app["application_text"],
+                        app["application_url"],
+                    )
+                    for app in applications
+                ]
+            )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO facets (base_url, app_count, fetched_at) VALUES (?, ?, ?)",
+                (base_url, len(applications), time.time())
+            )
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+
+    def invalidate(self, base_url):
+        with self.lock:
+            self.conn.execute("DELETE FROM facets WHERE base_url = ?", (base_url,))
+            self.conn.execute("DELETE FROM applications WHERE base_url = ?", (base_url,))
+            self.invalidations += 1
+
+    def purge_expired(self):
+        """Deletes facets past the ttl. Returns how many base URLs went."""
+        cutoff = time.time() - self.ttl
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                self.conn.execute(
+                    "DELETE FROM applications WHERE base_url IN "
+                    "(SELECT base_url FROM facets WHERE fetched_at < ?)",
+                    (cutoff,)
+                )
+                purged = self.conn.execute("DELETE FROM facets WHERE fetched_at < ?", (cutoff,)).rowcount
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+        return purged
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "unmatched": self.unmatched,
+            "invalidations": self.invalidations,
+        }
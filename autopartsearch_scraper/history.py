@@ -0,0 +1,421 @@
+import argparse
+import json
+import logging
+import os
+import re
+import sqlite3
+import sys
+import time
+
+from .partitions import expand_paths
+from .parts_index import parse_number
+from .serialization import iter_json_array
+
+# ============================================================
+# CONFIG
+# ============================================================
+
+DEFAULT_DB_PATH = os.path.join("output", "parts_history.sqlite")
+
+BATCH_SIZE = 5000
+
+# Event kinds
+NEW = "new"
+PRICE = "price"
+MILEAGE = "mileage"
+GONE = "gone"
+BACK = "back"
+
+logger = logging.getLogger("autopartsearch_history")
+
+# ============================================================
+# SCHEMA
+# ============================================================
+
+def create_schema(conn):
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS runs (
+            run_date TEXT PRIMARY KEY,
+            source_path TEXT,
+            ingested_at REAL NOT NULL,
+            listings INTEGER NOT NULL,
+            new INTEGER NOT NULL,
+            changed INTEGER NOT NULL,
+            gone INTEGER NOT NULL
+        );
+
+        -- Latest known state per listing; one row however many runs it appears in
+        CREATE TABLE IF NOT EXISTS listings (
+            yard_id TEXT NOT NULL,
+            stock_no TEXT NOT NULL,
+            first_seen TEXT NOT NULL,
+            last_seen TEXT NOT NULL,
+            gone_since TEXT,
+            price REAL,
+            mileage REAL,
+            part_name TEXT,
+            source_make TEXT,
+            source_model TEXT,
+            source_year TEXT,
+            vin TEXT,
+            detail_url TEXT,
+            PRIMARY KEY (yard_id, stock_no)
+        ) WITHOUT ROWID;
+
+        -- Only what changed: appearances, price/mileage moves, disappearances
+        CREATE TABLE IF NOT EXISTS events (
+            yard_id TEXT NOT NULL,
+            stock_no TEXT NOT NULL,
+            run_date TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            old_value REAL,
+            new_value REAL
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_events_listing ON events (yard_id, stock_no, run_date);
+        CREATE INDEX IF NOT EXISTS idx_events_date ON events (run_date, kind);
+        CREATE INDEX IF NOT EXISTS idx_listings_make ON listings (source_make, source_model, source_year);
+    """)
+
+SNAPSHOT_COLUMNS = [
+    "yard_id",
+    "stock_no",
+    "price",
+    "mileage",
+    "part_name",
+    "source_make",
+    "source_model",
+    "source_year",
+    "vin",
+    "detail_url",
+]
+
+def snapshot_row(part):
+    return (
+        part.get("yard_id"),
+        part.get("stock_no"),
+        parse_number(part.get("price")),
+        parse_number(part.get("mileage")),
+        part.get("part_name"),
+        part.get("source_make"),
+        part.get("source_model"),
+        part.get("source_year"),
+        part.get("vin"),
+        part.get("detail_url"),
+    )
+
+def run_date_from_path(path):
+    m = re.search(r"(\d{8})", os.path.basename(path))
+    return m.group(1) if m else None
+
+# ============================================================
+# INGEST
+# ============================================================
+
+def load_snapshot(conn, json_paths):
+    conn.execute("DROP TABLE IF EXISTS temp.snapshot")
+    conn.execute(f"""
+        CREATE TEMP TABLE snapshot (
+            {', '.join(f'{c} {"REAL" if c in ("price", "mileage") else "TEXT"}' for c in SNAPSHOT_COLUMNS)},
+            PRIMARY KEY (yard_id, stock_no)
+        ) WITHOUT ROWID
+    """)
+
+    insert_sql = (
+        f"INSERT OR REPLACE INTO temp.snapshot ({', '.join(SNAPSHOT_COLUMNS)}) "
+        f"VALUES ({', '.join('?' for _ in SNAPSHOT_COLUMNS)})"
+    )
+
+    loaded = 0
+    skipped = 0
+    batch = []
+
+    for json_path in expand_paths(json_paths):
+        for part in iter_json_array(json_path):
+            row = snapshot_row(part)
+            if not row[0] or not row[1]:
+                skipped += 1
+                continue
+            batch.append(row)
+            if len(batch) >= BATCH_SIZE:
+                conn.executemany(insert_sql, batch)
+                loaded += len(batch)
+                batch = []
+
+    if batch:
+        conn.executemany(insert_sql, batch)
+        loaded += len(batch)
+
+    if skipped:
+        logger.warning(f"Skipped {skipped} parts without yard_id/stock_no in {', '.join(json_paths)}")
+
+    return loaded
+
+def ingest_run(conn, json_paths, run_date, partial=False):
+    """
+    Applies one run as a delta against the stored state. json_paths are
+    every file of the run (say, parts_data_<date> and its _retry output,
+    or a partitioned directory) and are loaded as a single snapshot.
+
+    Runs must arrive in date order. A partial run (a sample, or a retry)
+    records appearances and changes but does not mark missing listings gone,
+    so it may also be added on top of the latest date already ingested.
+    """
+    if isinstance(json_paths, str):
+        json_paths = [json_paths]
+
+    latest = conn.execute("SELECT MAX(run_date) FROM runs").fetchone()[0]
+    if latest and run_date < latest:
+        raise ValueError(f"run {run_date} is not newer than the last ingested run {latest}")
+    if latest and run_date == latest and not partial:
+        raise ValueError(f"run {run_date} is already ingested; add retry or sample output with --partial")
+
+    start_ts = time.perf_counter()
+    conn.execute("BEGIN")
+    try:
+        listings = load_snapshot(conn, json_paths)
+
+        counts = {GONE: 0}
+
+        # Retry output for the latest run: listings it found were only
+        # missing from the first pass, so their gone event is taken back
+        if run_date == latest:
+            cur = conn.execute("""
+                DELETE FROM events
+                WHERE run_date = ? AND kind = ?
+                AND (yard_id, stock_no) IN (SELECT yard_id, stock_no FROM temp.snapshot)
+            """, (run_date, GONE))
+            counts[GONE] = -cur.rowcount
+
+        # Moves are read before listings are updated
+        for kind, column in ((PRICE, "price"), (MILEAGE, "mileage")):
+            cur = conn.execute(f"""
+                INSERT INTO events (yard_id, stock_no, run_date, kind, old_value, new_value)
+                SELECT l.yard_id, l.stock_no, ?, ?, l.{column}, s.{column}
+                FROM temp.snapshot s
+                JOIN listings l ON l.yard_id = s.yard_id AND l.stock_no = s.stock_no
+                WHERE s.{column} IS NOT NULL AND l.{column} IS NOT s.{column}
+            """, (run_date, kind))
+            counts[kind] = cur.rowcount
+
+        cur = conn.execute("""
+            INSERT INTO events (yard_id, stock_no, run_date, kind)
+            SELECT l.yard_id, l.stock_no, ?, ?
+            FROM temp.snapshot s
+            JOIN listings l ON l.yard_id = s.yard_id AND l.stock_no = s.stock_no
+            WHERE l.gone_since IS NOT NULL AND l.gone_since != ?
+        """, (run_date, BACK, run_date))
+        counts[BACK] = cur.rowcount
+
+        cur = conn.execute("""
+            INSERT INTO events (yard_id, stock_no, run_date, kind, new_value)
+            SELECT s.yard_id, s.stock_no, ?, ?, s.price
+            FROM temp.snapshot s
+            LEFT JOIN listings l ON l.yard_id = s.yard_id AND l.stock_no = s.stock_no
+            WHERE l.yard_id IS NULL
+        """, (run_date, NEW))
+        counts[NEW] = cur.rowcount
+
+        updatable = [c for c in SNAPSHOT_COLUMNS if c not in ("yard_id", "stock_no")]
+        conn.execute(f"""
+            INSERT INTO listings (yard_id, stock_no, first_seen, last_seen, {', '.join(updatable)})
+            SELECT yard_id, stock_no, ?, ?, {', '.join(updatable)} FROM temp.snapshot WHERE true
+            ON CONFLICT (yard_id, stock_no) DO UPDATE SET
+                last_seen = excluded.last_seen,
+                gone_since = NULL,
+                {', '.join(f'{c} = COALESCE(excluded.{c}, {c})' for c in updatable)}
+        """, (run_date, run_date))
+
+        if not partial:
+            conn.execute("""
+                INSERT INTO events (yard_id, stock_no, run_date, kind)
+                SELECT yard_id, stock_no, ?, ? FROM listings
+                WHERE gone_since IS NULL AND last_seen < ?
+            """, (run_date, GONE, run_date))
+            cur = conn.execute(
+                "UPDATE listings SET gone_since = ? WHERE gone_since IS NULL AND last_seen < ?",
+                (run_date, run_date)
+            )
+            counts[GONE] += cur.rowcount
+
+        # A partial ingest on the latest date adds to that run's row
+        conn.execute(
+            "INSERT INTO runs (run_date, source_path, ingested_at, listings, new, changed, gone) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (run_date) DO UPDATE SET "
+            "source_path = source_path || ',' || excluded.source_path, "
+            "ingested_at = excluded.ingested_at, "
+            "listings = listings + excluded.listings, "
+            "new = new + excluded.new, "
+            "changed = changed + excluded.changed, "
+            "gone = gone + excluded.gone",
+            (
+                run_date,
+                ",".join(json_paths),
+                time.time(),
+                listings,
+                counts[NEW],
+                counts[PRICE] + counts[MILEAGE],
+                counts[GONE],
+            )
+        )
+        conn.execute("DROP TABLE temp.snapshot")
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+
+    elapsed_sec = round(time.perf_counter() - start_ts, 2)
+    logger.info(
+        f"Ingested {run_date} | listings={listings} | new={counts[NEW]} | "
+        f"price={counts[PRICE]} | mileage={counts[MILEAGE]} | back={counts[BACK]} | "
+        f"gone={counts[GONE]} | time={elapsed_sec}s"
+    )
+    return counts
+
+def open_history(db_path=DEFAULT_DB_PATH):
+    os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode = WAL")
+    create_schema(conn)
+    return conn
+
+# ============================================================
+# QUERY
+# ============================================================
+
+def listing_timeline(conn, yard_id, stock_no, since=None, until=None):
+    listing = conn.execute(
+        "SELECT * FROM listings WHERE yard_id = ? AND stock_no = ?",
+        (yard_id, stock_no)
+    ).fetchone()
+    if listing is None:
+        return None
+
+    sql = "SELECT run_date, kind, old_value, new_value FROM events WHERE yard_id = ? AND stock_no = ?"
+    params = [yard_id, stock_no]
+    if since:
+        sql += " AND run_date >= ?"
+        params.append(since)
+    if until:
+        sql += " AND run_date <= ?"
+        params.append(until)
+    sql += " ORDER BY run_date"
+
+    return {
+        "listing": dict(listing),
+        "events": [dict(row) for row in conn.execute(sql, params)],
+    }
+
+def price_on(conn, yard_id, stock_no, run_date):
+    """Price as of run_date, replayed from the events up to that date."""
+    row = conn.execute("""
+        SELECT new_value FROM events
+        WHERE yard_id = ? AND stock_no = ? AND run_date <= ? AND kind IN (?, ?)
+        ORDER BY run_date DESC LIMIT 1
+    """, (yard_id, stock_no, run_date, NEW, PRICE)).fetchone()
+    return row[0] if row else None
+
+def changes_between(conn, since=None, until=None, kind=None, make=None, limit=1000):
+    sql = """
+        SELECT e.run_date, e.kind, e.yard_id, e.stock_no, e.old_value, e.new_value,
+               l.part_name, l.source_make, l.source_model, l.source_year
+        FROM events e
+        JOIN listings l ON l.yard_id = e.yard_id AND l.stock_no = e.stock_no
+        WHERE 1 = 1
+    """
+    params = []
+    if since:
+        sql += " AND e.run_date >= ?"
+        params.append(since)
+    if until:
+        sql += " AND e.run_date <= ?"
+        params.append(until)
+    if kind:
+        sql += " AND e.kind = ?"
+        params.append(kind)
+    if make:
+        sql += " AND l.source_make = ? COLLATE NOCASE"
+        params.append(make)
+    sql += " ORDER BY e.run_date, e.yard_id, e.stock_no LIMIT ?"
+    params.append(limit)
+
+    return [dict(row) for row in conn.execute(sql, params)]
+
+# ============================================================
+# CLI
+# ============================================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Keep listing history across runs as deltas and query it"
+    )
+    parser.add_argument("--db", default=DEFAULT_DB_PATH)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    ingest = sub.add_parser("ingest", help="apply parts_data_<date> files in date order")
+    ingest.add_argument(
+        "json_paths",
+        nargs="+",
+        help="parts files or partitioned directories; files of one date are ingested together"
+    )
+    ingest.add_argument("--date", help="run date YYYYMMDD (default: from the file name)")
+    ingest.add_argument(
+        "--partial",
+        action="store_true",
+        help="sample or retry output: do not mark missing listings as gone"
+    )
+
+    timeline = sub.add_parser("timeline", help="events for one listing")
+    timeline.add_argument("--yard", required=True)
+    timeline.add_argument("--stock", required=True)
+    timeline.add_argument("--since")
+    timeline.add_argument("--until")
+
+    changes = sub.add_parser("changes", help="events across listings in a date range")
+    changes.add_argument("--since")
+    changes.add_argument("--until")
+    changes.add_argument("--kind", choices=[NEW, PRICE, MILEAGE, GONE, BACK])
+    changes.add_argument("--make")
+    changes.add_argument("--limit", type=int, default=1000)
+
+    sub.add_parser("runs", help="ingested runs and their delta sizes")
+
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s | %(levelname)s | %(message)s"
+    )
+
+    conn = open_history(args.db)
+
+    if args.command == "ingest":
+        # Every file of one date (retry output, partitions) is one snapshot
+        runs = {}
+        for path in args.json_paths:
+            run_date = args.date or run_date_from_path(path)
+            if not run_date:
+                parser.error(f"cannot tell the run date of {path}, pass --date")
+            runs.setdefault(run_date, []).append(path)
+
+        for run_date in sorted(runs):
+            ingest_run(conn, runs[run_date], run_date, args.partial)
+        conn.close()
+        return
+
+    if args.command == "timeline":
+        rows = [listing_timeline(conn, args.yard, args.stock, args.since, args.until)]
+    elif args.command == "changes":
+        rows = changes_between(conn, args.since, args.until, args.kind, args.make, args.limit)
+    else:
+        rows = [dict(row) for row in conn.execute("SELECT * FROM runs ORDER BY run_date")]
+
+    conn.close()
+
+    for row in rows:
+        sys.stdout.write(json.dumps(row) + "\n")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+from html.parser import HTMLParser
+
+# ============================================================
+# FRAGMENT KINDS
+# ============================================================
+
+APPLICATIONS_FACET = "applications_facet"
+YARD_FACET = "yard_facet"
+SELLER = "seller"
+OLD_ITEM = "old_item"
+NEW_ROW = "new_row"
+
+# ============================================================
+# SPLITTER
+# ============================================================
+
+class FragmentSplitter(HTMLParser):
+    """
+    Incremental parser that cuts a listing page into the fragments the
+    layout parsers read, and hands each one over as soon as it closes.
+
+    Only the fragment being captured is held in memory; everything outside
+    the facets, listing items and the seller block is dropped as it streams
+    past. Fragments are rebuilt from parser events, so entities and script
+    bodies come through unchanged.
+    """
+
+    def __init__(self, on_fragment):
+        super().__init__(convert_charrefs=False)
+        self.on_fragment = on_fragment
+
+        # (kind, tag, depth of that tag, pieces) while inside a fragment
+        self.capture = None
+
+        # Where new-layout rows live: table.table.table-bordered > tbody > tr
+        self.listing_tables = 0
+        self.in_tbody = False
+        self.seen_seller = False
+
+    def start_kind(self, tag, attrs):
+        classes = set((attrs.get("class") or "").split())
+        if tag == "div" and attrs.get("id") == "applications-facet":
+            return APPLICATIONS_FACET
+        if tag == "div" and attrs.get("id") == "yard-facet":
+            return YARD_FACET
+        if tag == "form" and "list-item" in classes:
+            return OLD_ITEM
+        if tag == "tr" and self.listing_tables and self.in_tbody:
+            return NEW_ROW
+        # The new layout has one page-level seller block outside the rows
+        if "item-company-address" in classes and not self.seen_seller:
+            self.seen_seller = True
+            return SELLER
+        return None
+
+    def handle_starttag(self, tag, attrs):
+        if self.capture is not None:
+            kind, capture_tag, depth, pieces = self.capture
+            pieces.append(self.get_starttag_text())
+            if tag == capture_tag:
+                self.capture = (kind, capture_tag, depth + 1, pieces)
+            return
+
+        attrs = dict(attrs)
+        if tag == "table":
+            classes = set((attrs.get("class") or "").split())
+            if self.listing_tables or {"table", "table-bordered"} <= classes:
+                self.listing_tables += 1
+        elif tag == "tbody" and self.listing_tables:
+            self.in_tbody = True
+
+        kind = self.start_kind(tag, attrs)
+        if kind is not None:
+            self.capture = (kind, tag, 1, [self.get_starttag_text()])
+
+    def handle_startendtag(self, tag, attrs):
+        if self.capture is not None:
+            self.capture[3].append(self.get_starttag_text())
+
+    def handle_endtag(self, tag):
+        if self.capture is not None:
+            kind, capture_tag, depth, pieces = self.capture
+            pieces.append(f"</{tag}>")
+            if tag == capture_tag:
+                depth -= 1
+                if depth == 0:
+                    self.capture = None
+                    self.on_fragment(kind, "".join(pieces))
+                    return
+                self.capture = (kind, capture_tag, depth, pieces)
+            return
+
+        if tag == "tbody":
+            self.in_tbody = False
+        elif tag == "table" and self.listing_tables:
+            self.listing_tables -= 1
+
+    def handle_data(self, data):
+        if self.capture is not None:
+            self.capture[3].append(data)
+
+    def handle_entityref(self, name):
+        if self.capture is not None:
+            self.capture[3].append(f"&{name};")
+
+    def handle_charref(self, name):
+        if self.capture is not None:
+            self.capture[3].append(f"&#{name};")
+
+    def close(self):
+        super().close()
+        # A truncated page still yields the fragment it was in the middle of
+        if self.capture is not None:
+            kind, _, _, pieces = self.capture
+            self.capture = None
+            self.on_fragment(kind, "".join(pieces))
@@ -0,0 +1,330 @@
+import argparse
+import asyncio
+import hashlib
+import logging
+import mimetypes
+import os
+import sqlite3
+import time
+
+import aiohttp
+
+from .serialization import iter_json_array
+
+# ============================================================
+# CONFIG
+# ============================================================
+
+DEFAULT_IMAGE_ROOT = os.path.join("output", "images")
+
+CONCURRENCY = 8
+CHUNK_BYTES = 64 * 1024
+COMMIT_EVERY = 200
+REQUEST_TIMEOUT = 30
+
+# Temp downloads this old are left over from a harvest that died and are
+# removed when a store is opened; live ones belong to another harvest
+STALE_TMP_SECONDS = 24 * 3600
+
+OK = "ok"
+FAILED = "failed"
+
+logger = logging.getLogger("autopartsearch_scraper")
+
+# ============================================================
+# BANDWIDTH CAP
+# ============================================================
+
+class ByteBucket:
+    """Token bucket in bytes per second, shared by every download."""
+
+    def __init__(self, bytes_per_second):
+        self.rate = bytes_per_second
+        self.tokens = bytes_per_second
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def consume(self, n):
+        if not self.rate:
+            return
+
+        async with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= n
+
+            # Overdrawn: hold the lock while paying it back so others queue up
+            if self.tokens < 0:
+                await asyncio.sleep(-self.tokens / self.rate)
+
+# ============================================================
+# CONTENT-ADDRESSED STORE
+# ============================================================
+
+class ImageStore:
+    """
+    Images stored once per sha256 under objects/ab/cd/, plus a SQLite
+    index of every URL fetched and the object it resolved to.
+
+    Several harvests may share a store, so each one only ever removes the
+    temp files it created itself.
+    """
+
+    def __init__(self, root=DEFAULT_IMAGE_ROOT):
+        self.root = root
+        self.objects_dir = os.path.join(root, "objects")
+        self.tmp_dir = os.path.join(root, "tmp")
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.tmp_dir, exist_ok=True)
+
+        self.conn = sqlite3.connect(os.path.join(root, "index.sqlite"))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS urls (
+                url TEXT PRIMARY KEY,
+                sha256 TEXT,
+                status TEXT NOT NULL,
+                error TEXT,
+                fetched_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS objects (
+                sha256 TEXT PRIMARY KEY,
+                path TEXT NOT NULL,
+                bytes INTEGER NOT NULL,
+                content_type TEXT
+            );
+        """)
+        self.uncommitted = 0
+
+        self.tmp_prefix = f"{os.getpid()}-{id(self):x}-"
+        self.tmp_paths = set()
+        self.remove_stale_tmp()
+
+    def remove_stale_tmp(self):
+        cutoff = time.time() - STALE_TMP_SECONDS
+        for name in os.listdir(self.tmp_dir):
+            path = os.path.join(self.tmp_dir, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def tmp_path(self, url):
+        name = hashlib.blake2b(url.encode("utf8"), digest_size=16).hexdigest()
+        path = os.path.join(self.tmp_dir, self.tmp_prefix + name)
+        self.tmp_paths.add(path)
+        return path
+
+    def discard_tmp(self, path):
+        self.tmp_paths.discard(path)
+        if os.path.exists(path):
+            os.remove(path)
+
+    def done_urls(self):
+        return {url for (url,) in self.conn.execute("SELECT url FROM urls WHERE status = ?", (OK,))}
+
+    def object_path(self, sha256, ext):
+        return os.path.join(self.objects_dir, sha256[:2], sha256[2:4], sha256 + ext)
+
+    def has_object(self, sha256):
+        return self.conn.execute("SELECT 1 FROM objects WHERE sha256 = ?", (sha256,)).fetchone() is not None
+
+    def add_object(self, tmp_path, sha256, size, content_type):
+        """Moves a finished download into place; returns False when already stored."""
+        if self.has_object(sha256):
+            self.discard_tmp(tmp_path)
+            return False
+
+        ext = mimetypes.guess_extension((content_type or "").split(";")[0].strip()) or ""
+        path = self.object_path(sha256, ext)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(tmp_path, path)
+        self.tmp_paths.discard(tmp_path)
+
+        self.conn.execute(
+            "INSERT OR IGNORE INTO objects (sha256, path, bytes, content_type) VALUES (?, ?, ?, ?)",
+            (sha256, os.path.relpath(path, self.root), size, content_type)
+        )
+        return True
+
+    def record_url(self, url, sha256=None, error=None):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO urls (url, sha256, status, error, fetched_at) VALUES (?, ?, ?, ?, ?)",
+            (url, sha256, FAILED if error else OK, error, time.time())
+        )
+        self.uncommitted += 1
+        if self.uncommitted >= COMMIT_EVERY:
+            self.commit()
+
+    def commit(self):
+        self.conn.commit()
+        self.uncommitted = 0
+
+    def close(self):
+        self.commit()
+        self.conn.close()
+
+        # This harvest's partial downloads are simply fetched again next time
+        for path in list(self.tmp_paths):
+            self.discard_tmp(path)
+
+# ============================================================
+# DOWNLOADS
+# ============================================================
+
+def image_urls(parts):
+    """Unique image URLs from parts (PartRecords or dicts), thumbnails included."""
+    seen = set()
+    for p in parts:
+        get = p.get if isinstance(p, dict) else lambda name: getattr(p, name, None)
+        for url in [get("thumbnail"), *(get("images") or [])]:
+            if not url:
+                continue
+            if url.startswith("//"):
+                url = "https:" + url
+            if url not in seen:
+                seen.add(url)
+                yield url
+
+async def download(url, session, store, bucket, proxy, stats):
+    tmp_path = store.tmp_path(url)
+    digest = hashlib.sha256()
+    size = 0
+
+    # Any failure, including a full disk or unwritable store, fails this URL
+    # only; the worker moves on to the next one
+    try:
+        async with session.get(url, proxy=proxy) as response:
+            response.raise_for_status()
+            content_type = response.headers.get("Content-Type")
+
+            with open(tmp_path, "wb") as f:
+                async for chunk in response.content.iter_chunked(CHUNK_BYTES):
+                    await bucket.consume(len(chunk))
+                    digest.update(chunk)
+                    f.write(chunk)
+                    size += len(chunk)
+
+        sha256 = digest.hexdigest()
+        stored = store.add_object(tmp_path, sha256, size, content_type)
+
+    except Exception as e:
+        try:
+            store.discard_tmp(tmp_path)
+        except OSError:
+            pass
+        store.record_url(url, error=f"{type(e).__name__}: {e}")
+        stats["failed"] += 1
+        return
+
+    if stored:
+        stats["stored"] += 1
+        stats["stored_bytes"] += size
+    else:
+        stats["duplicates"] += 1
+
+    store.record_url(url, sha256)
+    stats["downloaded_bytes"] += size
+
+async def harvest(urls, root=DEFAULT_IMAGE_ROOT, concurrency=CONCURRENCY, max_bytes_per_second=None, proxy=None):
+    """
+    Downloads every URL not already in the index, concurrency at a time
+    and within max_bytes_per_second overall. Returns counters.
+    """
+    store = ImageStore(root)
+    done = store.done_urls()
+    bucket = ByteBucket(max_bytes_per_second)
+
+    stats = {
+        "skipped": 0,
+        "stored": 0,
+        "duplicates": 0,
+        "failed": 0,
+        "downloaded_bytes": 0,
+        "stored_bytes": 0,
+    }
+
+    queue = asyncio.Queue(maxsize=concurrency * 4)
+
+    async def worker(session):
+        while True:
+            url = await queue.get()
+            if url is None:
+                break
+            await download(url, session, store, bucket, proxy, stats)
+
+    start_ts = time.perf_counter()
+    # No total timeout: a throttled download may legitimately take a while
+    timeout = aiohttp.ClientTimeout(total=None, sock_connect=REQUEST_TIMEOUT, sock_read=REQUEST_TIMEOUT)
+    connector = aiohttp.TCPConnector(limit=concurrency)
+
+    async def produce(workers):
+        for url in urls:
+            if url in done:
+                stats["skipped"] += 1
+                continue
+            await queue.put(url)
+
+        for _ in workers:
+            await queue.put(None)
+
+    try:
+        async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
+            workers = [asyncio.create_task(worker(session)) for _ in range(concurrency)]
+            producer = asyncio.create_task(produce(workers))
+
+            # A worker that dies (say, the index itself failing) ends the
+            # harvest instead of leaving the producer blocked on a full queue
+            tasks = [producer, *workers]
+            try:
+                await asyncio.gather(*tasks)
+            finally:
+                for task in tasks:
+                    task.cancel()
+    finally:
+        store.close()
+
+    stats["seconds"] = round(time.perf_counter() - start_ts, 2)
+    logger.info(
+        f"Images | stored={stats['stored']} | duplicates={stats['duplicates']} | "
+        f"skipped={stats['skipped']} | failed={stats['failed']} | "
+        f"downloaded_bytes={stats['downloaded_bytes']} | time={stats['seconds']}s"
+    )
+    return stats
+
+# ============================================================
+# CLI
+# ============================================================
+
+def iter_parts(json_paths):
+    for path in json_paths:
+        yield from iter_json_array(path)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Download listing images into a content-addressed store"
+    )
+    parser.add_argument("json_paths", nargs="+", help="parts_data_<date>.json files")
+    parser.add_argument("--root", default=DEFAULT_IMAGE_ROOT)
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY)
+    parser.add_argument("--max-mbps", type=float, help="overall bandwidth cap in megabits per second")
+    parser.add_argument("--proxy", help="proxy URL for image requests")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s | %(levelname)s | %(message)s"
+    )
+
+    asyncio.run(harvest(
+        image_urls(iter_parts(args.json_paths)),
+        args.root,
+        args.concurrency,
+        args.max_mbps * 125_000 if args.max_mbps else None,
+        args.proxy
+    ))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+import asyncio
+import math
+import re
+
+# ============================================================
+# CONFIG
+# ============================================================
+
+# Query parameters catalogs commonly read as a page size, tried in order
+PAGE_SIZE_PARAMS = ("pagesize", "pageSize", "resultsperpage", "perpage", "limit")
+
+# Asked for on the probe; a catalog that caps it lower serves its cap
+PROBE_SIZE = 200
+
+# Records that come up short of their reported total under the negotiated
+# size before the run falls back to the default size
+MAX_MISMATCHES = 3
+
+UNKNOWN = "unknown"
+ACCEPTED = "accepted"
+UNSUPPORTED = "unsupported"
+
+def facet_count(text):
+    """Listing count shown in a facet entry, e.g. '2.5L, 4 cyl (7)' -> 7."""
+    m = re.search(r"\((\d+)\)\s*$", text or "")
+    return int(m.group(1)) if m else None
+
+def reported_total(applications, application_meta):
+    """
+    Listing count for application_meta read from the applications facet of
+    a fetched page, or None when the page does not list it.
+
+    The count has to come from the live page: application_meta may come
+    from the facet cache, and a count stored days ago is no basis for
+    judging a probe or a short listing.
+    """
+    if not application_meta:
+        return None
+    app_id = application_meta.get("application_id")
+    for app in applications or []:
+        if app.get("application_id") == app_id:
+            return facet_count(app.get("application_text"))
+    return None
+
+def sized_url(base_url, page_param):
+    param, size = page_param
+    return f"{base_url}{'&' if '?' in base_url else '?'}{param}={size}"
+
+def judge_probe(rows, asked, total, default_rows):
+    """
+    Page size the catalog actually served on a probe, or None when the
+    parameter was ignored.
+
+    A full page of asked rows (or every row, when total is smaller) means
+    the parameter works as asked. Fewer rows, but more than the default,
+    means the catalog caps it at that many.
+    """
+    if rows <= default_rows or rows > asked:
+        return None
+    if rows == min(asked, total):
+        return asked
+    return rows
+
+# ============================================================
+# NEGOTIATOR
+# ============================================================
+
+class PageSizeNegotiator:
+    """
+    Run-wide page size for listing pagination.
+
+    The first record with a reported total larger than one default page is
+    probed with each parameter in turn. The first parameter that returns
+    more rows than the default (and agrees with the total) is used for every
+    later record; if none does, pagination stays at the default size.
+    """
+
+    def __init__(self, params=PAGE_SIZE_PARAMS, probe_size=PROBE_SIZE):
+        self.params = params
+        self.probe_size = probe_size
+        self.state = UNKNOWN
+        self.param = None
+        self.size = None
+        self.lock = asyncio.Lock()
+
+        self.default_rows = 0
+        self.probes = 0
+        self.mismatches = 0
+        self.sized_records = 0
+        self.sized_pages = 0
+        self.default_pages_estimate = 0
+
+    @property
+    def page_param(self):
+        return (self.param, self.size) if self.state == ACCEPTED else None
+
+    def note_default_page(self, rows):
+        # Only the last page of a listing is short, so the largest page seen
+        # is the default size
+        self.default_rows = max(self.default_rows, rows)
+
+    def accept(self, param, size):
+        self.state = ACCEPTED
+        self.param = param
+        self.size = size
+
+    def reject(self):
+        self.state = UNSUPPORTED
+
+    def record(self, rows, pages, total):
+        """Books one finished sized listing. Returns True if it fell short of total."""
+        self.sized_records += 1
+        self.sized_pages += pages
+        if self.default_rows:
+            self.default_pages_estimate += math.ceil(rows / self.default_rows)
+
+        if total and rows < total:
+            self.mismatches += 1
+            if self.mismatches >= MAX_MISMATCHES and self.state == ACCEPTED:
+                self.reject()
+            return True
+        return False
+
+    def stats(self):
+        return {
+            "state": self.state,
+            "param": self.param,
+            "size": self.size,
+            "default_size": self.default_rows,
+            "probes": self.probes,
+            "sized_records": self.sized_records,
+            "sized_pages": self.sized_pages,
+            "default_pages_estimate": self.default_pages_estimate,
+            "requests_saved": self.default_pages_estimate - self.sized_pages - self.probes,
+            "mismatches": self.mismatches,
+        }
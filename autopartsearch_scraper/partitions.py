@@ -0,0 +1,157 @@
+import hashlib
+import os
+import re
+import shutil
+
+from . import serialization
+
+# ============================================================
+# CONFIG
+# ============================================================
+
+# Partition level -> (output field, CatalogRecord attribute)
+LEVELS = {
+    "make": ("source_make", "make"),
+    "year": ("source_year", "year"),
+    "slug": ("source_part_slug", "part_slug"),
+}
+
+# Rows with no source record (or an empty value) land here
+UNKNOWN = "_unknown"
+
+MANIFEST_NAME = "manifest.json"
+
+def parse_levels(value):
+    """'make,year' or 'make,year,slug' -> ("make", "year", ...)."""
+    levels = tuple(v.strip() for v in value.split(",") if v.strip())
+    unknown = [v for v in levels if v not in LEVELS]
+    if unknown or not levels:
+        raise ValueError(f"partition levels must be drawn from {', '.join(LEVELS)}, got {value!r}")
+    return levels
+
+def safe_segment(value):
+    if value is None or str(value).strip() == "":
+        return UNKNOWN
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", str(value).strip()) or UNKNOWN
+
+def partition_value(value):
+    # None and blank both mean unknown, so they share one partition
+    if value is None or str(value).strip() == "":
+        return None
+    return str(value).strip()
+
+def partition_values(part, levels):
+    src = part.source
+    return tuple(
+        partition_value(getattr(src, LEVELS[level][1], None) if src else None)
+        for level in levels
+    )
+
+def segment_names(values):
+    """
+    value -> directory name for one level. Values that safe_segment maps to
+    the same name (say "LAND ROVER" and "LAND_ROVER") each get a short hash
+    of the value appended, so they never share a file.
+    """
+    by_segment = {}
+    for value in values:
+        by_segment.setdefault(safe_segment(value), []).append(value)
+
+    names = {}
+    for segment, same in by_segment.items():
+        for value in same:
+            if len(same) == 1:
+                names[value] = segment
+            else:
+                names[value] = f"{segment}~{hashlib.sha1(str(value).encode('utf8')).hexdigest()[:8]}"
+    return names
+
+# ============================================================
+# WRITE
+# ============================================================
+
+def write_partitions(root, parts, levels, suffix=".json", default=None, extra=None):
+    """
+    Writes parts (PartRecords) under root as field=value/.../part<suffix>
+    files, one per partition, plus a manifest.json of row counts and sizes.
+
+    The directory is built next to root and swapped in at the end, so a
+    rerun never leaves partitions from an earlier write behind.
+    """
+    groups = {}
+    for p in parts:
+        groups.setdefault(partition_values(p, levels), []).append(p)
+
+    names = [segment_names({values[i] for values in groups}) for i in range(len(levels))]
+
+    tmp_root = f"{root}.tmp"
+    shutil.rmtree(tmp_root, ignore_errors=True)
+
+    entries = []
+    for values in sorted(groups, key=lambda v: tuple(str(x) for x in v)):
+        rel_dir = os.path.join(*(
+            f"{LEVELS[level][0]}={names[i][value]}"
+            for i, (level, value) in enumerate(zip(levels, values))
+        ))
+        rel_path = os.path.join(rel_dir, f"part{suffix}")
+        path = os.path.join(tmp_root, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        rows = serialization.write_json_array(path, groups[values], default=default)
+        entries.append({
+            "path": rel_path.replace(os.sep, "/"),
+            "values": {LEVELS[level][0]: value for level, value in zip(levels, values)},
+            "rows": rows,
+            "bytes": os.path.getsize(path),
+        })
+
+    manifest = {
+        "partition_by": [LEVELS[level][0] for level in levels],
+        "format": suffix,
+        "total_rows": sum(e["rows"] for e in entries),
+        "total_bytes": sum(e["bytes"] for e in entries),
+        "partitions": entries,
+    }
+    if extra:
+        manifest.update(extra)
+
+    os.makedirs(tmp_root, exist_ok=True)
+    serialization.dump(manifest, os.path.join(tmp_root, MANIFEST_NAME))
+
+    shutil.rmtree(root, ignore_errors=True)
+    os.replace(tmp_root, root)
+    return manifest
+
+# ============================================================
+# READ
+# ============================================================
+
+def load_manifest(root):
+    return serialization.load(os.path.join(root, MANIFEST_NAME))
+
+def select_partitions(root, **filters):
+    """
+    Paths of the partitions matching every filter, e.g.
+    select_partitions(root, source_make="Ford", source_year="2015").
+    Values compare case-insensitively as strings.
+    """
+    wanted = {k: str(v).lower() for k, v in filters.items() if v is not None}
+    paths = []
+    for entry in load_manifest(root)["partitions"]:
+        values = entry["values"]
+        if all(str(values.get(k)).lower() == v for k, v in wanted.items()):
+            paths.append(os.path.join(root, entry["path"]))
+    return paths
+
+def expand_paths(paths):
+    """
+    Expands partitioned output (a directory or its manifest.json) into its
+    partition files; other paths pass through unchanged.
+    """
+    for path in paths:
+        if os.path.basename(path) == MANIFEST_NAME:
+            path = os.path.dirname(path) or "."
+        if os.path.isdir(path):
+            yield from select_partitions(path)
+        else:
+            yield path
@@ -0,0 +1,263 @@
+import argparse
+import json
+import logging
+import os
+import time
+
+import numpy as np
+
+from .partitions import MANIFEST_NAME, expand_paths
+from .serialization import iter_json_array, open_text
+
+# ============================================================
+# CONFIG
+# ============================================================
+
+CHUNK_ROWS = 500_000
+
+QUANTILES = [0.1, 0.25, 0.5, 0.75, 0.9]
+
+logger = logging.getLogger("autopartsearch_analytics")
+
+# ============================================================
+# TYPED COLUMNS
+# ============================================================
+
+def to_float_column(raw):
+    """Parses "1,250.00" / "$800" / "87,000" strings to float64, NaN when invalid."""
+    arr = np.asarray(raw, dtype=str)
+    cleaned = np.char.strip(np.char.replace(np.char.replace(arr, ",", ""), "$", ""))
+
+    # A value is numeric when it is all digits once a single dot is removed
+    valid = np.char.isdigit(np.char.replace(cleaned, ".", "", count=1))
+
+    out = np.full(arr.shape, np.nan, dtype=np.float64)
+    out[valid] = cleaned[valid].astype(np.float64)
+    return out
+
+class Codebook:
+    """Maps repeated labels to dense int32 codes."""
+
+    def __init__(self):
+        self.codes = {}
+        self.labels = []
+
+    def code(self, label):
+        c = self.codes.get(label)
+        if c is None:
+            c = len(self.labels)
+            self.codes[label] = c
+            self.labels.append(label)
+        return c
+
+def load_columns(json_paths, chunk_rows=CHUNK_ROWS):
+    groups = Codebook()
+    yards = Codebook()
+
+    chunks = {
+        "price": [],
+        "mileage": [],
+        "distance_miles": [],
+        "group": [],
+        "yard": [],
+    }
+
+    raw_price, raw_mileage, raw_distance = [], [], []
+    group_codes, yard_codes = [], []
+
+    def flush():
+        if not raw_price:
+            return
+        # One vectorized conversion per chunk instead of per-row parsing
+        chunks["price"].append(to_float_column(raw_price))
+        chunks["mileage"].append(to_float_column(raw_mileage))
+        chunks["distance_miles"].append(to_float_column(raw_distance))
+        chunks["group"].append(np.asarray(group_codes, dtype=np.int32))
+        chunks["yard"].append(np.asarray(yard_codes, dtype=np.int32))
+        for buf in (raw_price, raw_mileage, raw_distance, group_codes, yard_codes):
+            buf.clear()
+
+    for path in expand_paths(json_paths):
+        for part in iter_json_array(path):
+            raw_price.append(part.get("price") or "")
+            raw_mileage.append(part.get("mileage") or "")
+            raw_distance.append(part.get("distance_miles") or "")
+            group_codes.append(groups.code((
+                part.get("source_make"),
+                part.get("source_model"),
+                part.get("part_name"),
+                part.get("grade"),
+            )))
+            yard_codes.append(yards.code(part.get("yard_id")))
+
+            if len(raw_price) >= chunk_rows:
+                flush()
+
+    flush()
+
+    columns = {}
+    for name, parts in chunks.items():
+        if parts:
+            columns[name] = np.concatenate(parts)
+        else:
+            columns[name] = np.empty(0, dtype=np.int32 if name in ("group", "yard") else np.float64)
+
+    return columns, groups.labels, yards.labels
+
+# ============================================================
+# GROUPED DISTRIBUTIONS
+# ============================================================
+
+def grouped_distribution(values, codes, n_groups):
+    """Count, mean, min/max and QUANTILES of values per group code, NaNs ignored."""
+    valid = ~np.isnan(values)
+    v = values[valid]
+    c = codes[valid]
+
+    order = np.lexsort((v, c))
+    v = v[order]
+    c = c[order]
+
+    counts = np.bincount(c, minlength=n_groups)
+    sums = np.bincount(c, weights=v, minlength=n_groups)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1])).astype(np.int64)
+    has = counts > 0
+
+    stats = {
+        "count": counts,
+        "mean": np.divide(sums, counts, out=np.full(n_groups, np.nan), where=has),
+        "min": np.full(n_groups, np.nan),
+        "max": np.full(n_groups, np.nan),
+    }
+
+    if len(v):
+        stats["min"][has] = v[starts[has]]
+        stats["max"][has] = v[starts[has] + counts[has] - 1]
+
+    # Linear interpolation on each group's sorted slice, all groups at once
+    for q in QUANTILES:
+        out = np.full(n_groups, np.nan)
+        if len(v):
+            pos = starts[has] + q * (counts[has] - 1)
+            lo = np.floor(pos).astype(np.int64)
+            hi = np.ceil(pos).astype(np.int64)
+            out[has] = v[lo] + (v[hi] - v[lo]) * (pos - lo)
+        stats[f"p{int(q * 100)}"] = out
+
+    return stats
+
+def stats_row(stats, i):
+    row = {}
+    for name, arr in stats.items():
+        value = arr[i]
+        if name == "count":
+            row[name] = int(value)
+        else:
+            row[name] = None if np.isnan(value) else round(float(value), 2)
+    return row
+
+def summarize(columns, group_labels, yard_labels):
+    n_groups = len(group_labels)
+    n_yards = len(yard_labels)
+
+    price_by_group = grouped_distribution(columns["price"], columns["group"], n_groups)
+    mileage_by_group = grouped_distribution(columns["mileage"], columns["group"], n_groups)
+
+    listings_by_group = np.bincount(columns["group"], minlength=n_groups)
+
+    groups = []
+    for i, (make, model, part_name, grade) in enumerate(group_labels):
+        groups.append({
+            "make": make,
+            "model": model,
+            "part_name": part_name,
+            "grade": grade,
+            "listings": int(listings_by_group[i]),
+            "price": stats_row(price_by_group, i),
+            "mileage": stats_row(mileage_by_group, i),
+        })
+
+    price_by_yard = grouped_distribution(columns["price"], columns["yard"], n_yards)
+    distance_by_yard = grouped_distribution(columns["distance_miles"], columns["yard"], n_yards)
+    listings_by_yard = np.bincount(columns["yard"], minlength=n_yards)
+
+    yards = []
+    for i, yard_id in enumerate(yard_labels):
+        yards.append({
+            "yard_id": yard_id,
+            "listings": int(listings_by_yard[i]),
+            "price": stats_row(price_by_yard, i),
+            "distance_miles": stats_row(distance_by_yard, i)["min"],
+        })
+
+    groups.sort(key=lambda g: g["listings"], reverse=True)
+    yards.sort(key=lambda y: y["listings"], reverse=True)
+
+    return {
+        "listings": int(len(columns["price"])),
+        "groups": groups,
+        "yards": yards,
+    }
+
+# ============================================================
+# CLI
+# ============================================================
+
+def default_out_path(input_path):
+    """analytics_<stem>.json next to input_path, a file or a partitioned directory."""
+    input_path = input_path.rstrip("/\\")
+    if os.path.basename(input_path) == MANIFEST_NAME:
+        input_path = os.path.dirname(input_path) or "."
+    stem = os.path.basename(os.path.abspath(input_path))
+    for suffix in (".json.gz", ".json.zst", ".json"):
+        if stem.endswith(suffix):
+            stem = stem[:-len(suffix)]
+            break
+    return os.path.join(os.path.dirname(input_path), f"analytics_{stem}.json")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Price, mileage and distance analytics over scraped parts data"
+    )
+    parser.add_argument(
+        "json_paths",
+        nargs="+",
+        help="parts_data_<date>.json files (.gz/.zst too) or partitioned output directories"
+    )
+    parser.add_argument(
+        "--out",
+        help="summary JSON path, compressed by extension (default: analytics_<input>.json next to the first input)"
+    )
+    parser.add_argument("--columns-out", help="also save the typed columns as .npz")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s | %(levelname)s | %(message)s"
+    )
+
+    start_ts = time.perf_counter()
+    columns, group_labels, yard_labels = load_columns(args.json_paths)
+    load_sec = round(time.perf_counter() - start_ts, 2)
+    logger.info(f"Loaded {len(columns['price'])} listings in {load_sec}s")
+
+    if args.columns_out:
+        np.savez(args.columns_out, **columns)
+        logger.info(f"Saved typed columns to {args.columns_out}")
+
+    start_ts = time.perf_counter()
+    summary = summarize(columns, group_labels, yard_labels)
+    summary_sec = round(time.perf_counter() - start_ts, 2)
+    logger.info(
+        f"Summarized {len(summary['groups'])} groups and "
+        f"{len(summary['yards'])} yards in {summary_sec}s"
+    )
+
+    out_path = args.out or default_out_path(args.json_paths[0])
+    with open_text(out_path, "w") as f:
+        json.dump(summary, f, indent=2)
+
+    logger.info(f"Saved analytics summary to {out_path}")
+
+if __name__ == "__main__":
+    main()
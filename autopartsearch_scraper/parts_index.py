@@ -0,0 +1,380 @@
+import argparse
+import json
+import logging
+import os
+import re
+import sqlite3
+import sys
+import time
+
+from .serialization import iter_json_array
+
+# ============================================================
+# CONFIG
+# ============================================================
+
+DEFAULT_DB_PATH = os.path.join("output", "parts_index.sqlite")
+
+BATCH_SIZE = 5000
+
+logger = logging.getLogger("autopartsearch_index")
+
+# ============================================================
+# VALUE HELPERS
+# ============================================================
+
+def parse_number(value):
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return value
+
+    cleaned = re.sub(r"[^0-9.]", "", str(value))
+    if not cleaned or cleaned.count(".") > 1:
+        return None
+    return float(cleaned)
+
+# ============================================================
+# SCHEMA
+# ============================================================
+
+COLUMNS = [
+    "vin",
+    "yard_id",
+    "stock_no",
+    "source_make",
+    "source_model",
+    "source_year",
+    "source_part_name",
+    "source_part_slug",
+    "part_name",
+    "price",
+    "price_raw",
+    "mileage",
+    "distance_miles",
+    "grade",
+    "seller",
+    "seller_city",
+    "seller_state",
+    "detail_url",
+    "run_timestamp",
+    "show_info",
+    "doc",
+    "listing_key",
+]
+
+INDEXES = {
+    "idx_parts_vin": "vin",
+    "idx_parts_yard": "yard_id",
+    "idx_parts_vehicle": "source_make, source_model, source_year",
+    "idx_parts_part_name": "part_name COLLATE NOCASE",
+    "idx_parts_price": "price",
+    "idx_parts_distance": "distance_miles",
+}
+
+def has_fts5(conn):
+    try:
+        conn.execute("CREATE VIRTUAL TABLE temp.fts5_probe USING fts5(x)")
+        conn.execute("DROP TABLE temp.fts5_probe")
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+def create_schema(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS parts (
+            id INTEGER PRIMARY KEY,
+            vin TEXT,
+            yard_id TEXT,
+            stock_no TEXT,
+            source_make TEXT,
+            source_model TEXT,
+            source_year TEXT,
+            source_part_name TEXT,
+            source_part_slug TEXT,
+            part_name TEXT,
+            price REAL,
+            price_raw TEXT,
+            mileage INTEGER,
+            distance_miles REAL,
+            grade TEXT,
+            seller TEXT,
+            seller_city TEXT,
+            seller_state TEXT,
+            detail_url TEXT,
+            run_timestamp TEXT,
+            show_info TEXT,
+            doc TEXT,
+            listing_key TEXT
+        )
+    """)
+
+    # Indexes built before this key existed have no column for it
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(parts)")}
+    if "listing_key" not in columns:
+        conn.execute("ALTER TABLE parts ADD COLUMN listing_key TEXT")
+
+    # Kept through bulk loads so reloading a file replaces its rows
+    conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_parts_listing ON parts (listing_key)")
+
+    if has_fts5(conn):
+        conn.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS parts_fts
+            USING fts5(show_info, content='parts', content_rowid='id')
+        """)
+    else:
+        logger.warning("SQLite build has no FTS5, text search falls back to LIKE")
+
+def fts_enabled(conn):
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE name = 'parts_fts'"
+    ).fetchone()
+    return row is not None
+
+# ============================================================
+# BULK LOAD
+# ============================================================
+
+def listing_key(part):
+    """One row per listing per run: yard + stock number, else the detail URL."""
+    run_ts = part.get("run_timestamp") or ""
+    if part.get("yard_id") and part.get("stock_no"):
+        return f"{run_ts}|{part['yard_id']}|{part['stock_no']}"
+    if part.get("detail_url"):
+        return f"{run_ts}|{part['detail_url']}"
+    return None
+
+def to_row(part):
+    mileage = parse_number(part.get("mileage"))
+    return (
+        part.get("vin"),
+        part.get("yard_id"),
+        part.get("stock_no"),
+        part.get("source_make"),
+        part.get("source_model"),
+        part.get("source_year"),
+        part.get("source_part_name"),
+        part.get("source_part_slug"),
+        part.get("part_name"),
+        parse_number(part.get("price")),
+        part.get("price"),
+        int(mileage) if mileage is not None else None,
+        parse_number(part.get("distance_miles")),
+        part.get("grade"),
+        part.get("seller"),
+        part.get("seller_city"),
+        part.get("seller_state"),
+        part.get("detail_url"),
+        part.get("run_timestamp"),
+        part.get("show_info"),
+        json.dumps(part, separators=(",", ":")),
+        listing_key(part),
+    )
+
+YARD_FIELDS = ["seller", "seller_city", "seller_state", "seller_phone", "address"]
+
+def load_yards(yards_paths):
+    yards = {}
+    for path in yards_paths or []:
+        for yard in iter_json_array(path):
+            yards[yard["yard_id"]] = yard
+    return yards
+
+def build_index(json_paths, db_path=DEFAULT_DB_PATH, yards_paths=None):
+    os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode = MEMORY")
+    conn.execute("PRAGMA synchronous = OFF")
+    create_schema(conn)
+
+    # Indexes are rebuilt once after the load instead of per insert
+    for name in INDEXES:
+        conn.execute(f"DROP INDEX IF EXISTS {name}")
+
+    insert_sql = (
+        f"INSERT OR REPLACE INTO parts ({', '.join(COLUMNS)}) "
+        f"VALUES ({', '.join('?' for _ in COLUMNS)})"
+    )
+
+    # Split output keeps seller details in yards_<date>.json, join them back
+    yards = load_yards(yards_paths)
+
+    total = 0
+    start_ts = time.perf_counter()
+
+    for path in json_paths:
+        loaded = 0
+        batch = []
+
+        for part in iter_json_array(path):
+            yard = yards.get(part.get("yard_id"))
+            if yard and "seller" not in part:
+                part.update({k: yard.get(k) for k in YARD_FIELDS})
+
+            batch.append(to_row(part))
+            if len(batch) >= BATCH_SIZE:
+                conn.executemany(insert_sql, batch)
+                loaded += len(batch)
+                batch = []
+
+        if batch:
+            conn.executemany(insert_sql, batch)
+            loaded += len(batch)
+
+        conn.commit()
+        total += loaded
+        logger.info(f"Loaded {loaded} parts from {path}")
+
+    for name, columns in INDEXES.items():
+        conn.execute(f"CREATE INDEX {name} ON parts ({columns})")
+
+    if fts_enabled(conn):
+        conn.execute("INSERT INTO parts_fts(parts_fts) VALUES ('rebuild')")
+
+    conn.execute("ANALYZE")
+    conn.commit()
+    conn.close()
+
+    elapsed_sec = round(time.perf_counter() - start_ts, 2)
+    logger.info(f"Indexed {total} parts into {db_path} in {elapsed_sec}s")
+
+    return total
+
+# ============================================================
+# QUERY
+# ============================================================
+
+def query_parts(
+        conn,
+        vin=None,
+        yard_id=None,
+        make=None,
+        model=None,
+        year=None,
+        part=None,
+        min_price=None,
+        max_price=None,
+        max_distance=None,
+        text=None,
+        limit=100
+    ):
+
+    where = []
+    params = []
+
+    if vin:
+        where.append("p.vin = ?")
+        params.append(vin)
+    if yard_id:
+        where.append("p.yard_id = ?")
+        params.append(yard_id.upper())
+    if make:
+        where.append("p.source_make = ?")
+        params.append(make)
+    if model:
+        where.append("p.source_model = ?")
+        params.append(model)
+    if year:
+        where.append("p.source_year = ?")
+        params.append(str(year))
+    if part:
+        # A NOCASE range instead of LIKE '%x%', so idx_parts_part_name is used
+        low = part.lower()
+        high = low[:-1] + chr(ord(low[-1]) + 1)
+        where.append("p.part_name COLLATE NOCASE >= ? AND p.part_name COLLATE NOCASE < ?")
+        params.extend([low, high])
+    if min_price is not None:
+        where.append("p.price >= ?")
+        params.append(min_price)
+    if max_price is not None:
+        where.append("p.price <= ?")
+        params.append(max_price)
+    if max_distance is not None:
+        where.append("p.distance_miles <= ?")
+        params.append(max_distance)
+
+    sql = "SELECT p.doc FROM parts p"
+
+    if text:
+        if fts_enabled(conn):
+            sql += " JOIN parts_fts f ON f.rowid = p.id"
+            where.append("parts_fts MATCH ?")
+            params.append(text)
+        else:
+            where.append("p.show_info LIKE ?")
+            params.append(f"%{text}%")
+
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+
+    sql += " ORDER BY p.price IS NULL, p.price LIMIT ?"
+    params.append(limit)
+
+    return [json.loads(doc) for (doc,) in conn.execute(sql, params)]
+
+# ============================================================
+# CLI
+# ============================================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Index scraped parts data into SQLite and query it"
+    )
+    parser.add_argument("--db", default=DEFAULT_DB_PATH)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build = sub.add_parser("build", help="load parts_data_<date>.json files")
+    build.add_argument("json_paths", nargs="+")
+    build.add_argument("--yards", nargs="*", help="yards_<date>.json seller dimension files")
+
+    query = sub.add_parser("query", help="search the index")
+    query.add_argument("--vin")
+    query.add_argument("--yard")
+    query.add_argument("--make")
+    query.add_argument("--model")
+    query.add_argument("--year")
+    query.add_argument("--part", help="part_name prefix, case-insensitive")
+    query.add_argument("--min-price", type=float)
+    query.add_argument("--max-price", type=float)
+    query.add_argument("--max-distance", type=float, help="miles")
+    query.add_argument("--text", help="full-text search over show_info")
+    query.add_argument("--limit", type=int, default=100)
+
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s | %(levelname)s | %(message)s"
+    )
+
+    if args.command == "build":
+        build_index(args.json_paths, args.db, args.yards)
+        return
+
+    conn = sqlite3.connect(args.db)
+    start_ts = time.perf_counter()
+    rows = query_parts(
+        conn,
+        vin=args.vin,
+        yard_id=args.yard,
+        make=args.make,
+        model=args.model,
+        year=args.year,
+        part=args.part,
+        min_price=args.min_price,
+        max_price=args.max_price,
+        max_distance=args.max_distance,
+        text=args.text,
+        limit=args.limit
+    )
+    elapsed_ms = round((time.perf_counter() - start_ts) * 1000, 1)
+    conn.close()
+
+    for row in rows:
+        sys.stdout.write(json.dumps(row) + "\n")
+
+    logger.info(f"{len(rows)} rows in {elapsed_ms} ms")
+
+if __name__ == "__main__":
+    main()
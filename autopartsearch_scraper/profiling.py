@@ -0,0 +1,160 @@
+import cProfile
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import nullcontext
+
+# ============================================================
+# STAGE TIMER
+# ============================================================
+
+_DISABLED = nullcontext()
+
+class _Stage:
+    __slots__ = ("timer", "name", "start")
+
+    def __init__(self, timer, name):
+        self.timer = timer
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.timer.add(self.name, time.perf_counter() - self.start)
+        return False
+
+class StageTimer:
+    """
+    Cumulative and per-call wall time per named stage.
+
+    Disabled by default: stage() then hands back one shared nullcontext, so
+    the instrumented hot paths pay a single attribute check per call.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.started_at = None
+        # name -> [calls, total_seconds, max_seconds]
+        self.stats = {}
+
+    def enable(self):
+        self.enabled = True
+        self.started_at = time.perf_counter()
+
+    def stage(self, name):
+        if not self.enabled:
+            return _DISABLED
+        return _Stage(self, name)
+
+    def add(self, name, elapsed):
+        entry = self.stats.get(name)
+        if entry is None:
+            self.stats[name] = [1, elapsed, elapsed]
+            return
+        entry[0] += 1
+        entry[1] += elapsed
+        if elapsed > entry[2]:
+            entry[2] = elapsed
+
+    def report(self):
+        wall = time.perf_counter() - self.started_at if self.started_at else 0
+        rows = []
+        for name, (calls, total, longest) in sorted(self.stats.items(), key=lambda kv: -kv[1][1]):
+            rows.append({
+                "stage": name,
+                "calls": calls,
+                "total_seconds": round(total, 3),
+                "mean_ms": round(total / calls * 1000, 3),
+                "max_ms": round(longest * 1000, 3),
+                "share_of_wall": round(total / wall, 4) if wall else 0,
+            })
+        return {"wall_seconds": round(wall, 3), "stages": rows}
+
+STAGES = StageTimer()
+
+def stage(name):
+    return STAGES.stage(name)
+
+# ============================================================
+# STACK SAMPLER (FLAME GRAPHS)
+# ============================================================
+
+class StackSampler:
+    """Samples one thread's stack on an interval into collapsed-stack counts."""
+
+    def __init__(self, interval=0.005, thread_id=None):
+        self.interval = interval
+        self.thread_id = thread_id or threading.main_thread().ident
+        self.counts = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+
+            self.counts[";".join(reversed(stack))] += 1
+
+    def write_collapsed(self, path):
+        # One "frame;frame;frame count" line per stack, as flamegraph.pl expects
+        with open(path, "w", encoding="utf8") as f:
+            for stack, count in self.counts.most_common():
+                f.write(f"{stack} {count}\n")
+
+# ============================================================
+# SESSION
+# ============================================================
+
+class ProfileSession:
+    """Turns on the requested profilers for one run and writes their output."""
+
+    def __init__(self, stages=False, cprofile_path=None, flamegraph_path=None, sample_interval=0.005):
+        self.stages = stages
+        self.cprofile_path = cprofile_path
+        self.flamegraph_path = flamegraph_path
+        self.profiler = cProfile.Profile() if cprofile_path else None
+        self.sampler = StackSampler(sample_interval) if flamegraph_path else None
+
+    def __enter__(self):
+        if self.stages:
+            STAGES.enable()
+        if self.sampler:
+            self.sampler.start()
+        if self.profiler:
+            self.profiler.enable()
+        return self
+
+    def __exit__(self, *exc):
+        if self.profiler:
+            self.profiler.disable()
+            self.profiler.dump_stats(self.cprofile_path)
+        if self.sampler:
+            self.sampler.stop()
+            self.sampler.write_collapsed(self.flamegraph_path)
+        return False
+
+    def write_stage_report(self, path):
+        report = STAGES.report()
+        with open(path, "w", encoding="utf8") as f:
+            json.dump(report, f, indent=2)
+        return report
@@ -0,0 +1,195 @@
+import glob
+import heapq
+import json
+import logging
+import os
+
+from . import serialization
+
+logger = logging.getLogger("autopartsearch_scraper")
+
+# ============================================================
+# CONFIG
+# ============================================================
+
+COST_HISTORY_PATH = os.path.join("output", "record_costs.json")
+
+# Re-estimate the pending queue at most this often while costs come in
+REBALANCE_EVERY = 25
+
+DEFAULT_COST_SECONDS = 1.0
+
+# ============================================================
+# COST MODEL
+# ============================================================
+
+class CostModel:
+    """
+    Estimates a record's runtime from previous runs.
+
+    Records seen before use their own last runtime. New records fall back to
+    the mean of their (make, part_slug) group, then to the run-wide mean.
+    """
+
+    def __init__(self, history=None):
+        # key -> {"make", "part_slug", "pages_scraped", "total_bytes", "record_runtime_seconds"}
+        self.history = history or {}
+        self.group_totals = {}
+        self.global_total = [0.0, 0]
+
+        for entry in self.history.values():
+            self._add_to_means(entry)
+
+    def _add_to_means(self, entry):
+        runtime = entry.get("record_runtime_seconds")
+        if runtime is None:
+            return
+
+        group = (entry.get("make"), entry.get("part_slug"))
+        total = self.group_totals.setdefault(group, [0.0, 0])
+        total[0] += runtime
+        total[1] += 1
+
+        self.global_total[0] += runtime
+        self.global_total[1] += 1
+
+    def has_history(self, key):
+        entry = self.history.get(key)
+        return bool(entry) and entry.get("record_runtime_seconds") is not None
+
+    def estimate(self, key, make, part_slug):
+        if self.has_history(key):
+            return self.history[key]["record_runtime_seconds"]
+
+        total, count = self.group_totals.get((make, part_slug), (0.0, 0))
+        if count:
+            return total / count
+
+        total, count = self.global_total
+        if count:
+            return total / count
+
+        return DEFAULT_COST_SECONDS
+
+    def observe(self, key, make, part_slug, result):
+        if result.get("record_runtime_seconds") is None:
+            return
+
+        entry = {
+            "make": make,
+            "part_slug": part_slug,
+            "pages_scraped": result.get("pages_scraped", 0),
+            "total_bytes": result.get("total_bytes", 0),
+            "record_runtime_seconds": result["record_runtime_seconds"],
+        }
+        self.history[key] = entry
+        self._add_to_means(entry)
+
+    @classmethod
+    def load(cls, path=COST_HISTORY_PATH, temp_dirs_glob=None):
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf8") as f:
+                return cls(json.load(f))
+
+        if temp_dirs_glob:
+            return cls(bootstrap_history(temp_dirs_glob))
+
+        return cls()
+
+    def save(self, path=COST_HISTORY_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf8") as f:
+            json.dump(self.history, f)
+        os.replace(tmp_path, path)
+
+def bootstrap_history(temp_dirs_glob):
+    """Seeds the history from the newest previous run's temp shards."""
+    temp_dirs = sorted(glob.glob(temp_dirs_glob))
+    if not temp_dirs:
+        return {}
+
+    history = {}
+    for shard_path in glob.glob(os.path.join(temp_dirs[-1], "*.json*")):
+        if shard_path.endswith(".tmp"):
+            continue
+        try:
+            shard = serialization.load(shard_path)
+        except (OSError, ValueError):
+            continue
+
+        parts = shard.get("parts") or []
+        first = parts[0] if parts else {}
+        history[os.path.basename(shard_path).split(".json")[0]] = {
+            "make": first.get("source_make"),
+            "part_slug": first.get("source_part_slug"),
+            "pages_scraped": shard.get("pages_scraped", 0),
+            "total_bytes": shard.get("total_bytes", 0),
+            "record_runtime_seconds": shard.get("record_runtime_seconds"),
+        }
+
+    logger.info(f"Cost history bootstrapped from {temp_dirs[-1]} | records={len(history)}")
+    return history
+
+# ============================================================
+# SCHEDULER
+# ============================================================
+
+class RecordScheduler:
+    """
+    Hands out records longest-estimated-first (LPT).
+
+    Records without their own history are re-estimated from the costs
+    observed so far in this run every REBALANCE_EVERY completions.
+    """
+
+    def __init__(self, records, model, key_fn):
+        self.model = model
+        self.key_fn = key_fn
+        self.heap = []
+        self.observed = 0
+        self.rebuild(enumerate(records, 1))
+
+    def rebuild(self, pending):
+        self.heap = [
+            (-self.model.estimate(self.key_fn(rec), rec.make, rec.part_slug), idx, rec)
+            for idx, rec in pending
+        ]
+        heapq.heapify(self.heap)
+
+    def next(self):
+        if not self.heap:
+            return None
+
+        _, idx, rec = heapq.heappop(self.heap)
+        return idx, rec
+
+    def observe(self, rec, result):
+        self.model.observe(self.key_fn(rec), rec.make, rec.part_slug, result)
+        self.observed += 1
+
+        if self.observed % REBALANCE_EVERY == 0 and self.heap:
+            self.rebuild([(idx, rec) for _, idx, rec in self.heap])
+
+    def __len__(self):
+        return len(self.heap)
+
+class FifoScheduler:
+    """Hands out records in the given order, still feeding the cost model."""
+
+    def __init__(self, records, model, key_fn):
+        self.model = model
+        self.key_fn = key_fn
+        self.pending = list(enumerate(records, 1))
+        self.pending.reverse()
+
+    def next(self):
+        if not self.pending:
+            return None
+        return self.pending.pop()
+
+    def observe(self, rec, result):
+        self.model.observe(self.key_fn(rec), rec.make, rec.part_slug, result)
+
+    def __len__(self):
+        return len(self.pending)
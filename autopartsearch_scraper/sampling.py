@@ -0,0 +1,126 @@
+import math
+import random
+import statistics
+
+# ============================================================
+# SAMPLES
+# ============================================================
+
+def stratum_key(rec):
+    return (rec.make or "", rec.year or "", rec.part_slug or "")
+
+def stratified_sample(records, n, seed=None):
+    """
+    Picks n records spread proportionally over (make, year, part_slug).
+
+    Records are ordered by stratum, shuffled within it, and taken every
+    len/n positions from a random start. Every stratum is therefore
+    represented in proportion to its size, up to rounding, and every
+    record has the same chance of being picked.
+    """
+    if n >= len(records):
+        return list(records)
+    if n <= 0:
+        return []
+
+    rng = random.Random(seed)
+    strata = {}
+    for rec in records:
+        strata.setdefault(stratum_key(rec), []).append(rec)
+
+    ordered = []
+    for key in sorted(strata):
+        members = strata[key]
+        rng.shuffle(members)
+        ordered.extend(members)
+
+    step = len(ordered) / n
+    start = rng.random() * step
+    return [ordered[int(start + i * step)] for i in range(n)]
+
+def shuffled(records, seed=None):
+    # For time-budget runs: any prefix of a random order is a fair sample
+    out = list(records)
+    random.Random(seed).shuffle(out)
+    return out
+
+# ============================================================
+# EXTRAPOLATION
+# ============================================================
+
+def _total_estimate(values, population):
+    """Population total from a simple random sample, with a 95% interval."""
+    n = len(values)
+    mean = statistics.fmean(values)
+    total = mean * population
+
+    if n < 2:
+        return round(total), None
+
+    # Finite population correction: the interval closes as the sample nears the full run
+    fpc = max(0.0, 1 - n / population)
+    half = 1.96 * population * statistics.stdev(values) / math.sqrt(n) * math.sqrt(fpc)
+    return round(total), [round(max(0.0, total - half)), round(total + half)]
+
+def extrapolate(results, population, wall_seconds, workers):
+    """
+    Projects full-run pages, bytes and time from the records observed so far.
+
+    results are scrape_record() results. Failed records count toward the
+    failure rate but not toward the per-record means, and records loaded
+    from an existing shard count toward neither, since nothing was fetched.
+    """
+    cached = [r for r in results if r.get("from_shard")]
+    fetched = [r for r in results if not r.get("from_shard")]
+    observed = [r for r in fetched if not r.get("failed")]
+    failed = len(fetched) - len(observed)
+
+    report = {
+        "population_records": population,
+        "observed_records": len(observed),
+        "failed_records": failed,
+        "cached_records": len(cached),
+        "coverage": round(len(results) / population, 4) if population else 0,
+        "observed": {
+            "pages": sum(r["pages_scraped"] for r in observed),
+            "bytes": sum(r["total_bytes"] for r in observed),
+            "wall_seconds": round(wall_seconds, 2),
+        },
+    }
+
+    if not observed or not population:
+        return report
+
+    pages = [r["pages_scraped"] for r in observed]
+    sizes = [r["total_bytes"] for r in observed]
+    seconds = [r.get("record_runtime_seconds") or 0 for r in observed]
+
+    projected_pages, pages_ci = _total_estimate(pages, population)
+    projected_bytes, bytes_ci = _total_estimate(sizes, population)
+    projected_record_seconds, _ = _total_estimate(seconds, population)
+
+    # Busy time spread over the workers, plus a tail for the longest record
+    # running past an average one at the end. Scaling the sample's wall
+    # clock instead breaks down when it has fewer records than workers
+    lanes = max(1, min(workers, population))
+    tail = max(seconds) - statistics.fmean(seconds)
+    projected_wall = projected_record_seconds / lanes + tail
+
+    report["per_record"] = {
+        "pages_mean": round(statistics.fmean(pages), 2),
+        "bytes_mean": round(statistics.fmean(sizes)),
+        "seconds_mean": round(statistics.fmean(seconds), 2),
+    }
+    report["projected"] = {
+        "pages": projected_pages,
+        "pages_ci95": pages_ci,
+        "bytes": projected_bytes,
+        "bytes_ci95": bytes_ci,
+        "gigabytes": round(projected_bytes / 1e9, 2),
+        "failed_records": round(failed * population / len(fetched)),
+        "wall_seconds": round(projected_wall),
+        "wall_hours": round(projected_wall / 3600, 2),
+        "record_seconds": projected_record_seconds,
+        "workers": workers,
+    }
+    return report
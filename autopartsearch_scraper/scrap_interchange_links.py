@@ -1,11 +1,24 @@
+import argparse
 import requests
 import json
 import re
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
 from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 
 CATALOG_URL = "https://www.autopartsearch.com/catalog-6/vehicle/TOYOTA/2010/HIGHLANDER/engine-assembly"
 
+# Batch mode defaults
+BATCH_WORKERS = 16
+REQUEST_TIMEOUT = 15
+PROGRESS_EVERY = 100
+
 
 # -------------------------------------------------
 # APPLICATIONS PARSER
@@ -83,8 +96,8 @@ def parse_parts(soup):
 # -------------------------------------------------
 # MAIN SCRAPER
 # -------------------------------------------------
-def scrape_catalog(url):
-    response = requests.get(url, timeout=15)
+def scrape_catalog(url, session=None, timeout=REQUEST_TIMEOUT):
+    response = (session or requests).get(url, timeout=timeout)
     response.raise_for_status()
 
     soup = BeautifulSoup(response.text, "html.parser")
@@ -112,9 +125,167 @@ def save_output(data):
     print(f"Saved {len(data['parts'])} parts")
 
 
+# -------------------------------------------------
+# BATCH MODE
+# -------------------------------------------------
+def make_session(pool_size):
+    # One connection pool shared by all worker threads, sized so no
+    # worker waits for a connection; transient errors are retried here
+    retry = Retry(
+        total=3,
+        backoff_factor=1,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["GET"]
+    )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=retry)
+
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class RateLimiter:
+    """Spaces request starts at least 1/rate seconds apart across threads."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0
+        self.lock = threading.Lock()
+        self.next_at = 0.0
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self.lock:
+            now = time.monotonic()
+            start = max(now, self.next_at)
+            self.next_at = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+def iter_urls(source):
+    """Yields unique URLs from a file ("-" for stdin), one per line; # starts a comment."""
+    f = sys.stdin if source == "-" else open(source, "r", encoding="utf8")
+    seen = set()
+    try:
+        for line in f:
+            url = line.strip()
+            if not url or url.startswith("#") or url in seen:
+                continue
+            seen.add(url)
+            yield url
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def load_done_urls(out_path):
+    done = set()
+    try:
+        with open(out_path, "r", encoding="utf8") as f:
+            for line in f:
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    # Torn last line from an interrupted run
+                    continue
+                if row.get("ok"):
+                    done.add(row["url"])
+    except FileNotFoundError:
+        pass
+    return done
+
+
+def fetch_one(url, session, limiter, timeout):
+    limiter.wait()
+    start_ts = time.perf_counter()
+    try:
+        data = scrape_catalog(url, session, timeout)
+        row = {"url": url, "ok": True, **data}
+    except Exception as e:
+        row = {"url": url, "ok": False, "error": f"{type(e).__name__}: {e}"}
+    row["elapsed_ms"] = round((time.perf_counter() - start_ts) * 1000)
+    return row
+
+
+def scrape_batch(urls, out, workers=BATCH_WORKERS, rate=None, timeout=REQUEST_TIMEOUT):
+    """
+    Fetches urls on a thread pool and writes one NDJSON row per URL to out
+    as each finishes. Only workers * 2 URLs are in flight at a time, so the
+    input can be any length.
+    """
+    session = make_session(workers)
+    limiter = RateLimiter(rate)
+    stats = {"ok": 0, "failed": 0}
+    start_ts = time.perf_counter()
+
+    def write(row):
+        out.write(json.dumps(row) + "\n")
+        stats["ok" if row["ok"] else "failed"] += 1
+        done = stats["ok"] + stats["failed"]
+        if done % PROGRESS_EVERY == 0:
+            out.flush()
+            rate_now = done / (time.perf_counter() - start_ts)
+            print(f"{done} urls | failed={stats['failed']} | {rate_now:.1f} urls/s", file=sys.stderr)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        for url in urls:
+            pending.add(pool.submit(fetch_one, url, session, limiter, timeout))
+            if len(pending) >= workers * 2:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in finished:
+                    write(fut.result())
+
+        for fut in pending:
+            write(fut.result())
+
+    out.flush()
+    session.close()
+
+    stats["seconds"] = round(time.perf_counter() - start_ts, 2)
+    return stats
+
+
 # -------------------------------------------------
 # RUN
 # -------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scrape applications and parts from catalog pages")
+    parser.add_argument("--url", default=CATALOG_URL, help="single catalog page (writes applications.json/parts.json)")
+    parser.add_argument("--urls", metavar="FILE", help="batch mode: file with one catalog URL per line, - for stdin")
+    parser.add_argument("--out", help="batch NDJSON output, - for stdout (default interchange_<ts>.ndjson)")
+    parser.add_argument("--workers", type=int, default=BATCH_WORKERS)
+    parser.add_argument("--rate", type=float, help="max requests per second across all workers")
+    parser.add_argument("--timeout", type=float, default=REQUEST_TIMEOUT)
+    parser.add_argument("--resume", action="store_true", help="skip URLs already fetched ok in --out")
+    args = parser.parse_args(argv)
+
+    if not args.urls:
+        data = scrape_catalog(args.url)
+        save_output(data)
+        return
+
+    out_path = args.out or f"interchange_{datetime.now().strftime('%Y%m%d%H%M%S')}.ndjson"
+    urls = iter_urls(args.urls)
+
+    if args.resume and out_path != "-":
+        done = load_done_urls(out_path)
+        urls = (url for url in urls if url not in done)
+        print(f"Resuming, {len(done)} urls already done", file=sys.stderr)
+
+    if out_path == "-":
+        stats = scrape_batch(urls, sys.stdout, args.workers, args.rate, args.timeout)
+    else:
+        with open(out_path, "a" if args.resume else "w", encoding="utf8") as out:
+            stats = scrape_batch(urls, out, args.workers, args.rate, args.timeout)
+
+    print(
+        f"Fetched {stats['ok']} urls, {stats['failed']} failed, in {stats['seconds']}s -> {out_path}",
+        file=sys.stderr
+    )
+
+
 if __name__ == "__main__":
-    data = scrape_catalog(CATALOG_URL)
-    save_output(data)
+    main()
@@ -1,49 +1,50 @@
 from bs4 import BeautifulSoup
 import re
-import requests
-import json
 import os
 import logging
 import logging.handlers
-from datetime import datetime
+import atexit
+import queue
 import csv
+import hashlib
+from collections import OrderedDict, namedtuple
 import asyncio
 import aiohttp
 from aiohttp.client_exceptions import ClientConnectorError
 import random
+import sys
 import time
+import argparse
+import codecs
+import multiprocessing
+import threading
+
+from . import serialization
+from . import dead_letters
+from .config import DEFAULT_CSV_PATH, configure, get_config
+from .deadlines import TaskWatchdog, run_watched
+from .facet_cache import FacetCache
+from .html_stream import APPLICATIONS_FACET, OLD_ITEM, SELLER, YARD_FACET, FragmentSplitter
+from .image_harvest import DEFAULT_IMAGE_ROOT, harvest, image_urls
+from .page_size import UNKNOWN, PageSizeNegotiator, judge_probe, reported_total, sized_url
+from .partitions import parse_levels, write_partitions
+from .profiling import ProfileSession, stage
+from .record_scheduler import CostModel, FifoScheduler, RecordScheduler
+from .sampling import extrapolate, shuffled, stratified_sample
+from .work_queue import LEASE_SECONDS, LEASED, default_worker_id, open_queue
 
 # ============================================================
 # GLOBAL RUN CONFIG
 # ============================================================
 
-RUN_TS = datetime.now().strftime("%Y%m%d%H%M%S")
-RUN_DATE = datetime.now().strftime("%Y%m%d")
-
-LOG_DIR = "logs"
-RUN_ROOT = os.path.join("output", f"parts_scrape_{RUN_DATE}")
-FINAL_DIR = os.path.join(RUN_ROOT, "final")
-TEMP_DIR = os.path.join(RUN_ROOT, "temp")
-
-os.makedirs(FINAL_DIR, exist_ok=True)
-os.makedirs(TEMP_DIR, exist_ok=True)
-os.makedirs(LOG_DIR, exist_ok=True)
+# Paths, proxy and concurrency settings live in config.get_config(), which is
+# only built on first use so importing this module has no side effects.
 
 USER_AGENTS = [
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 Chrome/121.0 Safari/537.36",
     "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 Chrome/120.0 Safari/537.36"
 ]
 
-PROXY_HOST = "geo.iproyal.com:12321"
-PROXY_AUTH = "DewbRx43TyL9c0VL:Pm9YlpYW09eOGRsj_country-us"
-
-PROXIES = {
-    "http": f"http://{PROXY_AUTH}@{PROXY_HOST}",
-    "https": f"http://{PROXY_AUTH}@{PROXY_HOST}"
-}
-
-USE_PROXY = True
-
 def get_aiohttp_session():
     headers = {
         "Accept": "text/html",
@@ -52,29 +53,59 @@ def get_aiohttp_session():
 
     timeout = aiohttp.ClientTimeout(total=30)
 
-    if USE_PROXY:
-        return aiohttp.ClientSession(
-            headers=headers,
-            timeout=timeout
-        )
-    else:
-        return aiohttp.ClientSession(
-            headers=headers,
-            timeout=timeout
-        )
+    return aiohttp.ClientSession(
+        headers=headers,
+        timeout=timeout
+    )
 
 # ============================================================
 # LOGGING
 # ============================================================
 
+# Keep 1 in N per-page INFO lines; warnings and errors are never sampled
+PAGE_LOG_SAMPLE_EVERY = 20
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    # The stock QueueHandler formats in the caller's thread. Passing the record
+    # through untouched leaves %-formatting to the listener thread.
+    def prepare(self, record):
+        return record
+
+class LogSampler(logging.Filter):
+    def __init__(self, every):
+        super().__init__()
+        self.every = every
+        self.counts = {}
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING or self.every <= 1:
+            return True
+
+        # Sampled per message template, so each kind of page line still shows up
+        n = self.counts.get(record.msg, 0)
+        self.counts[record.msg] = n + 1
+        return n % self.every == 0
+
+logger = logging.getLogger("autopartsearch_scraper")
+page_logger = logging.getLogger("autopartsearch_scraper.pages")
+
+_LOG_LISTENER = None
+
 def setup_logger():
-    logger = logging.getLogger("autopartsearch_scraper")
+    # Idempotent: entry points call it, importing the module does not
+    global _LOG_LISTENER
+    if _LOG_LISTENER is not None:
+        return logger
+
+    config = get_config()
+    os.makedirs(config.log_dir, exist_ok=True)
+
     logger.setLevel(logging.INFO)
     logger.handlers.clear()
 
     log_file = os.path.join(
-        LOG_DIR,
-        f"autopartsearch_run_{RUN_TS}.log"
+        config.log_dir,
+        f"autopartsearch_run_{config.run_ts}.log"
     )
 
     file_handler = logging.FileHandler(log_file, encoding="utf8")
@@ -87,50 +118,90 @@ def setup_logger():
     file_handler.setFormatter(formatter)
     stream_handler.setFormatter(formatter)
 
-    logger.addHandler(file_handler)
-    logger.addHandler(stream_handler)
+    # File and console I/O happen on a background thread, off the event loop
+    log_queue = queue.SimpleQueue()
+    _LOG_LISTENER = logging.handlers.QueueListener(log_queue, file_handler, stream_handler)
+    _LOG_LISTENER.start()
+    atexit.register(_LOG_LISTENER.stop)
 
-    return logger
+    logger.addHandler(DeferredQueueHandler(log_queue))
+
+    page_logger.filters.clear()
+    page_logger.addFilter(LogSampler(PAGE_LOG_SAMPLE_EVERY))
 
-logger = setup_logger()
-logger.info("Starting AutoPartSearch scrape")
+    return logger
 
 # ============================================================
 # CSV LOADER
 # ============================================================
 
-def load_catalog_urls(csv_path):
-    urls = []
+CatalogRecord = namedtuple(
+    "CatalogRecord",
+    ["year", "make", "model", "part_name", "part_slug", "url", "ic_description"]
+)
+
+def url_fingerprint(url):
+    # 64-bit digest keeps the dedup set far smaller than holding every URL
+    digest = hashlib.blake2b(url.encode("utf8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+def iter_catalog_records(csv_path, part_filter=None, makes=None, years=None):
+    makes = {m.lower() for m in makes} if makes else None
+    years = {str(y) for y in years} if years else None
     seen_urls = set()
 
     with open(csv_path, newline="", encoding="utf8") as f:
-        reader = csv.DictReader(f)
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if not header:
+            return
+
+        col = {name: i for i, name in enumerate(header)}
+
+        def field(row, name):
+            i = col.get(name)
+            return row[i] if i is not None and i < len(row) else None
+
         for row in reader:
             # Skip rows without a valid link
-            if row.get("link_found", "").lower() != "true":
+            if (field(row, "link_found") or "").lower() != "true":
                 continue
 
-            url = row.get("url")
+            url = field(row, "url")
             if not url:
                 continue
 
+            # Filters run on raw columns before any record is built
+            if makes and (field(row, "manufacturer") or "").lower() not in makes:
+                continue
+            if years and field(row, "year") not in years:
+                continue
+            if part_filter and not part_filter(field(row, "part_name")):
+                continue
+
             # Deduplicate on URL
-            if url in seen_urls:
+            fingerprint = url_fingerprint(url)
+            if fingerprint in seen_urls:
                 continue
 
-            seen_urls.add(url)
+            seen_urls.add(fingerprint)
 
-            urls.append({
-                "year": row.get("year"),
-                "make": row.get("manufacturer"),
-                "model": row.get("model_name"),
-                "part_name": row.get("part_name"),
-                "part_slug": row.get("part_slug"),
-                "url": url,
-                "ic_description": row.get("ic_description"),
-            })
+            yield CatalogRecord(
+                year=field(row, "year"),
+                make=field(row, "manufacturer"),
+                model=field(row, "model_name"),
+                part_name=field(row, "part_name"),
+                part_slug=field(row, "part_slug"),
+                url=url,
+                ic_description=field(row, "ic_description"),
+            )
+
+def load_catalog_urls(csv_path, part_filter=None, makes=None, years=None):
+    return list(iter_catalog_records(csv_path, part_filter, makes, years))
 
-    return urls
+def is_target_part(part_name):
+    name = (part_name or "").lower()
+    return name == "engine assembly" or "transmission" in name
 
 # ============================================================
 # PARSING HELPERS
@@ -158,12 +229,341 @@ def normalize_text(s):
     s = re.sub(r"\s+", " ", s)
     return s.strip()
 
+# ============================================================
+# PART RECORDS
+# ============================================================
+
+def intern_str(s):
+    return sys.intern(s) if s else s
+
+_ADDRESS_POOL = {}
+
+INTERNED_FIELDS = frozenset([
+    "part_name",
+    "grade",
+    "condition_description",
+    "position",
+    "color",
+    "yard_id",
+    "distance_miles",
+])
+
+def intern_address(lines):
+    # Rows from the same yard end up pointing at one shared tuple
+    key = tuple(sys.intern(line) for line in lines)
+    return _ADDRESS_POOL.setdefault(key, key)
+
+class PageContext:
+    """Page-level fields shared by reference across every row of a page."""
+
+    __slots__ = (
+        "run_timestamp",
+        "application_text",
+        "application_id",
+        "application_url",
+        "interchange",
+    )
+
+    def __init__(self, application_meta, interchange, run_timestamp=None):
+        self.run_timestamp = run_timestamp or get_config().run_ts
+        self.application_text = intern_str(application_meta["application_text"]) if application_meta else None
+        self.application_id = intern_str(application_meta["application_id"]) if application_meta else None
+        self.application_url = application_meta["application_url"] if application_meta else None
+        self.interchange = intern_str(interchange)
+
+class Yard:
+    """Seller details for one yard, shared by every listing from it."""
+
+    __slots__ = (
+        "yard_id",
+        "seller",
+        "seller_city",
+        "seller_state",
+        "seller_phone",
+        "address",
+    )
+
+    def __init__(self, yard_id, seller, address_lines):
+        self.yard_id = intern_str(yard_id)
+        self.seller = intern_str(seller)
+        self.address = intern_address(address_lines)
+        city, state, phone = parse_address(self.address)
+        self.seller_city = intern_str(city)
+        self.seller_state = intern_str(state)
+        self.seller_phone = intern_str(phone)
+
+    def to_dict(self):
+        return {
+            "yard_id": self.yard_id,
+            "seller": self.seller,
+            "seller_city": self.seller_city,
+            "seller_state": self.seller_state,
+            "seller_phone": self.seller_phone,
+            "address": list(self.address),
+        }
+
+# yard_id -> Yard for the whole run, so seller blocks are parsed once per yard
+YARD_CACHE = {}
+
+def get_yard(yard_id, seller, address_lines):
+    if yard_id is None:
+        return Yard(None, seller, address_lines)
+
+    yard = YARD_CACHE.get(yard_id)
+    if yard is None:
+        yard = Yard(yard_id, seller, address_lines)
+        YARD_CACHE[yard_id] = yard
+    return yard
+
+def yard_dimension(parts):
+    yards = {}
+    for p in parts:
+        if p.yard_id and p.yard_id not in yards:
+            yards[p.yard_id] = p.yard.to_dict()
+    return list(yards.values())
+
+class PartRecord:
+    """One listing row. Serializes to the same keys as the old per-row dict."""
+
+    __slots__ = (
+        "context",
+        "source",
+        "yard",
+        "part_name",
+        "detail_url",
+        "price",
+        "mileage",
+        "grade",
+        "condition_description",
+        "vin",
+        "stock_no",
+        "position",
+        "color",
+        "show_info",
+        "thumbnail",
+        "yard_id",
+        "distance_miles",
+        "images",
+        "provenance",
+    )
+
+    ROW_FIELDS = __slots__[3:-1]
+
+    def __init__(self, context, yard, **fields):
+        self.context = context
+        self.yard = yard
+        # CatalogRecord the row was scraped for, set once by scrape_record
+        self.source = None
+        # Set by PartIndex once duplicates of this listing have been merged
+        self.provenance = None
+        for name in self.ROW_FIELDS:
+            setattr(self, name, fields.get(name))
+
+    @property
+    def image_count(self):
+        return len(self.images) if self.images else 0
+
+    def copy(self):
+        clone = PartRecord.__new__(PartRecord)
+        for name in self.__slots__:
+            setattr(clone, name, getattr(self, name))
+        return clone
+
+    def to_dict(self, inline_yard=True):
+        ctx = self.context
+        src = self.source
+        yard = self.yard
+
+        d = {
+            "run_timestamp": ctx.run_timestamp,
+            "application_text": ctx.application_text,
+            "application_id": ctx.application_id,
+            "application_url": ctx.application_url,
+            "part_name": self.part_name,
+            "detail_url": self.detail_url,
+            "price": self.price,
+        }
+
+        # Fact rows reference the yard dimension by yard_id instead
+        if inline_yard or not self.yard_id:
+            d["seller"] = yard.seller
+            d["seller_city"] = yard.seller_city
+            d["seller_state"] = yard.seller_state
+            d["seller_phone"] = yard.seller_phone
+            d["address"] = list(yard.address)
+
+        d.update({
+            "mileage": self.mileage,
+            "grade": self.grade,
+            "condition_description": self.condition_description,
+            "vin": self.vin,
+            "stock_no": self.stock_no,
+            "position": self.position,
+            "color": self.color,
+            "show_info": self.show_info,
+            "thumbnail": self.thumbnail,
+            "yard_id": self.yard_id,
+            "distance_miles": self.distance_miles,
+            "interchange": ctx.interchange,
+            "images": self.images if self.images is not None else [],
+            "image_count": self.image_count,
+        })
+
+        if src:
+            d.update({
+                "source_year": src.year,
+                "source_make": src.make,
+                "source_model": src.model,
+                "source_part_name": src.part_name,
+                "source_part_slug": src.part_slug,
+                "source_url": src.url,
+            })
+
+        if self.provenance:
+            d.update({
+                "matched_applications": self.provenance.applications,
+                "matched_sources": self.provenance.sources,
+                "duplicate_count": self.provenance.duplicates,
+            })
+
+        return d
+
+    @classmethod
+    def from_dict(cls, d, context_cache, source=None):
+        ctx_key = (
+            d.get("run_timestamp"),
+            d.get("application_id"),
+            d.get("application_text"),
+            d.get("application_url"),
+            d.get("interchange"),
+        )
+        context = context_cache.get(ctx_key)
+        if context is None:
+            application_meta = {
+                "application_text": d.get("application_text"),
+                "application_id": d.get("application_id"),
+                "application_url": d.get("application_url"),
+            } if d.get("application_url") else None
+            context = PageContext(application_meta, d.get("interchange"), d.get("run_timestamp"))
+            context_cache[ctx_key] = context
+
+        yard = get_yard(intern_str(d.get("yard_id")), d.get("seller"), d.get("address") or [])
+
+        part = cls(context, yard, **{
+            name: intern_str(d.get(name)) if name in INTERNED_FIELDS else d.get(name)
+            for name in cls.ROW_FIELDS
+        })
+        part.source = source
+        if "matched_sources" in d:
+            part.provenance = Provenance.from_dict(d)
+        return part
+
+# ============================================================
+# LISTING DEDUPLICATION
+# ============================================================
+
+class Provenance:
+    """Applications and source records that matched one physical listing."""
+
+    __slots__ = ("applications", "sources", "duplicates")
+
+    def __init__(self):
+        self.applications = []
+        self.sources = []
+        self.duplicates = 0
+
+    def add(self, part):
+        app_id = part.context.application_id
+        if app_id and app_id not in self.applications:
+            self.applications.append(app_id)
+
+        src_url = part.source.url if part.source else None
+        if src_url and src_url not in self.sources:
+            self.sources.append(src_url)
+
+    def absorb(self, part):
+        """Books part as a duplicate, along with anything it was merged from."""
+        self.add(part)
+        self.duplicates += 1
+
+        other = part.provenance
+        if other is not None and other is not self:
+            self.applications.extend(a for a in other.applications if a not in self.applications)
+            self.sources.extend(s for s in other.sources if s not in self.sources)
+            self.duplicates += other.duplicates
+
+    @classmethod
+    def from_dict(cls, d):
+        prov = cls()
+        prov.applications = list(d.get("matched_applications") or [])
+        prov.sources = list(d.get("matched_sources") or [])
+        prov.duplicates = d.get("duplicate_count") or 0
+        return prov
+
+class PartIndex:
+    """In-run index that keeps one PartRecord per physical listing."""
+
+    def __init__(self):
+        self.by_key = {}
+        self.parts = []
+        self.seen = 0
+
+    @staticmethod
+    def key_for(part):
+        if part.yard_id and part.stock_no:
+            return (part.yard_id, part.stock_no)
+        return part.detail_url
+
+    def add(self, part):
+        self.seen += 1
+        key = self.key_for(part)
+
+        kept = self.by_key.get(key) if key is not None else None
+        if kept is None:
+            # Rows reloaded from merged output keep what they were merged from
+            if part.provenance is None:
+                part.provenance = Provenance()
+            part.provenance.add(part)
+            if key is not None:
+                self.by_key[key] = part
+            self.parts.append(part)
+            return True
+
+        kept.provenance.absorb(part)
+        return False
+
+    def stats(self):
+        duplicates = self.seen - len(self.parts)
+        return {
+            "listings_seen": self.seen,
+            "unique_listings": len(self.parts),
+            "duplicates": duplicates,
+            "duplication_ratio": round(duplicates / self.seen, 4) if self.seen else 0,
+        }
+
+def parts_from_dicts(rows, source=None):
+    context_cache = {}
+    return [PartRecord.from_dict(d, context_cache, source) for d in rows]
+
+def encode_part(obj):
+    # Serializer default= hook for result dicts holding PartRecord rows
+    if isinstance(obj, PartRecord):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def encode_fact(obj):
+    # Same as encode_part, but seller fields live in the yard dimension
+    if isinstance(obj, PartRecord):
+        return obj.to_dict(inline_yard=False)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
 # ============================================================
 # OLD LAYOUT PARSER
 # ============================================================
 
-def parse_old_layout(soup, interchange, yard_distances, application_meta):
+def parse_old_layout(soup, interchange, yard_distances, application_meta, context=None):
     parts = []
+    context = context or PageContext(application_meta, interchange)
 
     for item in soup.select("form.list-item"):
         pn = item.select_one("a[title*='Engine Assembly'], a[href*='itemdetail']")
@@ -173,13 +573,6 @@ def parse_old_layout(soup, interchange, yard_distances, application_meta):
         price_tag = item.select_one(".buy-panel-sell-price")
         price = price_tag.get_text(strip=True).replace("$", "").strip() if price_tag else None
 
-        seller_tag = item.select_one(".item-company-address strong")
-        seller = seller_tag.get_text(strip=True) if seller_tag else None
-
-        address_block = item.select_one(".item-company-address")
-        address_lines = address_block.get_text("\n", strip=True).split("\n") if address_block else []
-        seller_city, seller_state, seller_phone = parse_address(address_lines)
-
         tds = item.select("td")
         mileage = tds[2].get_text(strip=True) if len(tds) > 2 else None
         grade = tds[3].get_text(strip=True) if len(tds) > 3 else None
@@ -208,46 +601,46 @@ def parse_old_layout(soup, interchange, yard_distances, application_meta):
 
         script = item.find("script")
         images = re.findall(r'"src":"(.*?)"', script.string) if script and script.string else []
-        image_count = len(images)
 
         yard_id = None
         if thumbnail:
             m = re.search(r"/([a-zA-Z0-9]{4})/images/", thumbnail)
             yard_id = m.group(1).upper() if m else None
 
+        # Seller block is only parsed the first time a yard shows up in the run
+        yard = YARD_CACHE.get(yard_id) if yard_id else None
+        if yard is None:
+            seller_tag = item.select_one(".item-company-address strong")
+            seller = seller_tag.get_text(strip=True) if seller_tag else None
+
+            address_block = item.select_one(".item-company-address")
+            address_lines = address_block.get_text("\n", strip=True).split("\n") if address_block else []
+            yard = get_yard(yard_id, seller, address_lines)
+
         distance_miles = yard_distances.get(yard_id)
 
         info_link = item.find("a", attrs={"id": "tool-tip"}) or item.find("a", string=lambda s: s and "Show Info" in s)
         show_info = info_link.get("data-original-title") if info_link else None
 
-        parts.append({
-            "run_timestamp": RUN_TS,
-            "application_text": application_meta["application_text"] if application_meta else None,
-            "application_id": application_meta["application_id"] if application_meta else None,
-            "application_url": application_meta["application_url"] if application_meta else None,
-            "part_name": part_name,
-            "detail_url": detail_url,
-            "price": price,
-            "seller": seller,
-            "seller_city": seller_city,
-            "seller_state": seller_state,
-            "seller_phone": seller_phone,
-            "address": address_lines,
-            "mileage": mileage,
-            "grade": grade,
-            "condition_description": condition_description,
-            "vin": vin,
-            "stock_no": stock_no,
-            "position": position,
-            "color": color,
-            "show_info": show_info,
-            "thumbnail": thumbnail,
-            "yard_id": yard_id,
-            "distance_miles": distance_miles,
-            "interchange": interchange,
-            "images": images,
-            "image_count": image_count,
-        })
+        parts.append(PartRecord(
+            context,
+            yard,
+            part_name=intern_str(part_name),
+            detail_url=detail_url,
+            price=price,
+            mileage=mileage,
+            grade=intern_str(grade),
+            condition_description=condition_description,
+            vin=vin,
+            stock_no=stock_no,
+            position=position,
+            color=intern_str(color),
+            show_info=show_info,
+            thumbnail=thumbnail,
+            yard_id=intern_str(yard_id),
+            distance_miles=distance_miles,
+            images=images,
+        ))
 
     return parts
 
@@ -255,12 +648,15 @@ def parse_old_layout(soup, interchange, yard_distances, application_meta):
 # NEW LAYOUT PARSER
 # ============================================================
 
-def parse_new_layout(soup, interchange, yard_distances, application_meta):
+def parse_new_layout(soup, interchange, yard_distances, application_meta, context=None):
     parts = []
     rows = soup.select("table.table.table-bordered tbody tr")
     if not rows:
         return parts
 
+    context = context or PageContext(application_meta, interchange)
+    page_seller = None
+
     for row in rows:
         tds = row.select("td")
         if len(tds) < 5:
@@ -303,44 +699,40 @@ def parse_new_layout(soup, interchange, yard_distances, application_meta):
 
         distance_miles = yard_distances.get(yard_id)
 
-        seller_tag = soup.select_one(".item-company-address strong")
-        seller = seller_tag.get_text(strip=True) if seller_tag else None
-
-        address_block = soup.select_one(".item-company-address")
-        address_lines = address_block.get_text("\n", strip=True).split("\n") if address_block else []
-        seller_city, seller_state, seller_phone = parse_address(address_lines)
+        yard = YARD_CACHE.get(yard_id) if yard_id else None
+        if yard is None:
+            # The seller block is page-level, so read it at most once per page
+            if page_seller is None:
+                seller_tag = soup.select_one(".item-company-address strong")
+                address_block = soup.select_one(".item-company-address")
+                page_seller = (
+                    seller_tag.get_text(strip=True) if seller_tag else None,
+                    address_block.get_text("\n", strip=True).split("\n") if address_block else []
+                )
+            yard = get_yard(yard_id, *page_seller)
 
         info_link = info_td.find("a", attrs={"id": "tool-tip"})
         show_info = info_link.get("data-original-title") if info_link else None
 
-        parts.append({
-            "run_timestamp": RUN_TS,
-            "application_text": application_meta["application_text"] if application_meta else None,
-            "application_id": application_meta["application_id"] if application_meta else None,
-            "application_url": application_meta["application_url"] if application_meta else None,
-            "part_name": part_name,
-            "detail_url": detail_url,
-            "price": price,
-            "seller": seller,
-            "seller_city": seller_city,
-            "seller_state": seller_state,
-            "seller_phone": seller_phone,
-            "address": address_lines,
-            "mileage": mileage,
-            "grade": grade,
-            "condition_description": condition_description,
-            "vin": vin,
-            "stock_no": stock_no,
-            "position": position,
-            "color": color,
-            "show_info": show_info,
-            "thumbnail": thumbnail,
-            "yard_id": yard_id,
-            "distance_miles": distance_miles,
-            "interchange": interchange,
-            "images": images,
-            "image_count": len(images),
-        })
+        parts.append(PartRecord(
+            context,
+            yard,
+            part_name=intern_str(part_name),
+            detail_url=detail_url,
+            price=price,
+            mileage=mileage,
+            grade=intern_str(grade),
+            condition_description=condition_description,
+            vin=vin,
+            stock_no=stock_no,
+            position=position,
+            color=intern_str(color),
+            show_info=show_info,
+            thumbnail=thumbnail,
+            yard_id=intern_str(yard_id),
+            distance_miles=distance_miles,
+            images=images,
+        ))
 
     return parts
 
@@ -348,46 +740,135 @@ def parse_new_layout(soup, interchange, yard_distances, application_meta):
 # SCRAPING CORE
 # ============================================================
 
-SEM = asyncio.Semaphore(15)
-
-async def fetch_page(url, session, timeout=15, max_retries=3):
+_SEMAPHORES = {}
+
+def get_semaphore():
+    # One fetch limiter per event loop, created on first use inside that loop,
+    # so pool workers and repeated asyncio.run() calls each get their own
+    loop = asyncio.get_running_loop()
+    sem = _SEMAPHORES.get(loop)
+    if sem is None:
+        _SEMAPHORES.clear()
+        sem = asyncio.Semaphore(get_config().concurrency)
+        _SEMAPHORES[loop] = sem
+    return sem
+
+_WATCHDOGS = {}
+
+def get_watchdog():
+    loop = asyncio.get_running_loop()
+    watchdog = _WATCHDOGS.get(loop)
+    if watchdog is None:
+        _WATCHDOGS.clear()
+        watchdog = TaskWatchdog()
+        _WATCHDOGS[loop] = watchdog
+    return watchdog
+
+class FetchError(Exception):
+    """A page could not be fetched within its retries and deadline."""
+
+async def fetch_page(url, session, timeout=15, max_retries=3, read=None):
+    """
+    Returns (text, size), or (None, 0) once retries run out. A read
+    coroutine, when given, consumes the response instead and its
+    (value, size) is returned.
+    """
     headers = {
         "User-Agent": random.choice(USER_AGENTS)
     }
 
-    proxy = PROXIES["http"] if USE_PROXY else None
+    config = get_config()
+    proxy = config.proxy_url
+
+    # Retries and backoff share one budget so a dead page gives up its slot
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + config.request_deadline
 
     for attempt in range(1, max_retries + 1):
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            logger.warning("Request deadline reached after %s attempts | %s", attempt - 1, url)
+            break
+
         try:
-            async with SEM:
-                async with session.get(
-                    url,
-                    headers=headers,
-                    proxy=proxy,
-                    timeout=timeout
-                ) as response:
-                    response.raise_for_status()
-                    text = await response.text()
-                    size = len(text.encode("utf8"))
-                    return text, size
+            async with get_semaphore():
+                with stage("fetch"):
+                    async with session.get(
+                        url,
+                        headers=headers,
+                        proxy=proxy,
+                        timeout=aiohttp.ClientTimeout(total=min(timeout, remaining))
+                    ) as response:
+                        response.raise_for_status()
+                        if read is not None:
+                            return await read(response)
+                        text = await response.text()
+                        size = len(text.encode("utf8"))
+                        return text, size
 
         except asyncio.TimeoutError:
-            logger.warning(f"Timeout attempt {attempt} | {url}")
+            logger.warning("Timeout attempt %s | %s", attempt, url)
             await asyncio.sleep(2 * attempt)
 
         except ClientConnectorError as e:
-            logger.warning(f"Connection error attempt {attempt} | {url} | {e}")
+            logger.warning("Connection error attempt %s | %s | %s", attempt, url, e)
             await asyncio.sleep(2 * attempt)
 
         except aiohttp.ClientError as e:
-            logger.warning(f"HTTP error attempt {attempt} | {url} | {e}")
+            logger.warning("HTTP error attempt %s | %s | %s", attempt, url, e)
             await asyncio.sleep(2 * attempt)
 
     return None, 0
 
-def scrape_autopartsearch(response_text, application_meta):
-    soup = BeautifulSoup(response_text, "html.parser")
+def parse_applications(soup):
+    apps = []
 
+    for a in soup.select("#applications-facet a.name"):
+        href = a.get("href")
+        if href and "application=" in href:
+            apps.append({
+                "application_text": a.get_text(strip=True),
+                "application_id": href.split("application=")[1],
+                "application_url": href
+            })
+
+    return apps
+
+class ParsedPage:
+    """Everything read from one listing page, built from a single soup."""
+
+    __slots__ = ("applications", "interchange", "application_meta", "parts", "size", "served")
+
+    def __init__(self, applications, interchange, application_meta, parts, size):
+        self.applications = applications
+        self.interchange = interchange
+        self.application_meta = application_meta
+        self.parts = parts
+        self.size = size
+        self.served = 0
+
+    def take_parts(self, application_meta):
+        # First caller gets the parsed rows, later memo hits get copies so
+        # scrape_record can set .source without touching another record's rows
+        self.served += 1
+
+        same_app = (
+            (application_meta or {}).get("application_id")
+            == (self.application_meta or {}).get("application_id")
+        )
+        if self.served == 1 and same_app:
+            return self.parts
+
+        context = None if same_app else PageContext(application_meta, self.interchange)
+        copies = []
+        for p in self.parts:
+            c = p.copy()
+            if context:
+                c.context = context
+            copies.append(c)
+        return copies
+
+def parse_facets(soup):
     interchange = None
     app_facet = soup.select_one("#applications-facet .panel-body")
     if app_facet:
@@ -403,13 +884,399 @@ def scrape_autopartsearch(response_text, application_meta):
         if m and a and "yard=" in a["href"]:
             yard_distances[a["href"].split("yard=")[1].upper()] = m.group(1)
 
+    return interchange, yard_distances, parse_applications(soup)
+
+def parse_page(response_text, application_meta, size=0):
+    with stage("parse_soup"):
+        soup = BeautifulSoup(response_text, "html.parser")
+
+    with stage("parse_facets"):
+        interchange, yard_distances, applications = parse_facets(soup)
+
     if soup.select("form.list-item"):
-        return parse_old_layout(soup, interchange, yard_distances, application_meta)
+        with stage("parse_old_layout"):
+            parts = parse_old_layout(soup, interchange, yard_distances, application_meta)
+    elif soup.select("table.table.table-bordered tbody tr"):
+        with stage("parse_new_layout"):
+            parts = parse_new_layout(soup, interchange, yard_distances, application_meta)
+    else:
+        parts = []
 
-    if soup.select("table.table.table-bordered tbody tr"):
-        return parse_new_layout(soup, interchange, yard_distances, application_meta)
+    return ParsedPage(applications, interchange, application_meta, parts, size)
 
-    return []
+def scrape_autopartsearch(response_text, application_meta):
+    return parse_page(response_text, application_meta).parts
+
+# ============================================================
+# STREAMING PARSE
+# ============================================================
+
+STREAM_CHUNK_BYTES = 16 * 1024
+
+class StreamingPageParser:
+    """
+    parse_page for a body that arrives in chunks.
+
+    FragmentSplitter hands over each listing item as it closes and only
+    that fragment gets a soup, so memory per page is one chunk plus one
+    item and the parsed rows rather than the whole body and its tree.
+    Facets are resolved from whatever facet blocks have arrived when the
+    first item does, so a page missing one is not buffered to the end. A
+    facet block that only arrives later is applied to every row when the
+    page closes. New-layout rows wait for the page-level seller block.
+
+    Rows are returned with the ParsedPage once the body is read, since a
+    page can still fail and be retried; feed() reports rows as they are
+    parsed only so the watchdog sees progress on a slow page.
+    """
+
+    def __init__(self, application_meta):
+        self.application_meta = application_meta
+        self.splitter = FragmentSplitter(self.on_fragment)
+
+        self.facet_html = {}
+        self.seller_html = None
+        self.facets = None
+        self.context = None
+
+        self.waiting = []
+        self.fresh = []
+        self.parts = []
+
+    def on_fragment(self, kind, html):
+        if kind in (APPLICATIONS_FACET, YARD_FACET):
+            self.facet_html[kind] = html
+            if len(self.facet_html) == 2 or self.facets is not None:
+                self.resolve_facets()
+        elif kind == SELLER:
+            self.seller_html = html
+            self.drain()
+        else:
+            self.waiting.append((kind, html))
+            if self.facets is None:
+                self.resolve_facets()
+            else:
+                self.drain()
+
+    def resolve_facets(self):
+        with stage("parse_facets"):
+            soup = BeautifulSoup("".join(self.facet_html.values()), "html.parser")
+            self.facets = parse_facets(soup)
+        # Rows already parsed keep the interchange they were read with
+        if self.context is None:
+            self.context = PageContext(self.application_meta, self.facets[0])
+        self.drain()
+
+    def drain(self, final=False):
+        if self.facets is None:
+            return
+
+        interchange, yard_distances, _ = self.facets
+        still_waiting = []
+
+        for kind, html in self.waiting:
+            if kind == OLD_ITEM:
+                with stage("parse_old_layout"):
+                    soup = BeautifulSoup(html, "html.parser")
+                    parts = parse_old_layout(soup, interchange, yard_distances, self.application_meta, self.context)
+            elif self.seller_html is not None or final:
+                with stage("parse_new_layout"):
+                    soup = BeautifulSoup(
+                        f'{self.seller_html or ""}<table class="table table-bordered"><tbody>{html}</tbody></table>',
+                        "html.parser"
+                    )
+                    parts = parse_new_layout(soup, interchange, yard_distances, self.application_meta, self.context)
+            else:
+                still_waiting.append((kind, html))
+                continue
+
+            self.fresh.extend(parts)
+            self.parts.extend(parts)
+
+        self.waiting = still_waiting
+
+    def feed(self, text):
+        """Parses text and returns the rows it completed, for progress only."""
+        self.splitter.feed(text)
+        fresh, self.fresh = self.fresh, []
+        return fresh
+
+    def close(self, size):
+        self.splitter.close()
+        if self.facets is None:
+            self.resolve_facets()
+        self.drain(final=True)
+        interchange, yard_distances, applications = self.facets
+
+        # Rows parsed before a late facet block only saw the facets that had
+        # arrived by then; settle them against the whole page, as parse_page would
+        if self.context is not None and self.context.interchange != interchange:
+            context = PageContext(self.application_meta, interchange)
+            for p in self.parts:
+                if p.context is self.context:
+                    p.context = context
+            self.context = context
+        for p in self.parts:
+            p.distance_miles = yard_distances.get(p.yard_id)
+
+        return ParsedPage(applications, interchange, self.application_meta, self.parts, size)
+
+async def read_streaming(response, application_meta):
+    parser = StreamingPageParser(application_meta)
+    decoder = codecs.getincrementaldecoder(response.charset or "utf-8")(errors="replace")
+    size = 0
+
+    async for chunk in response.content.iter_chunked(STREAM_CHUNK_BYTES):
+        size += len(chunk)
+        # Rows coming in count as progress even while the page is still loading
+        if parser.feed(decoder.decode(chunk)):
+            get_watchdog().heartbeat()
+
+    parser.feed(decoder.decode(b"", final=True))
+    return parser.close(size), size
+
+# ============================================================
+# PAGE MEMO
+# ============================================================
+
+PAGE_MEMO_MAX_BYTES = 64 * 1024 * 1024
+
+class PageMemo:
+    """
+    Per-run memo of parsed pages keyed by URL.
+
+    Concurrent requests for the same URL share one fetch (singleflight) and
+    completed pages are kept in LRU order until their HTML sizes add up to
+    max_bytes.
+    """
+
+    def __init__(self, max_bytes=PAGE_MEMO_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.inflight = {}
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    async def get(self, url, loader):
+        page = self.entries.get(url)
+        if page is not None:
+            self.entries.move_to_end(url)
+            self.hits += 1
+            return page
+
+        fut = self.inflight.get(url)
+        if fut is not None:
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(fut)
+            except asyncio.CancelledError:
+                # The leader was cancelled, not us: load it ourselves
+                if fut.cancelled():
+                    return await self.get(url, loader)
+                raise
+
+        fut = asyncio.get_running_loop().create_future()
+        self.inflight[url] = fut
+        self.misses += 1
+
+        try:
+            page = await loader()
+        except asyncio.CancelledError:
+            fut.cancel()
+            raise
+        except Exception as e:
+            fut.set_exception(e)
+            # Mark retrieved so an unawaited failure is not reported twice
+            fut.exception()
+            raise
+        finally:
+            self.inflight.pop(url, None)
+
+        fut.set_result(page)
+
+        # Failed fetches are not memoized so a later request can retry them
+        if page is not None:
+            self.put(url, page)
+
+        return page
+
+    def put(self, url, page):
+        self.entries[url] = page
+        self.bytes += page.size
+
+        while self.bytes > self.max_bytes and len(self.entries) > 1:
+            _, evicted = self.entries.popitem(last=False)
+            self.bytes -= evicted.size
+            self.evictions += 1
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "cached_pages": len(self.entries),
+            "cached_bytes": self.bytes,
+        }
+
+_PAGE_MEMOS = {}
+
+def get_page_memo():
+    # In-flight futures belong to one loop, so the memo is per loop as well
+    loop = asyncio.get_running_loop()
+    memo = _PAGE_MEMOS.get(loop)
+    if memo is None:
+        _PAGE_MEMOS.clear()
+        memo = PageMemo()
+        _PAGE_MEMOS[loop] = memo
+    return memo
+
+async def load_page(url, session, timeout, application_meta):
+    async def loader():
+        if get_config().stream_parse:
+            page, _ = await fetch_page(
+                url,
+                session,
+                timeout,
+                read=lambda response: read_streaming(response, application_meta)
+            )
+            if page is None:
+                raise FetchError(url)
+            return page
+
+        html, size = await fetch_page(url, session, timeout)
+        # Raised rather than returned so a failed fetch never looks like an
+        # empty last page
+        if not html:
+            raise FetchError(url)
+        return parse_page(html, application_meta, size)
+
+    return await get_page_memo().get(url, loader)
+
+# ============================================================
+# PAGE SIZE
+# ============================================================
+
+_PAGE_SIZERS = {}
+
+def get_page_sizer():
+    if not get_config().negotiate_page_size:
+        return None
+    loop = asyncio.get_running_loop()
+    sizer = _PAGE_SIZERS.get(loop)
+    if sizer is None:
+        _PAGE_SIZERS.clear()
+        sizer = PageSizeNegotiator()
+        _PAGE_SIZERS[loop] = sizer
+    return sizer
+
+async def negotiate_page_size(base_url, application_meta, session, timeout):
+    """
+    (param, size) to paginate base_url with, or None for the default size.
+
+    Probes run once per run, on the first listing whose live page 1 reports
+    more listings than fit on it. Listings arriving meanwhile wait for the
+    outcome, which costs a few requests' latency once.
+    """
+    sizer = get_page_sizer()
+    if sizer is None:
+        return None
+
+    if sizer.lock.locked():
+        async with sizer.lock:
+            pass
+
+    if sizer.state != UNKNOWN:
+        return sizer.page_param
+
+    # Page 1 is memoized, so the default-size scrape reuses it. A failure
+    # is left to the pagination loop, which reports it as usual.
+    try:
+        first = await load_page(base_url, session, timeout, application_meta)
+    except FetchError:
+        return None
+
+    default_rows = len(first.parts)
+    sizer.note_default_page(default_rows)
+    total = reported_total(first.applications, application_meta)
+    if not default_rows or not total or total <= default_rows:
+        return None
+
+    async with sizer.lock:
+        # Another listing may have settled it while this one fetched page 1
+        if sizer.state != UNKNOWN:
+            if sizer.page_param:
+                # That page 1 goes unused, like the prober's
+                sizer.probes += 1
+            return sizer.page_param
+
+        for param in sizer.params:
+            probe_url = sized_url(base_url, (param, sizer.probe_size))
+            sizer.probes += 1
+            try:
+                probe = await load_page(probe_url, session, timeout, application_meta)
+            except FetchError:
+                continue
+
+            size = judge_probe(len(probe.parts), sizer.probe_size, total, default_rows)
+            if size:
+                # The default page 1 fetched above goes unused from here on
+                sizer.probes += 1
+                sizer.accept(param, size)
+                logger.info(
+                    f"Page size | using {param}={size} instead of {default_rows} | "
+                    f"probes={sizer.probes} | {probe_url}"
+                )
+                return sizer.page_param
+
+        sizer.reject()
+        logger.info(
+            f"Page size | no parameter honoured, keeping default {default_rows} | "
+            f"probes={sizer.probes}"
+        )
+        return None
+
+# Pagination cap per application
+MAX_PAGES = 1000
+
+class RecordProgress:
+    """
+    What a record has scraped so far, kept outside the record's task so a
+    record cancelled by the watchdog can still save its pages and say where
+    each listing should resume.
+    """
+
+    def __init__(self):
+        self.parts = []
+        self.pages_scraped = 0
+        self.total_bytes = 0
+        # listing url -> [application_meta, next page, page_param, finished]
+        self.listings = OrderedDict()
+
+    def plan(self, url, application_meta):
+        self.listings.setdefault(url, [application_meta, 1, None, False])
+
+    def start(self, url, application_meta, page, page_param):
+        self.listings[url] = [application_meta, page, page_param, False]
+
+    def page_done(self, url, parts, size):
+        self.parts.extend(parts)
+        self.pages_scraped += 1
+        self.total_bytes += size
+        self.listings[url][1] += 1
+
+    def finish(self, url):
+        self.listings[url][3] = True
+
+    def unfinished(self):
+        return [
+            (url, application_meta, page, page_param)
+            for url, (application_meta, page, page_param, finished) in self.listings.items()
+            if not finished
+        ]
 
 async def scrape_all_pages(
         base_url,
@@ -418,255 +1285,1382 @@ async def scrape_all_pages(
         record_idx,
         total_records,
         timeout=10,
-        max_pages=1000
+        max_pages=MAX_PAGES,
+        start_page=1,
+        page_param=None,
+        progress=None,
+        negotiate=True
     ):
 
     all_parts = []
-    page = 1
+    page = start_page
 
     pages_scraped = 0
     total_bytes = 0
+    failure = None
+    listing_total = None
+
+    # A resumed listing keeps the page size its page numbers were counted in
+    if page_param is None and start_page == 1 and negotiate:
+        page_param = await negotiate_page_size(base_url, application_meta, session, timeout)
+    list_url = sized_url(base_url, page_param) if page_param else base_url
+
+    if progress:
+        progress.start(base_url, application_meta, start_page, page_param)
 
     while page <= max_pages:
-        page_url = base_url if page == 1 else f"{base_url}&currentpage={page}"
-        logger.info(
-            f"Record {record_idx} of {total_records} | "
-            f"Fetching page {page} | {page_url}"
+        page_url = list_url if page == 1 else f"{list_url}&currentpage={page}"
+        page_logger.info(
+            "Record %s of %s | Fetching page %s | %s",
+            record_idx, total_records, page, page_url
         )
 
-        html, page_size = await fetch_page(page_url, session, timeout)
-        if not html:
+        try:
+            page_data = await load_page(page_url, session, timeout, application_meta)
+        except FetchError:
+            logger.warning(
+                "Record %s of %s | Page %s failed, stopping pagination | %s",
+                record_idx, total_records, page, page_url
+            )
+            failure = {
+                "reason": dead_letters.FETCH_FAILED,
+                "application": application_meta,
+                "last_good_page": page - 1,
+                "failed_page": page,
+                "page_param": page_param,
+            }
             break
 
-        parts = scrape_autopartsearch(html, application_meta)
-        logger.info(
-            f"Record {record_idx} of {total_records} | "
-            f"Page {page} returned {len(parts)} parts | size={page_size} bytes"
+        parts = page_data.take_parts(application_meta)
+        page_size = page_data.size
+        if page == 1:
+            listing_total = reported_total(page_data.applications, application_meta)
+        page_logger.info(
+            "Record %s of %s | Page %s returned %s parts | size=%s bytes",
+            record_idx, total_records, page, len(parts), page_size
         )
 
         if not parts:
             break
 
+        if not page_param:
+            sizer = get_page_sizer()
+            if sizer:
+                sizer.note_default_page(len(parts))
+
         all_parts.extend(parts)
         pages_scraped += 1
         total_bytes += page_size
         page += 1
+        if progress:
+            progress.page_done(base_url, parts, page_size)
+
+        get_watchdog().heartbeat()
+
+    else:
+        logger.warning(
+            "Record %s of %s | Stopped at max_pages=%s with parts still coming | %s",
+            record_idx, total_records, max_pages, base_url
+        )
+        failure = {
+            "reason": dead_letters.TRUNCATED,
+            "application": application_meta,
+            "last_good_page": max_pages,
+            "failed_page": max_pages + 1,
+            "page_param": page_param,
+        }
+
+    # Failures are reported by the caller; only a cancelled listing is left unfinished
+    if progress:
+        progress.finish(base_url)
+
+    sizer = get_page_sizer()
+    if sizer and page_param and start_page == 1 and not failure:
+        if sizer.record(len(all_parts), pages_scraped, listing_total):
+            # The sized pages dropped rows somewhere; the default size is the
+            # reference, so the listing is scraped again with it
+            logger.warning(
+                "Record %s of %s | %s parts with %s=%s but the facet reports %s, "
+                "re-scraping at the default size | %s",
+                record_idx, total_records, len(all_parts), page_param[0], page_param[1], listing_total, base_url
+            )
+            rescraped = await scrape_all_pages(
+                base_url,
+                application_meta,
+                session,
+                record_idx,
+                total_records,
+                timeout=timeout,
+                max_pages=max_pages,
+                progress=progress,
+                negotiate=False
+            )
+            rescraped["pages_scraped"] += pages_scraped
+            rescraped["total_bytes"] += total_bytes
+            rescraped["avg_page_size"] = (
+                int(rescraped["total_bytes"] / rescraped["pages_scraped"]) if rescraped["pages_scraped"] else 0
+            )
+            return rescraped
 
     return {
         "parts": all_parts,
         "pages_scraped": pages_scraped,
         "total_bytes": total_bytes,
-        "avg_page_size": int(total_bytes / pages_scraped) if pages_scraped else 0
+        "avg_page_size": int(total_bytes / pages_scraped) if pages_scraped else 0,
+        "failure": failure
     }
 
 async def get_applications(base_url, session):
-    html, _ = await fetch_page(base_url, session, 10)
-    if not html:
-        return []
+    # Page 1 is memoized, so the unfiltered scrape of base_url reuses it.
+    # A FetchError here fails the whole record.
+    page_data = await load_page(base_url, session, 10, None)
+    return page_data.applications
+
+_FACET_CACHE = None
+_FACET_CACHE_LOCK = threading.Lock()
+
+def get_facet_cache():
+    """
+    The run's FacetCache, opened on first use. Opening it purges expired
+    facets, so it is called from an executor like the cache's other calls.
+    """
+    global _FACET_CACHE
+    config = get_config()
+    if not config.facet_ttl:
+        return None
+    with _FACET_CACHE_LOCK:
+        if _FACET_CACHE is None or _FACET_CACHE.path != config.facet_cache_path:
+            _FACET_CACHE = FacetCache(config.facet_cache_path, config.facet_ttl)
+            purged = _FACET_CACHE.purge_expired()
+            if purged:
+                logger.info(f"Facet cache | purged {purged} expired facets | {config.facet_cache_path}")
+    return _FACET_CACHE
+
+async def match_applications(base_url, session, target, record_idx, total_records, use_cache=True):
+    """
+    Returns (applications, from_cache). applications is None when there is
+    no facet or nothing to match, and base_url is scraped unfiltered.
+
+    A cached facet skips the discovery fetch of base_url page 1.
+    """
+    # The cache waits on SQLite locks shared with other processes, so its
+    # calls stay off the event loop
+    loop = asyncio.get_running_loop()
+    cache = await loop.run_in_executor(None, get_facet_cache) if target else None
+
+    if cache and use_cache and not get_config().refresh_facets:
+        cached = await loop.run_in_executor(None, cache.lookup, base_url, target)
+        if cached is not None:
+            page_logger.info(
+                "Record %s of %s | Facet cache hit | %s applications | %s",
+                record_idx, total_records, len(cached), base_url
+            )
+            return cached or None, True
 
-    soup = BeautifulSoup(html, "html.parser")
-    apps = []
+    applications = await get_applications(base_url, session)
+    if cache:
+        await loop.run_in_executor(None, cache.store, base_url, applications, normalize_text)
 
-    for a in soup.select("#applications-facet a.name"):
-        href = a.get("href")
-        if href and "application=" in href:
-            apps.append({
-                "application_text": a.get_text(strip=True),
-                "application_id": href.split("application=")[1],
-                "application_url": href
-            })
+    if not applications or not target:
+        return None, False
 
-    return apps
+    matched_apps = [
+        app for app in applications
+        if normalize_text(app["application_text"]) == target
+    ]
+    return matched_apps, False
 
-async def scrape_with_applications(base_url, session, record_idx, total_records, ic_description):
-    applications = await get_applications(base_url, session)
+async def scrape_with_applications(
+        base_url,
+        session,
+        record_idx,
+        total_records,
+        ic_description,
+        use_cache=True,
+        progress=None
+    ):
+
+    applications, from_cache = await match_applications(
+        base_url,
+        session,
+        normalize_text(ic_description),
+        record_idx,
+        total_records,
+        use_cache
+    )
 
     all_parts = []
     total_pages = 0
     total_bytes = 0
+    failures = []
 
-    if applications and ic_description:
-        target = normalize_text(ic_description)
-
-        matched_apps = [
-            app for app in applications
-            if normalize_text(app["application_text"]) == target
-        ]
-
-        if not matched_apps:
+    if applications is not None:
+        if not applications:
             logger.warning(
-                f"Record {record_idx} of {total_records} | "
-                f"No application matched ic_description | {ic_description}"
+                "Record %s of %s | No application matched ic_description | %s",
+                record_idx, total_records, ic_description
             )
             return {
                 "parts": [],
                 "pages_scraped": 0,
                 "total_bytes": 0,
-                "avg_page_size": 0
+                "avg_page_size": 0,
+                "failures": []
             }
 
-        applications = matched_apps
+        if progress:
+            for app in applications:
+                progress.plan(app["application_url"], app)
 
         for app in applications:
             logger.info(
-                f"Record {record_idx} of {total_records} | "
-                f"Scraping application {app['application_id']}"
+                "Record %s of %s | Scraping application %s",
+                record_idx, total_records, app["application_id"]
             )
 
             logger.info(
-                f"Application details | "
-                f"id={app['application_id']} | "
-                f"text={app['application_text']} | "
-                f"url={app['application_url']}"
+                "Application details | id=%s | text=%s | url=%s",
+                app["application_id"], app["application_text"], app["application_url"]
             )
             
-            result = await scrape_all_pages(app["application_url"], app, session, record_idx, total_records)
+            result = await scrape_all_pages(
+                app["application_url"], app, session, record_idx, total_records, progress=progress
+            )
 
             all_parts.extend(result["parts"])
             total_pages += result["pages_scraped"]
             total_bytes += result["total_bytes"]
+            if result["failure"]:
+                failures.append(result["failure"])
+
+        # A listed application always has parts; none at all means the
+        # cached ids went stale, so rediscover them
+        if from_cache and not all_parts and not failures:
+            logger.info(
+                "Record %s of %s | Cached applications returned nothing, rediscovering | %s",
+                record_idx, total_records, base_url
+            )
+            await asyncio.get_running_loop().run_in_executor(None, get_facet_cache().invalidate, base_url)
+            return await scrape_with_applications(
+                base_url, session, record_idx, total_records, ic_description, use_cache=False, progress=progress
+            )
     else:
-        result = await scrape_all_pages(base_url, None, session, record_idx, total_records)
+        result = await scrape_all_pages(base_url, None, session, record_idx, total_records, progress=progress)
         all_parts.extend(result["parts"])
         total_pages += result["pages_scraped"]
         total_bytes += result["total_bytes"]
+        if result["failure"]:
+            failures.append(result["failure"])
 
     return {
         "parts": all_parts,
         "pages_scraped": total_pages,
         "total_bytes": total_bytes,
-        "avg_page_size": int(total_bytes / total_pages) if total_pages else 0
+        "avg_page_size": int(total_bytes / total_pages) if total_pages else 0,
+        "failures": failures
     }
 
 # ============================================================
 # ASYNC WORKER
 # ============================================================
 
+def record_base_name(rec):
+    base_name = f"{rec.make}_{rec.year}_{rec.model}_{rec.part_slug}"
+    return re.sub(r"[^a-zA-Z0-9_]", "_", base_name)
+
+def record_shard_path(rec):
+    config = get_config()
+    return os.path.join(config.temp_dir, f"{record_base_name(rec)}{config.shard_suffix}")
+
+def get_dead_letters():
+    return dead_letters.DeadLetterStore(get_config().dead_letter_path)
+
+def failed_record(rec, reason, detail):
+    # Record-level failures write no shard, so they are also retried by a
+    # plain rerun; the dead letter keeps the reason
+    get_dead_letters().add(rec, reason, detail=detail)
+    return {
+        "parts": [],
+        "pages_scraped": 0,
+        "total_bytes": 0,
+        "failed": reason,
+        "url": rec.url
+    }
+
+def save_timed_out_record(rec, progress, timeout_reason, temp_path, start_ts):
+    """
+    Writes the pages a cancelled record did finish to its shard and a
+    dead letter per unfinished listing, so --retry-dead-letters resumes
+    each one at its next page instead of starting the record over.
+    """
+    for p in progress.parts:
+        p.source = rec
+
+    result = {
+        "parts": progress.parts,
+        "pages_scraped": progress.pages_scraped,
+        "total_bytes": progress.total_bytes,
+        "avg_page_size": int(progress.total_bytes / progress.pages_scraped) if progress.pages_scraped else 0,
+        "failures": [
+            {
+                "reason": dead_letters.TIMED_OUT,
+                "detail": timeout_reason,
+                "application": application_meta,
+                "last_good_page": page - 1,
+                "failed_page": page,
+                "page_param": page_param,
+            }
+            for _, application_meta, page, page_param in progress.unfinished()
+        ],
+        "record_runtime_seconds": round(time.perf_counter() - start_ts, 2),
+    }
+
+    with stage("write_shard"):
+        serialization.dump(result, temp_path, default=encode_part)
+
+    store = get_dead_letters()
+    for failure in result["failures"]:
+        store.add(rec, shard_path=temp_path, **failure)
+
+    logger.info(
+        "Record %s kept %s pages before timing out | %s listings to resume | %s",
+        record_base_name(rec), progress.pages_scraped, len(result["failures"]), rec.url
+    )
+
+    result["timed_out"] = timeout_reason
+    result["url"] = rec.url
+    return result
+
 async def scrape_record(rec, record_idx, total_records, session):
     try:
         start_ts = time.perf_counter()
         logger.info(
-            f"Starting record {record_idx} of {total_records} | "
-            f"{rec['make']} {rec['year']} {rec['model']} {rec['part_slug']}"
+            "Starting record %s of %s | %s %s %s %s",
+            record_idx, total_records, rec.make, rec.year, rec.model, rec.part_slug
         )
-        base_name = f"{rec['make']}_{rec['year']}_{rec['model']}_{rec['part_slug']}"
-        base_name = re.sub(r"[^a-zA-Z0-9_]", "_", base_name)
-        temp_path = os.path.join(TEMP_DIR, f"{base_name}.json")
+        config = get_config()
+        temp_path = record_shard_path(rec)
 
         if os.path.exists(temp_path):
-            with open(temp_path, "r", encoding="utf8") as f:
-                return json.load(f)
-
-        result = await scrape_with_applications(
-            rec["url"],
-            session,
-            record_idx,
-            total_records,
-            rec.get("ic_description")
+            with stage("read_shard"):
+                result = serialization.load(temp_path)
+                result["parts"] = parts_from_dicts(result["parts"], rec)
+            # Nothing was fetched, so sample projections leave it out
+            result["from_shard"] = True
+            return result
+
+        progress = RecordProgress()
+        result, timeout_reason = await run_watched(
+            get_watchdog(),
+            scrape_with_applications(
+                rec.url,
+                session,
+                record_idx,
+                total_records,
+                rec.ic_description,
+                progress=progress
+            ),
+            f"record {record_idx} of {total_records} | {rec.url}",
+            deadline=config.record_deadline,
+            stall_timeout=config.stall_timeout
         )
 
+        if timeout_reason:
+            logger.warning(
+                "Record %s of %s timed out | %s | %s",
+                record_idx, total_records, timeout_reason, rec.url
+            )
+            if not progress.listings:
+                # Cancelled before any listing started: nothing to keep
+                result = failed_record(rec, dead_letters.TIMED_OUT, timeout_reason)
+                result["timed_out"] = timeout_reason
+                return result
+            return save_timed_out_record(rec, progress, timeout_reason, temp_path, start_ts)
+
         parts = result["parts"]
 
-        for p in parts:
-            p.update({
-                "source_year": rec["year"],
-                "source_make": rec["make"],
-                "source_model": rec["model"],
-                "source_part_name": rec["part_name"],
-                "source_part_slug": rec["part_slug"],
-                "source_url": rec["url"],
-            })
+        # Every row points at the same CatalogRecord instead of copying it
+        with stage("enrich"):
+            for p in parts:
+                p.source = rec
 
         elapsed_sec = round(time.perf_counter() - start_ts, 2)
         result["record_runtime_seconds"] = elapsed_sec
 
-        with open(temp_path, "w", encoding="utf8") as f:
-            json.dump(result, f, indent=2)
+        with stage("write_shard"):
+            serialization.dump(result, temp_path, default=encode_part)
+
+        # The shard keeps what was scraped; the dead letters say where to resume
+        store = get_dead_letters()
+        for failure in result["failures"]:
+            store.add(rec, shard_path=temp_path, **failure)
 
         logger.info(
-            f"Finished record {record_idx} of {total_records} | "
-            f"pages={result['pages_scraped']} | "
-            f"bytes={result['total_bytes']} | "
-            f"time={elapsed_sec}s | "
-            f"seconds_per_page={round(elapsed_sec / result['pages_scraped'], 2) if result['pages_scraped'] else 0}"
+            "Finished record %s of %s | pages=%s | bytes=%s | time=%ss | seconds_per_page=%s",
+            record_idx,
+            total_records,
+            result["pages_scraped"],
+            result["total_bytes"],
+            elapsed_sec,
+            round(elapsed_sec / result["pages_scraped"], 2) if result["pages_scraped"] else 0
         )
 
         return result
 
+    except FetchError as e:
+        logger.warning("Record %s of %s | First page failed | %s", record_idx, total_records, e)
+        return failed_record(rec, dead_letters.FETCH_FAILED, str(e))
+
     except Exception as e:
-        logger.exception(f"Worker failure | {e}")
-        return {"parts": [], "pages_scraped": 0, "total_bytes": 0}
+        logger.exception("Worker failure | %s", e)
+        return failed_record(rec, dead_letters.ERROR, f"{type(e).__name__}: {e}")
 
 # ============================================================
 # ASYNC ENTRY
 # ============================================================
 
-async def scrape_from_csv(csv_path):
-    records = load_catalog_urls(csv_path)
+def merge_results(results):
+    index = PartIndex()
+    total_pages = 0
+    total_bytes = 0
+    timed_out = []
+    failed_records = 0
+    partial_records = 0
+
+    for r in results:
+        for p in r["parts"]:
+            index.add(p)
+        total_pages += r["pages_scraped"]
+        total_bytes += r["total_bytes"]
+        if r.get("timed_out"):
+            timed_out.append(r["url"])
+        if r.get("failed"):
+            failed_records += 1
+        elif r.get("failures"):
+            partial_records += 1
+
+    if timed_out:
+        # Their finished pages are in the shards, so a plain rerun would just
+        # reload them; the dead letters resume each one at its next page
+        logger.warning(f"Timed out records: {len(timed_out)} | resume them with --retry-dead-letters")
+
+    if failed_records or partial_records:
+        logger.warning(
+            f"Dead letters | failed_records={failed_records} | "
+            f"partial_records={partial_records} | "
+            f"retry with --retry-dead-letters"
+        )
+
+    dedup = index.stats()
+    logger.info(
+        f"Dedup | seen={dedup['listings_seen']} | "
+        f"unique={dedup['unique_listings']} | "
+        f"duplicates={dedup['duplicates']} | "
+        f"duplication_ratio={dedup['duplication_ratio']}"
+    )
+
+    try:
+        memo = get_page_memo().stats()
+    except RuntimeError:
+        # Collecting shards runs outside an event loop and fetches nothing
+        memo = None
+
+    if memo:
+        logger.info(
+            f"Page memo | hits={memo['hits']} | "
+            f"misses={memo['misses']} | "
+            f"coalesced={memo['coalesced']} | "
+            f"evictions={memo['evictions']}"
+        )
+
+    try:
+        sizer = get_page_sizer()
+    except RuntimeError:
+        sizer = None
+    page_sizes = sizer.stats() if sizer else None
+
+    if page_sizes:
+        logger.info(
+            f"Page size | state={page_sizes['state']} | "
+            f"param={page_sizes['param']} | size={page_sizes['size']} | "
+            f"default={page_sizes['default_size']} | probes={page_sizes['probes']} | "
+            f"sized_pages={page_sizes['sized_pages']} | "
+            f"default_pages_estimate={page_sizes['default_pages_estimate']} | "
+            f"requests_saved={page_sizes['requests_saved']}"
+        )
+
+    # Only reported when this process actually used the cache
+    facets = _FACET_CACHE.stats() if _FACET_CACHE else None
+    if facets:
+        logger.info(
+            f"Facet cache | hits={facets['hits']} | "
+            f"misses={facets['misses']} | "
+            f"expired={facets['expired']} | "
+            f"unmatched={facets['unmatched']} | "
+            f"invalidations={facets['invalidations']}"
+        )
+
+    return {
+        "parts": index.parts,
+        "total_pages": total_pages,
+        "total_bytes": total_bytes,
+        "dedup": dedup,
+        "page_memo": memo,
+        "facet_cache": facets,
+        "page_sizing": page_sizes,
+        "timed_out": timed_out,
+        "failed_records": failed_records,
+        "partial_records": partial_records
+    }
+
+def select_records(csv_path, makes=None, years=None):
+    return load_catalog_urls(
+        csv_path,
+        part_filter=is_target_part,
+        makes=makes,
+        years=years
+    )
+
+def in_partition(rec, partition):
+    # Stable across processes and runs, unlike hash()
+    index, count = partition
+    return url_fingerprint(rec.url) % count == index
+
+async def scrape_from_csv(
+        csv_path,
+        makes=None,
+        years=None,
+        partition=None,
+        save_costs=True,
+        sample=None,
+        time_budget=None,
+        seed=None
+    ):
+
+    population = select_records(csv_path, makes, years)
 
-    # sample_size = min(2, len(records))
-    # records = random.sample(records, sample_size)
+    if partition:
+        population = [rec for rec in population if in_partition(rec, partition)]
 
-    filtered = []
-    for r in records:
-        name = (r.get("part_name") or "").lower()
-        if name == "engine assembly" or "transmission" in name:
-            filtered.append(r)
+    filtered = stratified_sample(population, sample, seed) if sample else population
 
     total_records = len(filtered)
 
     logger.info(f"Total URLs to scrap: {total_records}")
 
+    config = get_config()
+    config.ensure_dirs()
+
+    # Most expensive records first so the run does not end on a long straggler
+    cost_model = CostModel.load(
+        config.cost_history_path,
+        os.path.join(config.output_root, "parts_scrape_*", "temp")
+    )
+    if time_budget:
+        # Random order so whatever fits in the budget is a fair sample;
+        # longest-first would only show the expensive records
+        scheduler = FifoScheduler(shuffled(filtered, seed), cost_model, record_base_name)
+    else:
+        scheduler = RecordScheduler(filtered, cost_model, record_base_name)
+
+    results = []
+    observed_keys = []
+    loop = asyncio.get_running_loop()
+    start_ts = loop.time()
+    budget_ends = start_ts + time_budget if time_budget else None
+
+    async def worker(session):
+        while True:
+            if budget_ends and loop.time() >= budget_ends:
+                break
+
+            item = scheduler.next()
+            if item is None:
+                break
+
+            idx, rec = item
+            result = await scrape_record(rec, idx, total_records, session)
+            scheduler.observe(rec, result)
+            observed_keys.append(record_base_name(rec))
+            results.append(result)
+
     async with get_aiohttp_session() as session:
-        tasks = [
-            scrape_record(r, idx + 1, total_records, session)
-            for idx, r in enumerate(filtered)
-        ]
-        tasks = tasks[0:2]
-        results = await asyncio.gather(*tasks)
+        await asyncio.gather(*[
+            worker(session)
+            for _ in range(min(config.record_workers, total_records))
+        ])
 
-    all_parts = []
-    total_pages = 0
-    total_bytes = 0
+    if time_budget and len(scheduler):
+        logger.info(f"Time budget reached | records left unscraped={len(scheduler)}")
 
-    for r in results:
-        all_parts.extend(r["parts"])
-        total_pages += r["pages_scraped"]
-        total_bytes += r["total_bytes"]
+    if sample or time_budget:
+        estimate = extrapolate(results, len(population), loop.time() - start_ts, config.record_workers)
+    else:
+        estimate = None
+
+    if not save_costs:
+        # The caller merges histories from several processes and saves once.
+        # Only what this run measured goes back: the rest is the baseline
+        # every process loaded, and would overwrite fresher runtimes from
+        # the partition that owns the record.
+        merged = merge_results(results)
+        merged["cost_history"] = {
+            key: cost_model.history[key]
+            for key in observed_keys
+            if key in cost_model.history
+        }
+        merged["estimate"] = estimate
+        return merged
+
+    cost_model.save(config.cost_history_path)
+
+    merged = merge_results(results)
+    merged["estimate"] = estimate
+    return merged
 
+# ============================================================
+# MULTI-PROCESS LAUNCHER
+# ============================================================
+
+def scrape_partition(settings, partition, makes=None, years=None):
+    """Runs one partition in a worker process with its own loop, session and semaphore."""
+    configure(**settings)
+    setup_logger()
+
+    result = asyncio.run(scrape_from_csv(
+        settings["csv_path"],
+        makes,
+        years,
+        partition=partition,
+        save_costs=False
+    ))
+
+    # Parts stay in the record shards; only totals travel back
     return {
-        "parts": all_parts,
-        "total_pages": total_pages,
-        "total_bytes": total_bytes
+        "partition": partition[0],
+        "total_pages": result["total_pages"],
+        "total_bytes": result["total_bytes"],
+        "unique_listings": result["dedup"]["unique_listings"],
+        "timed_out": result["timed_out"],
+        "failed_records": result["failed_records"],
+        "partial_records": result["partial_records"],
+        "cost_history": result["cost_history"],
     }
 
+def scrape_partitioned(processes, makes=None, years=None):
+    config = get_config()
+    config.ensure_dirs()
+    settings = config.settings()
+
+    logger.info(f"Launching {processes} scraper processes | concurrency per process={config.concurrency}")
+
+    # spawn gives every worker a clean interpreter: no inherited event loop,
+    # log listener thread or sockets
+    ctx = multiprocessing.get_context("spawn")
+    with ctx.Pool(processes) as pool:
+        summaries = pool.starmap(
+            scrape_partition,
+            [(settings, (i, processes), makes, years) for i in range(processes)]
+        )
+
+    cost_model = CostModel.load(config.cost_history_path)
+    for summary in sorted(summaries, key=lambda x: x["partition"]):
+        cost_model.history.update(summary.pop("cost_history"))
+        logger.info(
+            f"Process {summary['partition']} | pages={summary['total_pages']} | "
+            f"bytes={summary['total_bytes']} | listings={summary['unique_listings']}"
+        )
+    cost_model.save(config.cost_history_path)
+
+    # Every process wrote its records' shards; merging them dedups across partitions
+    records = select_records(config.csv_path, makes, years)
+    result = collect_shards(
+        (rec, record_shard_path(rec))
+        for rec in records
+        if os.path.exists(record_shard_path(rec))
+    )
+
+    result["processes"] = summaries
+    reported_pages = sum(x["total_pages"] for x in summaries)
+    if reported_pages != result["total_pages"]:
+        logger.warning(
+            f"Page totals differ | processes={reported_pages} | shards={result['total_pages']}"
+        )
+
+    return result
+
 # ============================================================
-# RUN
+# DISTRIBUTED QUEUE WORKER
 # ============================================================
 
-if __name__ == "__main__":
+# Seconds an idle worker waits before checking for expired leases again
+QUEUE_IDLE_POLL = 15
 
-    program_start_ts = time.perf_counter()
+def queue_summary(rec, result):
+    # The queue keeps the whole shard, so collect works from any host,
+    # directory or day without reaching this worker's output_root
+    if result.get("failures"):
+        status = "partial"
+    else:
+        status = "ok"
+
+    shard = {k: v for k, v in result.items() if k != "parts"}
+    shard["parts"] = [p.to_dict() for p in result["parts"]]
+
+    return {
+        "record": rec._asdict(),
+        "status": status,
+        "shard": shard,
+        "pages_scraped": result["pages_scraped"],
+        "total_bytes": result["total_bytes"],
+        "record_runtime_seconds": result.get("record_runtime_seconds"),
+    }
+
+async def scrape_from_queue(work_queue, worker_id=None, lease_seconds=LEASE_SECONDS):
+    """
+    Scrapes records claimed from work_queue until it runs dry. Each of the
+    record_workers coroutines leases one record at a time, so a worker
+    never holds more than it is scraping. Failed records are set aside as
+    failed for work_queue requeue rather than completed.
+    """
+    config = get_config()
+    config.ensure_dirs()
+    worker_id = worker_id or default_worker_id()
+    loop = asyncio.get_running_loop()
+
+    held = set()
+    results = []
+    counter = {"started": 0, "duplicates": 0, "failed": 0}
+
+    async def renew_leases():
+        while True:
+            await asyncio.sleep(lease_seconds / 3)
+            if held:
+                await loop.run_in_executor(None, work_queue.extend, worker_id, list(held), lease_seconds)
+
+    async def worker(session):
+        while True:
+            batch = await loop.run_in_executor(None, work_queue.claim, worker_id, 1, lease_seconds)
+
+            if not batch:
+                # Leases held elsewhere may still expire and come back
+                stats = await loop.run_in_executor(None, work_queue.stats)
+                if not stats["states"][LEASED]:
+                    break
+                await asyncio.sleep(QUEUE_IDLE_POLL)
+                continue
 
-    CSV_PATH = "output/ic_parts_data_combined_with_links_from_autopartsearch.csv"
+            (key, payload), = batch
+            held.add(key)
 
-    result = asyncio.run(scrape_from_csv(CSV_PATH))
+            rec = CatalogRecord(**payload)
+            counter["started"] += 1
+            result = await scrape_record(rec, counter["started"], "?", session)
 
-    all_parts = result["parts"]
-    total_pages = result["total_pages"]
-    total_bytes = result["total_bytes"]
+            if result.get("failed"):
+                await loop.run_in_executor(None, work_queue.fail, worker_id, key, result["failed"])
+                held.discard(key)
+                counter["failed"] += 1
+                results.append(result)
+                continue
+
+            first = await loop.run_in_executor(
+                None, work_queue.complete, worker_id, key, queue_summary(rec, result)
+            )
+            held.discard(key)
+
+            # Someone else finished it after our lease ran out; theirs stands
+            if not first:
+                counter["duplicates"] += 1
+                continue
+
+            results.append(result)
+
+    renewer = asyncio.create_task(renew_leases())
+    try:
+        async with get_aiohttp_session() as session:
+            await asyncio.gather(*[worker(session) for _ in range(config.record_workers)])
+    finally:
+        renewer.cancel()
 
-    logger.info(f"TOTAL pages scraped: {total_pages}")
-    logger.info(f"TOTAL bytes transferred: {total_bytes}")
     logger.info(
-        f"AVERAGE page size: {int(total_bytes / total_pages) if total_pages else 0} bytes"
+        f"Queue worker {worker_id} done | records={counter['started']} | "
+        f"failed={counter['failed']} | already_completed_elsewhere={counter['duplicates']}"
     )
 
-    final_path = os.path.join(FINAL_DIR, f"parts_data_{RUN_DATE}.json")
-    with open(final_path, "w", encoding="utf8") as f:
-        json.dump(all_parts, f, indent=2)
+    result = merge_results(results)
+    result["queue_records"] = counter["started"]
+    return result
+
+def collect_queue_results(entries):
+    """Merges the (key, summary) results of a work queue, as merge_results does."""
+    results = []
+    for _, entry in entries:
+        rec = CatalogRecord(**entry["record"])
+        shard = entry["shard"]
+        shard["parts"] = parts_from_dicts(shard["parts"], rec)
+        results.append(shard)
+
+    return merge_results(results)
+
+def collect_shards(items):
+    """Merges (CatalogRecord, shard_path) pairs into one result, as merge_results does."""
+    results = []
+    for rec, shard_path in items:
+        if not os.path.exists(shard_path):
+            logger.warning(f"Missing shard {shard_path}")
+            continue
+        with stage("read_shard"):
+            result = serialization.load(shard_path)
+            result["parts"] = parts_from_dicts(result["parts"], rec)
+        results.append(result)
+
+    return merge_results(results)
+
+# ============================================================
+# DEAD LETTER RETRY
+# ============================================================
+
+async def resume_record(rec, entries, record_idx, total_records, session):
+    shard_path = entries[0]["shard_path"]
+
+    with stage("read_shard"):
+        shard = serialization.load(shard_path)
+    parts = parts_from_dicts(shard["parts"], rec)
+
+    pages_scraped = shard.get("pages_scraped", 0)
+    total_bytes = shard.get("total_bytes", 0)
+    failures = []
+
+    for entry in entries:
+        logger.info(
+            "Record %s of %s | Resuming %s at page %s | %s",
+            record_idx, total_records, entry["reason"], entry["failed_page"], entry["application_url"]
+        )
+        result = await scrape_all_pages(
+            entry["application_url"],
+            entry["application"],
+            session,
+            record_idx,
+            total_records,
+            max_pages=entry["failed_page"] + MAX_PAGES - 1,
+            start_page=entry["failed_page"],
+            page_param=tuple(entry["page_param"]) if entry.get("page_param") else None
+        )
+
+        for p in result["parts"]:
+            p.source = rec
+
+        parts.extend(result["parts"])
+        pages_scraped += result["pages_scraped"]
+        total_bytes += result["total_bytes"]
+        if result["failure"]:
+            failures.append(result["failure"])
+
+    shard.update({
+        "parts": parts,
+        "pages_scraped": pages_scraped,
+        "total_bytes": total_bytes,
+        "avg_page_size": int(total_bytes / pages_scraped) if pages_scraped else 0,
+        "failures": failures,
+    })
+
+    with stage("write_shard"):
+        serialization.dump(shard, shard_path, default=encode_part)
+
+    store = get_dead_letters()
+    for failure in failures:
+        store.add(rec, shard_path=shard_path, **failure)
+
+    return shard
+
+async def retry_record(rec, entries, record_idx, total_records, session):
+    shard_path = entries[0].get("shard_path")
+    resumable = (
+        shard_path
+        and os.path.exists(shard_path)
+        and all(e.get("failed_page") for e in entries)
+    )
+
+    # Record-level failures left no shard behind, so start them over
+    if not resumable:
+        return await scrape_record(rec, record_idx, total_records, session)
+
+    try:
+        return await resume_record(rec, entries, record_idx, total_records, session)
+    except Exception as e:
+        logger.exception("Resume failure | %s", e)
+        store = get_dead_letters()
+        for entry in entries:
+            store.append(entry)
+        return {"parts": [], "pages_scraped": 0, "total_bytes": 0, "failed": dead_letters.ERROR, "url": rec.url}
+
+async def retry_dead_letters():
+    config = get_config()
+    config.ensure_dirs()
+
+    store = get_dead_letters()
+    entries = store.take()
+
+    # One retry per record; repeated entries for the same page (say, from
+    # an interrupted retry) are resumed once
+    grouped = OrderedDict()
+    for entry in entries:
+        rec = CatalogRecord(**entry["record"])
+        rec_entries = grouped.setdefault(rec, {})
+        rec_entries.setdefault((entry["application_url"], entry.get("failed_page")), entry)
+
+    pending = [(rec, list(rec_entries.values())) for rec, rec_entries in grouped.items()]
+    total_records = len(pending)
+    logger.info(f"Dead letters to retry: {len(entries)} | records={total_records}")
+
+    results = []
+    counter = {"started": 0}
+
+    async def worker(session):
+        while pending:
+            rec, rec_entries = pending.pop(0)
+            counter["started"] += 1
+            results.append(
+                await retry_record(rec, rec_entries, counter["started"], total_records, session)
+            )
+
+    async with get_aiohttp_session() as session:
+        await asyncio.gather(*[
+            worker(session)
+            for _ in range(min(config.record_workers, total_records))
+        ])
+
+    # New failures were appended to a fresh store while retrying
+    store.finish()
+
+    return merge_results(results)
+
+# ============================================================
+# STREAMING HANDOFF FROM LINK EXTRACTION
+# ============================================================
+
+# The extractors drop this marker next to their links CSV once they are done
+LINKS_DONE_SUFFIX = ".done"
+
+def links_row_to_record(row):
+    url = row.get("url")
+    if not url:
+        return None
+
+    return CatalogRecord(
+        year=row.get("year"),
+        make=row.get("make"),
+        model=row.get("model"),
+        part_name=row.get("part_name"),
+        part_slug=row.get("part_slug"),
+        url=url,
+        ic_description=row.get("ic_description"),
+    )
+
+async def tail_links_csv(links_csv_path, queue, seen_urls, poll_interval=2.0, idle_timeout=None):
+    """
+    Queues target records from a links CSV while an extractor writes it.
+
+    Stops once the extractor's .done marker appears and the file is drained,
+    or once the file has not grown (or not appeared) for idle_timeout
+    seconds, so an extractor that dies without a marker does not leave the
+    scrape polling forever.
+    """
+    if idle_timeout is None:
+        idle_timeout = get_config().stream_idle_timeout
+
+    done_path = links_csv_path + LINKS_DONE_SUFFIX
+    last_growth = time.monotonic()
+
+    def idle():
+        return idle_timeout and time.monotonic() - last_growth > idle_timeout
+
+    while not os.path.exists(links_csv_path):
+        if os.path.exists(done_path):
+            logger.warning(f"Links file never written, extractor finished | {links_csv_path}")
+            return
+        if idle():
+            logger.warning(f"Links file never appeared after {idle_timeout}s | {links_csv_path}")
+            return
+        await asyncio.sleep(poll_interval)
+
+    logger.info(f"Following links file {links_csv_path}")
+
+    header = None
+    pending = ""
+    queued = 0
+    last_growth = time.monotonic()
+
+    with open(links_csv_path, newline="", encoding="utf8") as f:
+        while True:
+            # Check the marker before reading so the last rows are always drained
+            finished = os.path.exists(done_path)
+            chunk = f.read()
+
+            if chunk:
+                last_growth = time.monotonic()
+                pending += chunk
+                # Keep a trailing partial line until the extractor flushes the rest
+                *complete, pending = pending.split("\n")
+
+                for row in csv.reader(complete):
+                    if not row:
+                        continue
+                    if header is None:
+                        header = row
+                        continue
+
+                    rec = links_row_to_record(dict(zip(header, row)))
+                    if not rec or not is_target_part(rec.part_name):
+                        continue
+
+                    fingerprint = url_fingerprint(rec.url)
+                    if fingerprint in seen_urls:
+                        continue
+
+                    seen_urls.add(fingerprint)
+                    await queue.put(rec)
+                    queued += 1
+
+            elif finished:
+                with open(done_path, encoding="utf8") as marker:
+                    if "failed" in marker.read():
+                        logger.warning(f"Extractor failed part way | {links_csv_path} holds a partial run")
+                break
+
+            elif idle():
+                logger.warning(
+                    f"Links file idle for {idle_timeout}s with no {LINKS_DONE_SUFFIX} marker, "
+                    f"extractor presumed dead | {links_csv_path}"
+                )
+                break
+
+            else:
+                await asyncio.sleep(poll_interval)
+
+    logger.info(f"Links file complete | {links_csv_path} | queued={queued}")
+
+async def scrape_from_stream(links_csv_paths, workers=None):
+    config = get_config()
+    config.ensure_dirs()
+    workers = workers or config.record_workers
+    queue = asyncio.Queue()
+    seen_urls = set()
+    results = []
+    counter = {"started": 0}
+
+    async def worker(session):
+        while True:
+            rec = await queue.get()
+            if rec is None:
+                break
+
+            counter["started"] += 1
+            results.append(await scrape_record(rec, counter["started"], "?", session))
+
+    async with get_aiohttp_session() as session:
+        consumers = [asyncio.create_task(worker(session)) for _ in range(workers)]
+
+        await asyncio.gather(*[
+            tail_links_csv(path, queue, seen_urls)
+            for path in links_csv_paths
+        ])
+
+        for _ in consumers:
+            await queue.put(None)
+
+        await asyncio.gather(*consumers)
+
+    logger.info(f"Total URLs scraped from stream: {counter['started']}")
+
+    return merge_results(results)
+
+# ============================================================
+# RUN
+# ============================================================
+
+def log_estimate(estimate):
+    projected = estimate.get("projected")
+    logger.info(
+        f"SAMPLE observed {estimate['observed_records']} of {estimate['population_records']} records | "
+        f"failed={estimate['failed_records']} | from_shards={estimate['cached_records']} | "
+        f"wall={estimate['observed']['wall_seconds']}s"
+    )
+    if not projected:
+        logger.warning("SAMPLE too small to project the full run")
+        return
+
+    logger.info(
+        f"PROJECTED full run | pages={projected['pages']} (95% {projected['pages_ci95']}) | "
+        f"bytes={projected['bytes']} (~{projected['gigabytes']} GB) | "
+        f"wall_hours={projected['wall_hours']} at workers={projected['workers']}"
+    )
+
+def write_final(result, output_tag=""):
+    config = get_config()
+    all_parts = result["parts"]
+
+    with stage("write_final"):
+        if config.split_yard_output:
+            yards_path = os.path.join(config.final_dir, f"yards_{config.run_date}{output_tag}{config.final_suffix}")
+            yards = yard_dimension(all_parts)
+            serialization.write_json_array(yards_path, yards)
+            logger.info(f"Saved {len(yards)} yards to {yards_path}")
+
+        default = encode_fact if config.split_yard_output else encode_part
+
+        if config.partition_by:
+            final_path = os.path.join(config.final_dir, f"parts_data_{config.run_date}{output_tag}")
+            manifest = write_partitions(
+                final_path,
+                all_parts,
+                config.partition_by,
+                config.final_suffix,
+                default=default,
+                extra={
+                    "run_ts": config.run_ts,
+                    "yards_path": os.path.basename(yards_path) if config.split_yard_output else None,
+                }
+            )
+            logger.info(
+                f"Saved {manifest['total_rows']} parts in {len(manifest['partitions'])} partitions "
+                f"by {'/'.join(manifest['partition_by'])} ({manifest['total_bytes']} bytes)"
+            )
+            return final_path
+
+        final_path = os.path.join(config.final_dir, f"parts_data_{config.run_date}{output_tag}{config.final_suffix}")
+        serialization.write_json_array(final_path, all_parts, default=default)
+
+    return final_path
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scrape AutoPartSearch part listings")
+    parser.add_argument("--csv", default=DEFAULT_CSV_PATH, help="combined links CSV to scrape")
+    parser.add_argument(
+        "--stream",
+        nargs="+",
+        metavar="LINKS_CSV",
+        help="follow live autopartsearch_all_links_<ts>.csv files instead of --csv"
+    )
+    parser.add_argument(
+        "--retry-dead-letters",
+        action="store_true",
+        help="only reprocess records in <output-root>/dead_letters.ndjson, resuming at the failed page"
+    )
+    parser.add_argument(
+        "--queue",
+        metavar="DB",
+        help="work through records from a shared work_queue.sqlite instead of --csv"
+    )
+    parser.add_argument("--worker-id", help="queue worker name (default host-pid)")
+    parser.add_argument("--lease-seconds", type=int, default=LEASE_SECONDS)
+    parser.add_argument(
+        "--sample",
+        type=int,
+        metavar="N",
+        help="scrape N records stratified by make/year/part and project the full run"
+    )
+    parser.add_argument(
+        "--time-budget",
+        type=float,
+        metavar="MINUTES",
+        help="scrape records in random order for this long and project the full run"
+    )
+    parser.add_argument("--seed", type=int, help="sampling seed, for repeatable samples")
+    parser.add_argument("--make", action="append", help="only scrape this make (repeatable)")
+    parser.add_argument("--year", action="append", help="only scrape this year (repeatable)")
+    parser.add_argument("--concurrency", type=int, default=15, help="page fetches in flight per process")
+    parser.add_argument("--workers", type=int, default=15, help="records in flight")
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=1,
+        help="split --csv records across this many processes by URL hash"
+    )
+    parser.add_argument("--request-deadline", type=int, default=60, help="seconds per page including retries")
+    parser.add_argument("--record-deadline", type=int, default=1800, help="seconds per record, 0 for none")
+    parser.add_argument(
+        "--stall-timeout",
+        type=int,
+        default=300,
+        help="cancel a record that finishes no page for this many seconds, 0 for never"
+    )
+    parser.add_argument(
+        "--stream-idle-timeout",
+        type=int,
+        default=1800,
+        help="stop following a --stream file that has not grown for this many seconds, 0 for never"
+    )
+    parser.add_argument("--no-proxy", action="store_true")
+    parser.add_argument("--output-root", default="output")
+    parser.add_argument("--log-dir", default="logs")
+    parser.add_argument("--shard-suffix", default=".json", choices=[".json", ".json.gz", ".json.zst"])
+    parser.add_argument("--final-suffix", default=".json", choices=[".json", ".json.gz", ".json.zst"])
+    parser.add_argument(
+        "--split-yards",
+        action="store_true",
+        help="move seller fields out of parts_data into a yards_<date> file (changes the parts_data schema)"
+    )
+    parser.add_argument(
+        "--facet-ttl",
+        type=int,
+        default=7 * 24 * 3600,
+        help="seconds a cached application facet is trusted, 0 to always discover"
+    )
+    parser.add_argument(
+        "--refresh-facets",
+        action="store_true",
+        help="rediscover every application facet and overwrite the cache"
+    )
+    parser.add_argument(
+        "--negotiate-page-size",
+        action="store_true",
+        help="probe for a page-size parameter and paginate with the largest size the catalog serves"
+    )
+    parser.add_argument(
+        "--stream-parse",
+        action="store_true",
+        help="parse listing pages chunk by chunk as they download instead of buffering each body"
+    )
+    parser.add_argument(
+        "--partition-by",
+        type=parse_levels,
+        metavar="LEVELS",
+        help="write parts_data_<date>/ as one file per partition plus manifest.json; "
+             "LEVELS is make,year or make,year,slug"
+    )
+    parser.add_argument(
+        "--harvest-images",
+        action="store_true",
+        help="download listing images into a content-addressed store after scraping"
+    )
+    parser.add_argument("--image-root", default=DEFAULT_IMAGE_ROOT)
+    parser.add_argument("--image-concurrency", type=int, default=8)
+    parser.add_argument("--image-max-mbps", type=float, help="bandwidth cap for image downloads")
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="record cumulative and per-call timings for fetch, parse, enrich and write"
+    )
+    parser.add_argument("--cprofile", metavar="PATH", help="write cProfile stats to PATH")
+    parser.add_argument(
+        "--flamegraph",
+        metavar="PATH",
+        help="sample the event loop thread into a collapsed-stack file at PATH"
+    )
+    args = parser.parse_args(argv)
+
+    # Partitioned workers each scrape their whole share; a sample or budget
+    # projected from one partition would not describe the run
+    if args.processes > 1 and (args.sample or args.time_budget or args.seed is not None):
+        parser.error("--sample, --time-budget and --seed run in a single process; drop --processes")
+
+    config = configure(
+        csv_path=args.csv,
+        output_root=args.output_root,
+        log_dir=args.log_dir,
+        use_proxy=not args.no_proxy,
+        concurrency=args.concurrency,
+        record_workers=args.workers,
+        request_deadline=args.request_deadline,
+        record_deadline=args.record_deadline,
+        stall_timeout=args.stall_timeout,
+        stream_idle_timeout=args.stream_idle_timeout,
+        split_yard_output=args.split_yards,
+        shard_suffix=args.shard_suffix,
+        final_suffix=args.final_suffix,
+        partition_by=args.partition_by,
+        facet_ttl=args.facet_ttl,
+        refresh_facets=args.refresh_facets,
+        stream_parse=args.stream_parse,
+        negotiate_page_size=args.negotiate_page_size,
+    )
+    config.ensure_dirs()
+    setup_logger()
+    logger.info("Starting AutoPartSearch scrape")
+
+    program_start_ts = time.perf_counter()
+
+    with ProfileSession(args.profile, args.cprofile, args.flamegraph) as profile_session:
+        # A retry run only holds the retried records, so it gets its own files
+        output_tag = "_retry" if args.retry_dead_letters else ""
+
+        if args.queue:
+            # Each worker only scraped part of the run; work_queue collect
+            # writes the combined final file
+            output_tag = f"_{args.worker_id or default_worker_id()}"
+            result = asyncio.run(scrape_from_queue(
+                open_queue(args.queue),
+                args.worker_id,
+                args.lease_seconds
+            ))
+        elif args.retry_dead_letters:
+            result = asyncio.run(retry_dead_letters())
+        elif args.stream:
+            result = asyncio.run(scrape_from_stream(args.stream))
+        elif args.processes > 1:
+            result = scrape_partitioned(args.processes, args.make, args.year)
+        else:
+            result = asyncio.run(scrape_from_csv(
+                config.csv_path,
+                args.make,
+                args.year,
+                sample=args.sample,
+                time_budget=args.time_budget * 60 if args.time_budget else None,
+                seed=args.seed
+            ))
+
+        if result.get("estimate"):
+            # A sample only holds part of the run, so it gets its own files
+            output_tag = "_sample"
+            log_estimate(result["estimate"])
+            estimate_path = os.path.join(config.run_root, f"estimate_{config.run_ts}.json")
+            serialization.dump(result["estimate"], estimate_path)
+            logger.info(f"Saved run estimate to {estimate_path}")
+
+        total_pages = result["total_pages"]
+        total_bytes = result["total_bytes"]
+
+        logger.info(f"TOTAL pages scraped: {total_pages}")
+        logger.info(f"TOTAL bytes transferred: {total_bytes}")
+        logger.info(
+            f"AVERAGE page size: {int(total_bytes / total_pages) if total_pages else 0} bytes"
+        )
+
+        if args.queue and not result["queue_records"]:
+            # Other workers drained the queue first; there is nothing to write
+            logger.info("Queue worker scraped no records, skipping final files")
+            final_path = None
+        else:
+            final_path = write_final(result, output_tag)
+
+        if args.harvest_images:
+            with stage("harvest_images"):
+                asyncio.run(harvest(
+                    image_urls(result["parts"]),
+                    args.image_root,
+                    args.image_concurrency,
+                    args.image_max_mbps * 125_000 if args.image_max_mbps else None,
+                    config.proxy_url
+                ))
+
+    if args.profile:
+        profile_path = os.path.join(config.run_root, f"profile_{config.run_ts}.json")
+        report = profile_session.write_stage_report(profile_path)
+        for row in report["stages"]:
+            logger.info(
+                f"PROFILE {row['stage']} | calls={row['calls']} | "
+                f"total={row['total_seconds']}s | mean={row['mean_ms']}ms | "
+                f"max={row['max_ms']}ms | share={row['share_of_wall']}"
+            )
+        logger.info(f"Saved stage profile to {profile_path}")
 
     program_elapsed_sec = round(time.perf_counter() - program_start_ts, 2)
     logger.info(f"TOTAL runtime seconds: {program_elapsed_sec}")
 
-    logger.info(f"Saved final parts file to {final_path}")
+    if final_path:
+        logger.info(f"Saved final parts file to {final_path}")
+
+if __name__ == "__main__":
+    main()
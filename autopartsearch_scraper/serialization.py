@@ -0,0 +1,142 @@
+import gzip
+import io
+import json
+import os
+
+# Optional fast paths: orjson for encoding/decoding, zstandard for .zst files
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# ============================================================
+# CONFIG
+# ============================================================
+
+GZIP_LEVEL = 5
+ZSTD_LEVEL = 3
+
+# ============================================================
+# COMPRESSED FILES
+# ============================================================
+
+def compression_for(path):
+    if path.endswith(".gz"):
+        return "gz"
+    if path.endswith(".zst"):
+        return "zst"
+    return None
+
+def open_binary(path, mode="rb", compression_path=None):
+    """Opens path for binary reading or writing, compressing by extension."""
+    kind = compression_for(compression_path or path)
+
+    if kind == "gz":
+        return gzip.open(path, mode, compresslevel=GZIP_LEVEL) if "w" in mode else gzip.open(path, mode)
+
+    if kind == "zst":
+        if zstandard is None:
+            raise RuntimeError(f"zstandard is not installed, cannot open {path}")
+        fh = open(path, mode)
+        if "w" in mode:
+            return zstandard.ZstdCompressor(level=ZSTD_LEVEL).stream_writer(fh)
+        return zstandard.ZstdDecompressor().stream_reader(fh)
+
+    return open(path, mode)
+
+def open_text(path, mode="r"):
+    return io.TextIOWrapper(open_binary(path, mode + "b"), encoding="utf8")
+
+# ============================================================
+# ENCODING
+# ============================================================
+
+def dumps(obj, default=None):
+    if orjson is not None:
+        return orjson.dumps(obj, default=default)
+    return json.dumps(obj, separators=(",", ":"), default=default).encode("utf8")
+
+def loads(data):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def dump(obj, path, default=None):
+    # Written to a temp file first so an interrupted run never leaves a
+    # truncated shard behind for the resume path to trip over
+    tmp_path = f"{path}.tmp"
+    with open_binary(tmp_path, "wb", compression_path=path) as f:
+        f.write(dumps(obj, default))
+    os.replace(tmp_path, path)
+
+def load(path):
+    with open_binary(path, "rb") as f:
+        return loads(f.read())
+
+# ============================================================
+# STREAMING ARRAYS
+# ============================================================
+
+def write_json_array(path, items, default=None):
+    """Streams items into a JSON array file one element at a time."""
+    count = 0
+    tmp_path = f"{path}.tmp"
+
+    with open_binary(tmp_path, "wb", compression_path=path) as f:
+        f.write(b"[")
+        for item in items:
+            if count:
+                f.write(b",\n")
+            f.write(dumps(item, default))
+            count += 1
+        f.write(b"]\n")
+
+    os.replace(tmp_path, path)
+    return count
+
+def iter_json_array(path, chunk_size=1 << 20):
+    """Yields the objects of a top-level JSON array without loading the file."""
+    decoder = json.JSONDecoder()
+
+    with open_text(path) as f:
+        buf = f.read(chunk_size).lstrip()
+        if not buf:
+            return
+        if not buf.startswith("["):
+            raise ValueError(f"{path} is not a JSON array")
+
+        pos = 1
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n,":
+                pos += 1
+
+            if pos >= len(buf):
+                more = f.read(chunk_size)
+                if not more:
+                    return
+                buf, pos = more, 0
+                continue
+
+            if buf[pos] == "]":
+                return
+
+            try:
+                obj, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                # Object straddles the chunk boundary
+                more = f.read(chunk_size)
+                if not more:
+                    raise
+                buf, pos = buf[pos:] + more, 0
+                continue
+
+            yield obj
+            pos = end
+
+            if pos > chunk_size:
+                buf, pos = buf[pos:], 0
@@ -1,16 +1,21 @@
+import argparse
 import csv
 import os
 import logging
 from datetime import datetime
+from functools import partial
 from multiprocessing import Pool, current_process
 
 from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.service import Service
 from webdriver_manager.chrome import ChromeDriverManager
 
+from .deadlines import BrowserWatchdog
+
 # ============================================================
 # GLOBAL CONFIG
 # ============================================================
@@ -20,26 +25,27 @@ MIN_YEAR = 2006
 MAX_YEAR = 2013
 NUM_WORKERS = 5
 
+# Seconds before a page load or script gives up, and before the watchdog
+# quits a browser that has not finished a model
+PAGE_LOAD_TIMEOUT = 60
+SCRIPT_TIMEOUT = 30
+BROWSER_STALL_SECONDS = 300
+
 LOG_DIR = "logs"
 OUT_DIR = "output"
 
-os.makedirs(LOG_DIR, exist_ok=True)
-os.makedirs(OUT_DIR, exist_ok=True)
-
-RUN_TS = datetime.now().strftime("%Y%m%d%H%M%S")
-
 # ============================================================
 # LOGGING SETUP PER PROCESS
 # ============================================================
 
-def setup_logger(year):
+def setup_logger(year, run_ts):
     logger = logging.getLogger(f"scraper_{year}")
     logger.setLevel(logging.INFO)
     logger.handlers.clear()
 
     log_file = os.path.join(
         LOG_DIR,
-        f"autopartsearch_{year}_{RUN_TS}.log"
+        f"autopartsearch_{year}_{run_ts}.log"
     )
 
     formatter = logging.Formatter(
@@ -61,6 +67,14 @@ def setup_logger(year):
 # SELENIUM HELPERS
 # ============================================================
 
+def new_driver():
+    driver = webdriver.Chrome(
+        service=Service(ChromeDriverManager().install())
+    )
+    driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT)
+    driver.set_script_timeout(SCRIPT_TIMEOUT)
+    return driver
+
 def select2_click(driver, container_css, visible_text):
     control = WebDriverWait(driver, 20).until(
         EC.element_to_be_clickable((By.CSS_SELECTOR, container_css))
@@ -111,18 +125,26 @@ def get_select_options(driver, css_selector):
 # WORKER FUNCTION
 # ============================================================
 
-def scrape_year(year):
-    logger = setup_logger(year)
+def scrape_year(year, run_ts):
+    # The parent passes run_ts so every worker writes under the same run
+    logger = setup_logger(year, run_ts)
     logger.info(f"Starting scrape for year {year}")
 
     csv_path = os.path.join(
         OUT_DIR,
-        f"autopartsearch_{year}_{RUN_TS}.csv"
+        f"autopartsearch_{year}_{run_ts}.csv"
     )
 
-    driver = webdriver.Chrome(
-        service=Service(ChromeDriverManager().install())
+    timeouts_path = os.path.join(
+        OUT_DIR,
+        f"autopartsearch_{year}_{run_ts}_timeouts.csv"
     )
+    timed_out = []
+
+    driver = new_driver()
+    watchdog = BrowserWatchdog(BROWSER_STALL_SECONDS, logger).start()
+    watchdog.attach(driver)
+    completed = False
 
     try:
         driver.get(BASE_URL)
@@ -154,26 +176,51 @@ def scrape_year(year):
                 logger.info(f"{year} {make} models {len(models)}")
 
                 for model in models:
-                    select2_click(driver, "span#select2-afmkt-model-container", model)
-
                     try:
-                        parts = get_part_types(driver)
-                    except Exception as e:
-                        logger.error(f"Parts failed {year} {make} {model} {e}")
-                        writer.writerow([RUN_TS, year, make, model, "", "", "", 0])
-                        out.flush()
+                        select2_click(driver, "span#select2-afmkt-model-container", model)
+
+                        try:
+                            parts = get_part_types(driver)
+                        except Exception as e:
+                            if watchdog.tripped:
+                                raise
+                            logger.error(f"Parts failed {year} {make} {model} {e}")
+                            writer.writerow([run_ts, year, make, model, "", "", "", 0])
+                            out.flush()
+                            continue
+
+                    except WebDriverException as e:
+                        # Stuck or killed browser: note the model and carry on
+                        # in a fresh one positioned at the same make
+                        reason = "watchdog" if watchdog.tripped else type(e).__name__
+                        logger.error(f"Timed out {year} {make} {model} | {reason}")
+                        timed_out.append([year, make, model, reason])
+
+                        try:
+                            driver.quit()
+                        except Exception:
+                            pass
+
+                        driver = new_driver()
+                        watchdog.attach(driver)
+                        driver.get(BASE_URL)
+                        select2_click(driver, "span#select2-afmkt-year-container", year)
+                        select2_click(driver, "span#select2-afmkt-make-container", make)
                         continue
 
+                    finally:
+                        watchdog.beat()
+
                     part_count = len(parts)
                     if part_count == 0:
-                        writer.writerow([RUN_TS, year, make, model, "", "", "", 0])
+                        writer.writerow([run_ts, year, make, model, "", "", "", 0])
                         out.flush()
                         continue
 
                     for part_name, part_slug in parts:
                         url = f"https://www.autopartsearch.com/catalog-6/vehicle/{make}/{year}/{model}/{part_slug}"
                         writer.writerow([
-                            RUN_TS,
+                            run_ts,
                             year,
                             make,
                             model,
@@ -185,35 +232,60 @@ def scrape_year(year):
 
                 out.flush()
 
+        if timed_out:
+            with open(timeouts_path, "w", newline="", encoding="utf8") as f:
+                writer = csv.writer(f)
+                writer.writerow(["year", "make", "model", "reason"])
+                writer.writerows(timed_out)
+            logger.warning(f"{year} timed out models: {len(timed_out)} | {timeouts_path}")
+
+        completed = True
         logger.info(f"Completed scrape for year {year}")
 
     finally:
-        driver.quit()
+        # Lets scrap_parts_data stop following this file, even when the year
+        # failed part way through
+        with open(f"{csv_path}.done", "w", encoding="utf8") as f:
+            f.write(run_ts if completed else f"{run_ts} failed")
+
+        watchdog.stop()
+        try:
+            driver.quit()
+        except Exception:
+            pass
         logger.info(f"Browser closed for year {year}")
 
 # ============================================================
 # PARENT PROCESS
 # ============================================================
 
-def main():
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Collect AutoPartSearch catalog links, one process per year")
+    parser.add_argument("--min-year", type=int, default=MIN_YEAR)
+    parser.add_argument("--max-year", type=int, default=MAX_YEAR)
+    parser.add_argument("--workers", type=int, default=NUM_WORKERS)
+    args = parser.parse_args(argv)
+
+    os.makedirs(LOG_DIR, exist_ok=True)
+    os.makedirs(OUT_DIR, exist_ok=True)
+    run_ts = datetime.now().strftime("%Y%m%d%H%M%S")
+
     print("Starting multiprocessing AutoPartSearch scrape")
 
-    temp_driver = webdriver.Chrome(
-        service=Service(ChromeDriverManager().install())
-    )
+    temp_driver = new_driver()
     temp_driver.get(BASE_URL)
 
     years = get_select_options(temp_driver, "select#afmkt-year")
     temp_driver.quit()
 
-    years = [y for y in years if int(y) >= MIN_YEAR and int(y) <= MAX_YEAR]
+    years = [y for y in years if int(y) >= args.min_year and int(y) <= args.max_year]
     # sort newest to oldest
     years = sorted(years, reverse=True)
     
     print(f"Years queued: {len(years)}")
 
-    with Pool(processes=NUM_WORKERS) as pool:
-        pool.map(scrape_year, years)
+    with Pool(processes=args.workers) as pool:
+        pool.map(partial(scrape_year, run_ts=run_ts), years)
 
     print("All workers finished")
 
@@ -0,0 +1,455 @@
+import argparse
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+
+from .partitions import parse_levels
+
+# ============================================================
+# CONFIG
+# ============================================================
+
+DEFAULT_QUEUE_PATH = os.path.join("output", "work_queue.sqlite")
+
+LEASE_SECONDS = 600
+BATCH_SIZE = 10
+
+# A record whose lease expires this many times is set aside as abandoned
+MAX_ATTEMPTS = 5
+
+PENDING = "pending"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+ABANDONED = "abandoned"
+
+STATES = (PENDING, LEASED, DONE, FAILED, ABANDONED)
+
+logger = logging.getLogger("autopartsearch_scraper")
+
+def default_worker_id():
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+# ============================================================
+# BACKENDS
+# ============================================================
+
+class WorkQueue(ABC):
+    """
+    Records handed out in batches under time-limited leases.
+
+    Workers claim a batch, extend the lease while they work and complete
+    each record. A lease that runs out puts its unfinished records back in
+    the queue. Results are keyed by record, so a record completed twice
+    (say, by a worker that lost its lease but finished anyway) keeps the
+    first result. A record that fails is set aside as failed until
+    requeue_failed puts it back.
+    """
+
+    @abstractmethod
+    def enqueue(self, items):
+        """items: (key, payload dict) pairs. Returns how many were new."""
+
+    @abstractmethod
+    def claim(self, worker_id, batch_size=BATCH_SIZE, lease_seconds=LEASE_SECONDS):
+        """Returns up to batch_size (key, payload) pairs leased to worker_id."""
+
+    @abstractmethod
+    def extend(self, worker_id, keys, lease_seconds=LEASE_SECONDS):
+        """Renews worker_id's lease on keys it still holds."""
+
+    @abstractmethod
+    def complete(self, worker_id, key, result):
+        """Records result for key. Returns False when key already had one."""
+
+    @abstractmethod
+    def fail(self, worker_id, key, reason):
+        """Sets key aside as failed, unless it already has a result."""
+
+    @abstractmethod
+    def requeue_failed(self):
+        """Puts failed records back in the queue. Returns how many."""
+
+    @abstractmethod
+    def requeue_expired(self):
+        """Puts records whose lease ran out back in the queue. Returns how many."""
+
+    @abstractmethod
+    def results(self):
+        """(key, result dict) for every completed record."""
+
+    @abstractmethod
+    def stats(self):
+        """Record counts by state, completed records per worker and failed records."""
+
+class SQLiteWorkQueue(WorkQueue):
+    """WorkQueue in one SQLite file, shared by processes on a host or a shared volume."""
+
+    def __init__(self, path=DEFAULT_QUEUE_PATH, timeout=60):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=timeout, isolation_level=None, check_same_thread=False)
+        self.lock = threading.Lock()
+
+        # WAL lets readers (status, collect) run while workers write; network
+        # filesystems without shared memory support need journal_mode=DELETE
+        try:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+        except sqlite3.OperationalError:
+            pass
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS work (
+                key TEXT PRIMARY KEY,
+                payload TEXT NOT NULL,
+                state TEXT NOT NULL,
+                worker TEXT,
+                lease_expires REAL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                enqueued_at REAL NOT NULL,
+                error TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_work_state ON work (state, lease_expires);
+
+            CREATE TABLE IF NOT EXISTS results (
+                key TEXT PRIMARY KEY,
+                worker TEXT NOT NULL,
+                result TEXT NOT NULL,
+                completed_at REAL NOT NULL
+            );
+        """)
+
+        # Queues created before failed records were tracked
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(work)")}
+        if "error" not in columns:
+            self.conn.execute("ALTER TABLE work ADD COLUMN error TEXT")
+
+    def _write(self, fn):
+        # BEGIN IMMEDIATE takes the write lock up front, so two workers can
+        # never claim the same rows
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                out = fn(self.conn)
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+            return out
+
+    def enqueue(self, items):
+        now = time.time()
+        rows = [(key, json.dumps(payload), PENDING, now) for key, payload in items]
+
+        def run(conn):
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO work (key, payload, state, enqueued_at) VALUES (?, ?, ?, ?)",
+                rows
+            )
+            return conn.total_changes - before
+
+        return self._write(run)
+
+    def _requeue_expired(self, conn, now):
+        conn.execute(
+            "UPDATE work SET state = ? WHERE state = ? AND lease_expires < ? AND attempts >= ?",
+            (ABANDONED, LEASED, now, MAX_ATTEMPTS)
+        )
+        cur = conn.execute(
+            "UPDATE work SET state = ?, worker = NULL, lease_expires = NULL "
+            "WHERE state = ? AND lease_expires < ?",
+            (PENDING, LEASED, now)
+        )
+        return cur.rowcount
+
+    def claim(self, worker_id, batch_size=BATCH_SIZE, lease_seconds=LEASE_SECONDS):
+        def run(conn):
+            now = time.time()
+            self._requeue_expired(conn, now)
+
+            rows = conn.execute(
+                "SELECT key, payload FROM work WHERE state = ? ORDER BY enqueued_at, key LIMIT ?",
+                (PENDING, batch_size)
+            ).fetchall()
+
+            conn.executemany(
+                "UPDATE work SET state = ?, worker = ?, lease_expires = ?, attempts = attempts + 1 "
+                "WHERE key = ?",
+                [(LEASED, worker_id, now + lease_seconds, key) for key, _ in rows]
+            )
+            return [(key, json.loads(payload)) for key, payload in rows]
+
+        return self._write(run)
+
+    def extend(self, worker_id, keys, lease_seconds=LEASE_SECONDS):
+        expires = time.time() + lease_seconds
+
+        def run(conn):
+            conn.executemany(
+                "UPDATE work SET lease_expires = ? WHERE key = ? AND worker = ? AND state = ?",
+                [(expires, key, worker_id, LEASED) for key in keys]
+            )
+
+        self._write(run)
+
+    def complete(self, worker_id, key, result):
+        def run(conn):
+            cur = conn.execute(
+                "INSERT OR IGNORE INTO results (key, worker, result, completed_at) VALUES (?, ?, ?, ?)",
+                (key, worker_id, json.dumps(result), time.time())
+            )
+            conn.execute(
+                "UPDATE work SET state = ?, lease_expires = NULL WHERE key = ?",
+                (DONE, key)
+            )
+            return cur.rowcount == 1
+
+        return self._write(run)
+
+    def fail(self, worker_id, key, reason):
+        def run(conn):
+            conn.execute(
+                "UPDATE work SET state = ?, worker = ?, lease_expires = NULL, error = ? "
+                "WHERE key = ? AND state != ?",
+                (FAILED, worker_id, reason, key, DONE)
+            )
+
+        self._write(run)
+
+    def requeue_failed(self):
+        return self._write(lambda conn: conn.execute(
+            "UPDATE work SET state = ?, worker = NULL, error = NULL WHERE state = ?",
+            (PENDING, FAILED)
+        ).rowcount)
+
+    def requeue_expired(self):
+        return self._write(lambda conn: self._requeue_expired(conn, time.time()))
+
+    def results(self):
+        with self.lock:
+            rows = self.conn.execute("SELECT key, result FROM results ORDER BY key").fetchall()
+        return [(key, json.loads(result)) for key, result in rows]
+
+    def stats(self):
+        with self.lock:
+            counts = dict(self.conn.execute("SELECT state, COUNT(*) FROM work GROUP BY state"))
+            workers = self.conn.execute(
+                "SELECT worker, COUNT(*) FROM results GROUP BY worker ORDER BY worker"
+            ).fetchall()
+            failed = self.conn.execute(
+                "SELECT key, worker, error FROM work WHERE state = ? ORDER BY key",
+                (FAILED,)
+            ).fetchall()
+        return {
+            "states": {state: counts.get(state, 0) for state in STATES},
+            "completed_by_worker": dict(workers),
+            "failed": [{"key": key, "worker": worker, "error": error} for key, worker, error in failed],
+        }
+
+class MemoryWorkQueue(WorkQueue):
+    """In-process stand-in with the same semantics, for local runs and trials."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # key -> [payload, state, worker, lease_expires, attempts, error]
+        self.work = {}
+        self.done = {}
+
+    def enqueue(self, items):
+        added = 0
+        with self.lock:
+            for key, payload in items:
+                if key not in self.work:
+                    self.work[key] = [payload, PENDING, None, None, 0, None]
+                    added += 1
+        return added
+
+    def _requeue_expired(self, now):
+        requeued = 0
+        for entry in self.work.values():
+            if entry[1] == LEASED and entry[3] < now:
+                if entry[4] >= MAX_ATTEMPTS:
+                    entry[1] = ABANDONED
+                    continue
+                entry[1:4] = [PENDING, None, None]
+                requeued += 1
+        return requeued
+
+    def claim(self, worker_id, batch_size=BATCH_SIZE, lease_seconds=LEASE_SECONDS):
+        with self.lock:
+            now = time.time()
+            self._requeue_expired(now)
+
+            batch = []
+            for key, entry in self.work.items():
+                if len(batch) >= batch_size:
+                    break
+                if entry[1] == PENDING:
+                    entry[1:5] = [LEASED, worker_id, now + lease_seconds, entry[4] + 1]
+                    batch.append((key, entry[0]))
+            return batch
+
+    def extend(self, worker_id, keys, lease_seconds=LEASE_SECONDS):
+        expires = time.time() + lease_seconds
+        with self.lock:
+            for key in keys:
+                entry = self.work.get(key)
+                if entry and entry[1] == LEASED and entry[2] == worker_id:
+                    entry[3] = expires
+
+    def complete(self, worker_id, key, result):
+        with self.lock:
+            self.work[key][1:4] = [DONE, self.work[key][2], None]
+            if key in self.done:
+                return False
+            self.done[key] = (worker_id, result)
+            return True
+
+    def fail(self, worker_id, key, reason):
+        with self.lock:
+            entry = self.work[key]
+            if entry[1] != DONE:
+                entry[1:4] = [FAILED, worker_id, None]
+                entry[5] = reason
+
+    def requeue_failed(self):
+        requeued = 0
+        with self.lock:
+            for entry in self.work.values():
+                if entry[1] == FAILED:
+                    entry[1:3] = [PENDING, None]
+                    entry[5] = None
+                    requeued += 1
+        return requeued
+
+    def requeue_expired(self):
+        with self.lock:
+            return self._requeue_expired(time.time())
+
+    def results(self):
+        with self.lock:
+            return [(key, result) for key, (_, result) in sorted(self.done.items())]
+
+    def stats(self):
+        with self.lock:
+            states = {state: 0 for state in STATES}
+            for entry in self.work.values():
+                states[entry[1]] += 1
+            workers = {}
+            for worker_id, _ in self.done.values():
+                workers[worker_id] = workers.get(worker_id, 0) + 1
+            failed = [
+                {"key": key, "worker": entry[2], "error": entry[5]}
+                for key, entry in sorted(self.work.items())
+                if entry[1] == FAILED
+            ]
+        return {"states": states, "completed_by_worker": workers, "failed": failed}
+
+def open_queue(path):
+    if path == ":memory:":
+        return MemoryWorkQueue()
+    return SQLiteWorkQueue(path)
+
+# ============================================================
+# CLI
+# ============================================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Manage the shared work queue for distributed parts scraping"
+    )
+    parser.add_argument("--db", default=DEFAULT_QUEUE_PATH)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    enqueue = sub.add_parser(
+        "enqueue",
+        help="add target records from a combined links CSV (the scraper's --csv input)"
+    )
+    enqueue.add_argument("csv_path")
+    enqueue.add_argument("--make", action="append")
+    enqueue.add_argument("--year", action="append")
+
+    sub.add_parser("status", help="show queue states and per-worker completions")
+    sub.add_parser("requeue", help="put failed records and records with expired leases back in the queue")
+
+    collect = sub.add_parser("collect", help="merge completed shards into the final output")
+    collect.add_argument("--output-root", default="output")
+    collect.add_argument("--final-suffix", default=".json", choices=[".json", ".json.gz", ".json.zst"])
+    collect.add_argument(
+        "--split-yards",
+        action="store_true",
+        help="move seller fields out of parts_data into a yards_<date> file"
+    )
+    collect.add_argument("--partition-by", type=parse_levels, metavar="LEVELS", help="make,year or make,year,slug")
+    collect.add_argument(
+        "--allow-partial",
+        action="store_true",
+        help="write the final output even though some records are not done"
+    )
+
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s | %(levelname)s | %(message)s"
+    )
+
+    queue = SQLiteWorkQueue(args.db)
+
+    if args.command == "status":
+        print(json.dumps(queue.stats(), indent=2))
+        return
+
+    if args.command == "requeue":
+        logger.info(f"Requeued {queue.requeue_failed()} failed records")
+        logger.info(f"Requeued {queue.requeue_expired()} records with expired leases")
+        return
+
+    if args.command == "collect":
+        states = queue.stats()["states"]
+        missing = {state: n for state, n in states.items() if state != DONE and n}
+        if missing and not args.allow_partial:
+            parser.error(
+                f"records not done ({', '.join(f'{n} {state}' for state, n in missing.items())}); "
+                f"requeue and finish them, or pass --allow-partial"
+            )
+
+    # The scraper is only needed for loading CSVs and merging shards
+    from . import scrap_parts_data as scraper
+    from .config import configure
+
+    if args.command == "enqueue":
+        records = scraper.iter_catalog_records(
+            args.csv_path,
+            part_filter=scraper.is_target_part,
+            makes=args.make,
+            years=args.year
+        )
+        added = queue.enqueue(
+            (scraper.record_base_name(rec), rec._asdict())
+            for rec in records
+        )
+        logger.info(f"Enqueued {added} new records into {args.db}")
+        return
+
+    config = configure(
+        output_root=args.output_root,
+        final_suffix=args.final_suffix,
+        split_yard_output=args.split_yards,
+        partition_by=args.partition_by,
+    )
+    config.ensure_dirs()
+
+    result = scraper.collect_queue_results(queue.results())
+    final_path = scraper.write_final(result)
+    logger.info(f"Collected {len(result['parts'])} parts into {final_path}")
+
+if __name__ == "__main__":
+    main()
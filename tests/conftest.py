@@ -0,0 +1,15 @@
+import pytest
+
+from autopartsearch_scraper import scrap_parts_data
+from autopartsearch_scraper.config import configure
+
+@pytest.fixture(autouse=True)
+def config(tmp_path):
+    # Every test gets its own output tree and an empty run-wide yard cache
+    scrap_parts_data.YARD_CACHE.clear()
+    return configure(
+        output_root=str(tmp_path / "output"),
+        log_dir=str(tmp_path / "logs"),
+        use_proxy=False,
+        run_ts="20260101000000",
+    )
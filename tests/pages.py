@@ -0,0 +1,33 @@
+"""Listing page markup in the two layouts the scraper parses."""
+
+OLD_FACETS = """<div id="applications-facet"><div class="panel-body"><label class="checkbox">2.5L, 4 cyl (12)</label>
+<a class="name" href="https://x/cat?application=111">2.5L, 4 cyl (7)</a><a class="name" href="https://x/cat?application=222">3.5L V6 (5)</a></div></div>
+<div id="yard-facet"><ul><li><label><a href="https://x/cat?yard=ab12">Yard A</a> (42 mi.)</label></li><li><label><a href="https://x/cat?yard=cd34">Yard B</a> (87 mi.)</label></li></ul></div>"""
+
+OLD_ITEM = """<form class="list-item"><table><tr>
+<td><img src="https://img.x/%(yard)s/images/t%(i)d.jpg"><a title="Engine Assembly" href="https://x/itemdetail?id=%(i)d">Engine Assembly</a></td>
+<td><span class="buy-panel-sell-price">$1,2%(i)d0.00</span><div class="item-company-address"><strong>Acme Auto</strong><br>123 Main St<br>Springfield, IL<br>(555) 123-4567</div></td>
+<td>87,%(i)d00</td><td>A</td><td><b>Vin:1HGCM82633A00%(i)d</b> Left SILVER <a id="tool-tip" data-original-title="Info %(i)d">Show Info</a> <span class="stockno-link">S%(i)d</span></td>
+</tr></table><script>var imgs=[{"src":"https://img.x/a%(i)d.jpg"},{"src":"https://img.x/b%(i)d.jpg"}];</script></form>"""
+
+NEW_FACETS = """<div id="applications-facet"><div class="panel-body"><label class="checkbox">3.5L V6 (30)</label>
+<a class="name" href="https://x/cat?application=333">3.5L V6 (30)</a></div></div>
+<div id="yard-facet"><ul><li><label><a href="https://x/cat?yard=ef56">Yard C</a> (12 mi.)</label></li></ul></div>"""
+
+NEW_SELLER = """<div class="item-company-address"><strong>Best Parts</strong><br>9 Elm<br>Austin, TX<br>(555) 999-0000</div>"""
+
+NEW_ROW = """<tr><td><img src="https://cdn.x/ef56/inventory/p%(i)d.jpg"><span class="buy-panel-sell-price">$8%(i)d0</span></td>
+<td><a href="https://x/itemdetail?id=n%(i)d">Transmission</a></td><td>12%(i)d,000</td><td>B</td>
+<td>Vin: 5XYZ%(i)d Rear BLACK <a id="tool-tip" data-original-title="New info %(i)d">Show Info</a><span class="stockno-link">N%(i)d</span></td></tr>"""
+
+def old_page(n, start=0, facets_after=False):
+    yards = ("ab12", "cd34")
+    items = "".join(OLD_ITEM % {"i": i, "yard": yards[i % 2]} for i in range(start, start + n))
+    body = items + OLD_FACETS if facets_after else OLD_FACETS + items
+    return f"<html><body>\n{body}\n</body></html>"
+
+def new_page(n, start=0, facets_after=False):
+    rows = "".join(NEW_ROW % {"i": i} for i in range(start, start + n))
+    table = f'{NEW_SELLER}\n<table class="table table-bordered"><tbody>{rows}</tbody></table>'
+    body = table + NEW_FACETS if facets_after else NEW_FACETS + table
+    return f"<html><body>\n{body}\n</body></html>"
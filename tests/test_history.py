@@ -0,0 +1,120 @@
+import json
+import os
+
+import pytest
+
+from autopartsearch_scraper.history import (
+    BACK,
+    GONE,
+    NEW,
+    PRICE,
+    changes_between,
+    ingest_run,
+    listing_timeline,
+    open_history,
+    price_on,
+)
+
+def listing(stock_no, price, mileage=None):
+    return {
+        "yard_id": "ab12",
+        "stock_no": stock_no,
+        "price": f"${price}",
+        "mileage": mileage,
+        "part_name": "Engine Assembly",
+        "source_make": "HONDA",
+    }
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = open_history(str(tmp_path / "history.sqlite"))
+    yield conn
+    conn.close()
+
+@pytest.fixture
+def run_file(tmp_path):
+    def write(name, parts):
+        path = tmp_path / name
+        path.write_text(json.dumps(parts))
+        return str(path)
+    return write
+
+def kinds(conn, stock_no):
+    return [(e["run_date"], e["kind"]) for e in listing_timeline(conn, "ab12", stock_no)["events"]]
+
+def test_runs_are_stored_as_deltas(conn, run_file):
+    ingest_run(conn, run_file("parts_data_20260101.json", [listing("A", 100), listing("B", 50)]), "20260101")
+    counts = ingest_run(conn, run_file("parts_data_20260102.json", [listing("A", 90), listing("C", 20)]), "20260102")
+
+    assert counts[NEW] == 1
+    assert counts[PRICE] == 1
+    assert counts[GONE] == 1
+
+    assert kinds(conn, "A") == [("20260101", NEW), ("20260102", PRICE)]
+    assert kinds(conn, "B") == [("20260101", NEW), ("20260102", GONE)]
+    assert kinds(conn, "C") == [("20260102", NEW)]
+
+    assert price_on(conn, "ab12", "A", "20260101") == 100
+    assert price_on(conn, "ab12", "A", "20260102") == 90
+    assert listing_timeline(conn, "ab12", "B")["listing"]["gone_since"] == "20260102"
+
+    assert [e["stock_no"] for e in changes_between(conn, since="20260102", kind=GONE)] == ["B"]
+
+def test_retry_output_takes_back_the_gone_event(conn, run_file):
+    ingest_run(conn, run_file("parts_data_20260101.json", [listing("A", 100), listing("B", 50)]), "20260101")
+    ingest_run(conn, run_file("parts_data_20260102.json", [listing("A", 100)]), "20260102")
+
+    # B was only missing from the first pass of the second run
+    counts = ingest_run(conn, run_file("parts_data_20260102_retry.json", [listing("B", 50)]), "20260102", partial=True)
+
+    assert counts[GONE] == -1
+    assert counts[BACK] == 0
+    assert kinds(conn, "B") == [("20260101", NEW)]
+
+    stored = listing_timeline(conn, "ab12", "B")["listing"]
+    assert stored["gone_since"] is None
+    assert stored["last_seen"] == "20260102"
+
+    run = conn.execute("SELECT listings, gone, source_path FROM runs WHERE run_date = '20260102'").fetchone()
+    assert run["listings"] == 2
+    assert run["gone"] == 0
+    assert [os.path.basename(p) for p in run["source_path"].split(",")] == [
+        "parts_data_20260102.json",
+        "parts_data_20260102_retry.json",
+    ]
+
+def test_listing_seen_again_after_a_full_run_is_back(conn, run_file):
+    ingest_run(conn, run_file("parts_data_20260101.json", [listing("A", 100)]), "20260101")
+    ingest_run(conn, run_file("parts_data_20260102.json", []), "20260102")
+    ingest_run(conn, run_file("parts_data_20260103.json", [listing("A", 100)]), "20260103")
+
+    assert kinds(conn, "A") == [("20260101", NEW), ("20260102", GONE), ("20260103", BACK)]
+    assert listing_timeline(conn, "ab12", "A")["listing"]["gone_since"] is None
+
+def test_partial_run_does_not_mark_missing_listings_gone(conn, run_file):
+    ingest_run(conn, run_file("parts_data_20260101.json", [listing("A", 100), listing("B", 50)]), "20260101")
+    counts = ingest_run(conn, run_file("parts_data_20260102.json", [listing("A", 100)]), "20260102", partial=True)
+
+    assert counts[GONE] == 0
+    assert listing_timeline(conn, "ab12", "B")["listing"]["gone_since"] is None
+
+def test_runs_must_arrive_in_date_order(conn, run_file):
+    path = run_file("parts_data_20260102.json", [listing("A", 100)])
+    ingest_run(conn, path, "20260102")
+
+    with pytest.raises(ValueError, match="not newer"):
+        ingest_run(conn, run_file("parts_data_20260101.json", [listing("A", 100)]), "20260101")
+    with pytest.raises(ValueError, match="already ingested"):
+        ingest_run(conn, path, "20260102")
+
+    assert conn.execute("SELECT COUNT(*) FROM events").fetchone()[0] == 1
+
+def test_failed_ingest_leaves_the_history_untouched(conn, run_file, tmp_path):
+    ingest_run(conn, run_file("parts_data_20260101.json", [listing("A", 100)]), "20260101")
+
+    with pytest.raises(OSError):
+        ingest_run(conn, [run_file("parts_data_20260102.json", [listing("A", 90)]), str(tmp_path / "missing.json")], "20260102")
+
+    assert [r[0] for r in conn.execute("SELECT run_date FROM runs")] == ["20260101"]
+    assert kinds(conn, "A") == [("20260101", NEW)]
+    assert price_on(conn, "ab12", "A", "20260102") == 100
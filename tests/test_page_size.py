@@ -0,0 +1,81 @@
+import asyncio
+
+from aiohttp import web
+
+from autopartsearch_scraper import scrap_parts_data
+from autopartsearch_scraper.config import configure
+from autopartsearch_scraper.page_size import judge_probe, reported_total
+
+from pages import OLD_FACETS, OLD_ITEM
+
+META = {
+    "application_text": "2.5L, 4 cyl (3)",
+    "application_id": "111",
+    "application_url": "/list?application=111",
+}
+
+def test_reported_total_reads_the_live_facet():
+    apps = [
+        {"application_id": "111", "application_text": "2.5L, 4 cyl (95)"},
+        {"application_id": "222", "application_text": "3.5L V6 (5)"},
+    ]
+    # The cached text says 3; the page says 95
+    assert reported_total(apps, META) == 95
+    assert reported_total(apps, {"application_id": "999"}) is None
+    assert reported_total(apps, None) is None
+
+def test_judge_probe():
+    assert judge_probe(rows=10, asked=200, total=95, default_rows=10) is None
+    assert judge_probe(rows=95, asked=200, total=95, default_rows=10) == 200
+    assert judge_probe(rows=50, asked=200, total=95, default_rows=10) == 50
+
+def run_listing(total, lossy):
+    """Scrapes one listing from a local catalog that honours pageSize up to 50."""
+
+    async def listing(request):
+        size = min(int(request.query.get("pageSize", 10)), 50)
+        page = int(request.query.get("currentpage", 1))
+        rows = list(range((page - 1) * size, min(page * size, total)))
+        # A lossy catalog drops the last row of every full sized page
+        if lossy and "pageSize" in request.query and len(rows) == size:
+            rows = rows[:-1]
+        facets = OLD_FACETS.replace("2.5L, 4 cyl (7)", f"2.5L, 4 cyl ({total})")
+        items = "".join(OLD_ITEM % {"i": i, "yard": "ab12"} for i in rows)
+        return web.Response(text=f"<html><body>{facets}{items}</body></html>", content_type="text/html")
+
+    async def main():
+        app = web.Application()
+        app.router.add_get("/list", listing)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        try:
+            async with scrap_parts_data.get_aiohttp_session() as session:
+                result = await scrap_parts_data.scrape_all_pages(
+                    f"http://127.0.0.1:{port}/list?application=111", META, session, 1, 1
+                )
+            return result, scrap_parts_data.get_page_sizer().stats()
+        finally:
+            await runner.cleanup()
+
+    return asyncio.run(main())
+
+def test_negotiated_size_fetches_every_row(tmp_path):
+    configure(output_root=str(tmp_path), use_proxy=False, negotiate_page_size=True)
+    result, sizing = run_listing(total=95, lossy=False)
+
+    assert len(result["parts"]) == 95
+    assert result["failure"] is None
+    assert (sizing["state"], sizing["param"], sizing["size"]) == ("accepted", "pageSize", 50)
+    assert sizing["mismatches"] == 0
+
+def test_short_sized_listing_is_rescraped_at_default_size(tmp_path):
+    configure(output_root=str(tmp_path), use_proxy=False, negotiate_page_size=True)
+    result, sizing = run_listing(total=95, lossy=True)
+
+    assert len(result["parts"]) == 95
+    assert sizing["mismatches"] == 1
+    # Two sized pages, then ten default ones
+    assert result["pages_scraped"] == 12
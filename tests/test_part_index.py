@@ -0,0 +1,90 @@
+from autopartsearch_scraper.scrap_parts_data import (
+    CatalogRecord,
+    PartIndex,
+    encode_part,
+    parse_page,
+    parts_from_dicts,
+)
+from autopartsearch_scraper import serialization
+
+from pages import old_page
+
+def app(app_id):
+    return {
+        "application_text": f"app {app_id}",
+        "application_id": app_id,
+        "application_url": f"https://x/cat?application={app_id}",
+    }
+
+def source(i):
+    return CatalogRecord("2015", "FORD", f"M{i}", "Engine", "engine", f"https://x/src{i}", None)
+
+def scraped(html, application_id, src):
+    parts = parse_page(html, app(application_id)).parts
+    for p in parts:
+        p.source = src
+    return parts
+
+def test_same_listing_is_kept_once_with_its_provenance():
+    index = PartIndex()
+    first = scraped(old_page(3), "111", source(1))
+    # Same listings again under another application and source record,
+    # plus two that are new
+    second = scraped(old_page(4, start=1), "222", source(2))
+
+    added = [index.add(p) for p in first + second]
+
+    assert added == [True, True, True, False, False, True, True]
+    assert [p.stock_no for p in index.parts] == ["S0", "S1", "S2", "S3", "S4"]
+
+    kept = index.parts[1]
+    assert kept.provenance.applications == ["111", "222"]
+    assert kept.provenance.sources == ["https://x/src1", "https://x/src2"]
+    assert kept.provenance.duplicates == 1
+    assert index.parts[0].provenance.duplicates == 0
+
+    assert index.stats() == {
+        "listings_seen": 7,
+        "unique_listings": 5,
+        "duplicates": 2,
+        "duplication_ratio": round(2 / 7, 4),
+    }
+
+def test_detail_url_is_the_key_without_yard_and_stock():
+    index = PartIndex()
+    rows = [
+        {"detail_url": "https://x/itemdetail?id=1"},
+        {"detail_url": "https://x/itemdetail?id=1"},
+        {"detail_url": "https://x/itemdetail?id=2", "stock_no": "S2"},
+        {},
+        {},
+    ]
+    added = [index.add(p) for p in parts_from_dicts(rows)]
+
+    # Rows with no key at all are never merged
+    assert added == [True, False, True, True, True]
+
+def test_merged_output_can_be_merged_again(tmp_path):
+    index = PartIndex()
+    for p in scraped(old_page(2), "111", source(1)) + scraped(old_page(2), "222", source(1)):
+        index.add(p)
+
+    path = str(tmp_path / "shard.json")
+    serialization.dump({"parts": index.parts}, path, default=encode_part)
+    reloaded = parts_from_dicts(serialization.load(path)["parts"], source(1))
+
+    merged = PartIndex()
+    for p in reloaded:
+        merged.add(p)
+
+    assert [p.provenance.applications for p in merged.parts] == [["111", "222"], ["111", "222"]]
+    assert [p.provenance.duplicates for p in merged.parts] == [1, 1]
+
+    # A second merged file holding the same listings under a third application
+    again = PartIndex()
+    for p in reloaded + scraped(old_page(2), "333", source(2)):
+        again.add(p)
+
+    assert [p.provenance.applications for p in again.parts] == [["111", "222", "333"]] * 2
+    assert [p.provenance.sources for p in again.parts] == [["https://x/src1", "https://x/src2"]] * 2
+    assert [p.provenance.duplicates for p in again.parts] == [2, 2]
@@ -0,0 +1,74 @@
+import os
+
+import pytest
+
+from autopartsearch_scraper import serialization
+from autopartsearch_scraper.partitions import (
+    load_manifest,
+    parse_levels,
+    safe_segment,
+    select_partitions,
+    write_partitions,
+)
+from autopartsearch_scraper.scrap_parts_data import CatalogRecord, encode_part, parts_from_dicts
+
+def parts_for(make, year, n=1):
+    source = CatalogRecord(
+        year=year, make=make, model="M", part_name="Engine Assembly",
+        part_slug="engine-assembly", url=f"https://x/{make}/{year}", ic_description=None,
+    )
+    rows = [{"stock_no": f"{make}-{year}-{i}", "run_timestamp": "20260101000000"} for i in range(n)]
+    return parts_from_dicts(rows, source)
+
+def test_parse_levels():
+    assert parse_levels("make, year") == ("make", "year")
+    with pytest.raises(ValueError):
+        parse_levels("make,colour")
+
+def test_safe_segment():
+    assert safe_segment("LAND ROVER") == "LAND_ROVER"
+    assert safe_segment("A/B") == "A_B"
+    assert safe_segment("  ") == "_unknown"
+    assert safe_segment(None) == "_unknown"
+
+def test_colliding_values_get_their_own_partitions(tmp_path):
+    root = str(tmp_path / "parts")
+    parts = (
+        parts_for("LAND ROVER", "2015", 2)
+        + parts_for("LAND_ROVER", "2015", 3)
+        + parts_for("A/B", "2016")
+        + parts_for("A_B", "2016")
+        + parts_for("FORD", "2015")
+    )
+
+    manifest = write_partitions(root, parts, ("make", "year"), default=encode_part)
+
+    paths = [e["path"] for e in manifest["partitions"]]
+    assert len(paths) == len(set(paths)) == 5
+    assert "source_make=FORD/source_year=2015/part.json" in paths
+    assert manifest["total_rows"] == 8
+
+    # Every file holds exactly the rows the manifest says it does
+    for entry in manifest["partitions"]:
+        rows = serialization.load(os.path.join(root, entry["path"]))
+        assert len(rows) == entry["rows"]
+        assert {r["source_make"] for r in rows} == {entry["values"]["source_make"]}
+
+    assert load_manifest(root) == manifest
+    [land_rover] = select_partitions(root, source_make="land rover")
+    assert len(serialization.load(land_rover)) == 2
+
+def test_unknown_values_share_one_partition(tmp_path):
+    root = str(tmp_path / "parts")
+    parts = parts_for(None, "2015") + parts_for("", "2015") + parts_for("  ", "2015")
+
+    manifest = write_partitions(root, parts, ("make",), default=encode_part)
+
+    assert [(e["path"], e["rows"]) for e in manifest["partitions"]] == [("source_make=_unknown/part.json", 3)]
+
+def test_rewrite_replaces_old_partitions(tmp_path):
+    root = str(tmp_path / "parts")
+    write_partitions(root, parts_for("FORD", "2015"), ("make",), default=encode_part)
+    write_partitions(root, parts_for("KIA", "2015"), ("make",), default=encode_part)
+
+    assert sorted(os.listdir(root)) == ["manifest.json", "source_make=KIA"]
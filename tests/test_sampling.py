@@ -0,0 +1,47 @@
+from collections import Counter
+
+from autopartsearch_scraper.sampling import extrapolate, stratified_sample
+from autopartsearch_scraper.scrap_parts_data import CatalogRecord
+
+def record(i, make):
+    return CatalogRecord("2015", make, "M", "Engine", "engine", f"https://x/{i}", None)
+
+def result(seconds, pages=3, **extra):
+    return {"pages_scraped": pages, "total_bytes": pages * 1000, "record_runtime_seconds": seconds, **extra}
+
+def test_stratified_sample_keeps_proportions():
+    records = [record(i, "FORD") for i in range(60)] + [record(i, "KIA") for i in range(60, 80)]
+    sample = stratified_sample(records, 20, seed=1)
+
+    assert len(set(sample)) == 20
+    assert Counter(r.make for r in sample) == {"FORD": 15, "KIA": 5}
+    assert stratified_sample(records, 20, seed=1) == sample
+
+def test_small_sample_on_many_workers_is_not_scaled_by_wall_clock():
+    # Four 2s records ran side by side on 15 workers in about 2s of wall time
+    report = extrapolate([result(2.0) for _ in range(4)], 4, 2.0, 15)
+    assert report["projected"]["wall_seconds"] == 2
+
+    # The same records across 300: 600 busy seconds over 15 workers
+    report = extrapolate([result(2.0) for _ in range(4)], 300, 2.0, 15)
+    assert report["projected"]["wall_seconds"] == 40
+
+def test_long_record_adds_a_tail():
+    report = extrapolate([result(1.0), result(1.0), result(1.0), result(9.0)], 40, 10.0, 4)
+    # 30 busy seconds per 4 records -> 120 over 4 workers, plus 9 - 3
+    assert report["projected"]["wall_seconds"] == 36
+
+def test_shard_hits_and_failures_stay_out_of_the_means():
+    results = [
+        result(10.0, pages=5),
+        result(10.0, pages=5),
+        result(0.0, pages=50, from_shard=True),
+        {"pages_scraped": 0, "total_bytes": 0, "failed": "fetch_failed"},
+    ]
+    report = extrapolate(results, 100, 20.0, 1)
+
+    assert report["observed_records"] == 2
+    assert report["cached_records"] == 1
+    assert report["failed_records"] == 1
+    assert report["per_record"]["pages_mean"] == 5
+    assert report["projected"]["failed_records"] == round(100 / 3)
@@ -0,0 +1,59 @@
+import pytest
+
+from autopartsearch_scraper import scrap_parts_data
+from autopartsearch_scraper.scrap_parts_data import StreamingPageParser, parse_page
+
+from pages import new_page, old_page
+
+META = {
+    "application_text": "2.5L, 4 cyl (7)",
+    "application_id": "111",
+    "application_url": "https://x/cat?application=111",
+}
+
+def rows(page):
+    return [p.to_dict() for p in page.parts]
+
+def stream(html, chunk):
+    parser = StreamingPageParser(META)
+    for i in range(0, len(html), chunk):
+        parser.feed(html[i:i + chunk])
+    return parser.close(len(html))
+
+PAGES = {
+    "old_facets_first": old_page(5),
+    "old_facets_last": old_page(5, facets_after=True),
+    "new_facets_first": new_page(4),
+    "new_facets_last": new_page(4, facets_after=True),
+    "truncated_item": old_page(3).replace("</form>", "", 1),
+    "no_listings": "<html><body>nothing</body></html>",
+}
+
+@pytest.mark.parametrize("chunk", [1, 7, 64, 100000])
+@pytest.mark.parametrize("name", sorted(PAGES))
+def test_streaming_matches_parse_page(name, chunk):
+    html = PAGES[name]
+
+    scrap_parts_data.YARD_CACHE.clear()
+    expected = parse_page(html, META, len(html))
+    scrap_parts_data.YARD_CACHE.clear()
+    page = stream(html, chunk)
+
+    assert rows(page) == rows(expected)
+    assert page.applications == expected.applications
+    assert page.interchange == expected.interchange
+
+def test_late_facets_reach_rows_parsed_before_them():
+    page = stream(old_page(4, facets_after=True), 50)
+
+    assert page.parts
+    assert {p.context.interchange.strip() for p in page.parts} == {"2.5L, 4 cyl"}
+    assert {p.distance_miles for p in page.parts} == {"42", "87"}
+
+def test_rows_are_parsed_before_the_body_ends():
+    html = old_page(5)
+    parser = StreamingPageParser(META)
+    cut = html.rindex("<form")
+    assert len(parser.feed(html[:cut])) == 4
+    parser.feed(html[cut:])
+    assert len(parser.close(len(html)).parts) == 5
@@ -0,0 +1,101 @@
+import time
+
+import pytest
+
+from autopartsearch_scraper import work_queue
+from autopartsearch_scraper.work_queue import (
+    ABANDONED,
+    DONE,
+    FAILED,
+    LEASED,
+    PENDING,
+    MemoryWorkQueue,
+    SQLiteWorkQueue,
+)
+
+@pytest.fixture(params=["sqlite", "memory"])
+def queue(request, tmp_path):
+    if request.param == "sqlite":
+        return SQLiteWorkQueue(str(tmp_path / "queue.sqlite"))
+    return MemoryWorkQueue()
+
+def fill(queue, n):
+    return queue.enqueue((f"r{i}", {"i": i}) for i in range(n))
+
+def test_enqueue_ignores_known_keys(queue):
+    assert fill(queue, 3) == 3
+    assert fill(queue, 4) == 1
+    assert queue.stats()["states"][PENDING] == 4
+
+def test_claim_leases_each_record_once(queue):
+    fill(queue, 5)
+    a = queue.claim("a", batch_size=3)
+    b = queue.claim("b", batch_size=3)
+
+    assert [k for k, _ in a] == ["r0", "r1", "r2"]
+    assert [k for k, _ in b] == ["r3", "r4"]
+    assert a[0][1] == {"i": 0}
+    assert queue.claim("c") == []
+    assert queue.stats()["states"][LEASED] == 5
+
+def test_expired_lease_goes_back_to_another_worker(queue):
+    fill(queue, 1)
+    queue.claim("a", lease_seconds=0.05)
+    time.sleep(0.1)
+
+    assert queue.claim("b") == [("r0", {"i": 0})]
+
+def test_extend_keeps_the_lease(queue):
+    fill(queue, 1)
+    queue.claim("a", lease_seconds=0.05)
+    queue.extend("a", ["r0"], lease_seconds=60)
+    time.sleep(0.1)
+
+    assert queue.claim("b") == []
+
+def test_record_is_abandoned_after_max_attempts(queue, monkeypatch):
+    monkeypatch.setattr(work_queue, "MAX_ATTEMPTS", 2)
+    fill(queue, 1)
+    for worker in ("a", "b"):
+        assert queue.claim(worker, lease_seconds=0.01)
+        time.sleep(0.05)
+
+    assert queue.requeue_expired() == 0
+    assert queue.stats()["states"][ABANDONED] == 1
+
+def test_completing_twice_keeps_the_first_result(queue):
+    fill(queue, 1)
+    queue.claim("a", lease_seconds=0.01)
+    time.sleep(0.05)
+    queue.claim("b")
+
+    assert queue.complete("b", "r0", {"by": "b"}) is True
+    assert queue.complete("a", "r0", {"by": "a"}) is False
+    assert queue.results() == [("r0", {"by": "b"})]
+
+    stats = queue.stats()
+    assert stats["states"][DONE] == 1
+    assert stats["completed_by_worker"] == {"b": 1}
+
+def test_failed_record_waits_for_requeue(queue):
+    fill(queue, 2)
+    queue.claim("a", batch_size=2)
+    queue.fail("a", "r0", "fetch_failed")
+    queue.complete("a", "r1", {})
+
+    stats = queue.stats()
+    assert stats["states"][FAILED] == 1
+    assert stats["failed"] == [{"key": "r0", "worker": "a", "error": "fetch_failed"}]
+    assert queue.claim("b") == []
+
+    assert queue.requeue_failed() == 1
+    assert queue.claim("b") == [("r0", {"i": 0})]
+    assert queue.stats()["failed"] == []
+
+def test_fail_does_not_undo_a_result(queue):
+    fill(queue, 1)
+    queue.claim("a")
+    queue.complete("a", "r0", {})
+    queue.fail("b", "r0", "late failure")
+
+    assert queue.stats()["states"][DONE] == 1